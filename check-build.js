@@ -0,0 +1,43 @@
+// check-build.js - Fails when code.js is not the build output of code.ts
+
+const esbuild = require('esbuild');
+const fs = require('fs');
+
+async function checkBuild() {
+    console.log('🔍 Checking code.js against code.ts...');
+
+    // Same options as buildBackend() in build.js, kept in memory
+    const result = await esbuild.build({
+        entryPoints: ['code.ts'],
+        bundle: true,
+        outfile: 'code.js',
+        platform: 'browser',
+        target: 'es2017',
+        write: false,
+    });
+
+    const built = result.outputFiles[0].text;
+    const shipped = fs.readFileSync('code.js', 'utf8');
+    if (built === shipped) {
+        console.log('✅ code.js is up to date');
+        return true;
+    }
+
+    const builtLines = built.split('\n');
+    const shippedLines = shipped.split('\n');
+    let line = 0;
+    while (line < builtLines.length && builtLines[line] === shippedLines[line]) {
+        line++;
+    }
+    console.error(`❌ code.js differs from the code.ts build (first at line ${line + 1}); run npm run build`);
+    console.error(`   built:   ${builtLines[line] || '<end of file>'}`);
+    console.error(`   shipped: ${shippedLines[line] || '<end of file>'}`);
+    return false;
+}
+
+checkBuild()
+    .then(ok => process.exit(ok ? 0 : 1))
+    .catch(error => {
+        console.error('❌ Build check failed:', error.message);
+        process.exit(1);
+    });
@@ -5111,9 +5111,9 @@ ${llmErrors}`);
             `\u{1F50D} Available icons:`,
             designSystemData.components.filter((comp) => comp.suggestedType === "icon").map((comp) => `${comp.name} (${comp.id})`)
           );
-          const iconComponent = designSystemData.components.find(
-            (comp) => comp.suggestedType === "icon" && comp.name.toLowerCase().includes(iconName.toLowerCase())
-          );
+          const isIcon = (comp) => comp.suggestedType === "icon" || comp.name.toLowerCase().startsWith("icon/");
+          const requested = iconName.toLowerCase();
+          const iconComponent = designSystemData.components.find((comp) => comp.id === iconName) || designSystemData.components.find((comp) => isIcon(comp) && comp.name.toLowerCase() === requested) || designSystemData.components.find((comp) => isIcon(comp) && comp.name.toLowerCase().includes(requested));
           if (iconComponent) {
             console.log(`\u2705 Resolved icon "${iconName}" \u2192 ${iconComponent.id} (${iconComponent.name})`);
             return iconComponent.id;
@@ -11864,6 +11864,7 @@ Previous Stage Design System Used: ${input.metadata.designSystemUsed || false}`;
   init_component_scanner();
   init_json_migrator();
   var validationEngine;
+  var uploadedDesignSystem = null;
   async function initializeAIPipeline() {
     try {
       console.log("\u{1F527} initializeAIPipeline: Starting initialization...");
@@ -12564,9 +12565,11 @@ Previous Stage Design System Used: ${input.metadata.designSystemUsed || false}`;
             console.log("\u26A1 Starting 3-stage AI pipeline with prompt:", prompt);
             figma.notify("\u{1F680} Running 3-stage pipeline...", { timeout: 3e4 });
             let designSystemData = null;
+            let scanTime = null;
             try {
               const savedScan = await DesignSystemScannerService.getScanSession();
               if (savedScan && savedScan.components && savedScan.components.length > 0) {
+                scanTime = savedScan.scanTime;
                 designSystemData = {
                   components: savedScan.components,
                   colorStyles: savedScan.colorStyles || null
@@ -12578,21 +12581,33 @@ Previous Stage Design System Used: ${input.metadata.designSystemUsed || false}`;
             } catch (error) {
               console.warn("\u26A0\uFE0F Could not load design system data:", error);
             }
-            const requestBody = { prompt };
-            if (designSystemData) {
-              requestBody.design_system_data = designSystemData;
-            }
-            const response = await fetch("http://localhost:8000/api/generate", {
+            const postGenerate = (body) => fetch("http://localhost:8000/api/generate", {
               method: "POST",
               headers: {
                 "Content-Type": "application/json"
               },
-              body: JSON.stringify(requestBody)
+              body: JSON.stringify(body)
             });
+            const requestBody = { prompt };
+            if (designSystemData) {
+              if (uploadedDesignSystem && uploadedDesignSystem.scanTime === scanTime) {
+                requestBody.design_system_hash = uploadedDesignSystem.hash;
+              } else {
+                requestBody.design_system_data = designSystemData;
+              }
+            }
+            let response = await postGenerate(requestBody);
+            if (response.status === 409 && designSystemData) {
+              uploadedDesignSystem = null;
+              response = await postGenerate({ prompt, design_system_data: designSystemData });
+            }
             if (!response.ok) {
               throw new Error(`HTTP ${response.status}: ${response.statusText}`);
             }
             const result = await response.json();
+            if (result.design_system_hash && scanTime !== null) {
+              uploadedDesignSystem = { scanTime, hash: result.design_system_hash };
+            }
             if (result.success) {
               console.log("\u2705 3-stage pipeline completed successfully!");
               const stage3Content = result.stages.stage_3.content;
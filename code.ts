@@ -14,6 +14,10 @@ import { JSONMigrator } from './src/core/json-migrator';
 // Global validation engine instance
 let validationEngine: ValidationEngine;
 
+// Hash the pipeline server assigned to the last uploaded scan, so unchanged
+// design system data is not re-sent with every request
+let uploadedDesignSystem: { scanTime: number; hash: string } | null = null;
+
 // All automated tests disabled for cleaner console output
 // Uncomment individual tests as needed for debugging
 
@@ -887,9 +891,11 @@ figma.ui.onmessage = async (msg: { type: string; [key: string]: unknown }) => {
                 
                 // Get current design system data from plugin (components + color styles)
                 let designSystemData = null;
+                let scanTime: number | null = null;
                 try {
                     const savedScan = await DesignSystemScannerService.getScanSession();
                     if (savedScan && savedScan.components && savedScan.components.length > 0) {
+                        scanTime = savedScan.scanTime;
                         designSystemData = {
                             components: savedScan.components,
                             colorStyles: savedScan.colorStyles || null
@@ -902,26 +908,42 @@ figma.ui.onmessage = async (msg: { type: string; [key: string]: unknown }) => {
                     console.warn('⚠️ Could not load design system data:', error);
                 }
                 
-                // Call HTTP server with live design system data
-                const requestBody: { prompt: string; design_system_data?: unknown } = { prompt: prompt };
-                if (designSystemData) {
-                    requestBody.design_system_data = designSystemData;
-                }
-                
-                const response = await fetch('http://localhost:8000/api/generate', {
+                // Call HTTP server with live design system data (just its hash if the server already has this scan)
+                const postGenerate = (body: object) => fetch('http://localhost:8000/api/generate', {
                     method: 'POST',
                     headers: {
                         'Content-Type': 'application/json'
                     },
-                    body: JSON.stringify(requestBody)
+                    body: JSON.stringify(body)
                 });
                 
+                const requestBody: { prompt: string; design_system_data?: unknown; design_system_hash?: string } = { prompt: prompt };
+                if (designSystemData) {
+                    if (uploadedDesignSystem && uploadedDesignSystem.scanTime === scanTime) {
+                        requestBody.design_system_hash = uploadedDesignSystem.hash;
+                    } else {
+                        requestBody.design_system_data = designSystemData;
+                    }
+                }
+                
+                let response = await postGenerate(requestBody);
+                
+                // Server restarted or evicted the scan: upload it again
+                if (response.status === 409 && designSystemData) {
+                    uploadedDesignSystem = null;
+                    response = await postGenerate({ prompt: prompt, design_system_data: designSystemData });
+                }
+                
                 if (!response.ok) {
                     throw new Error(`HTTP ${response.status}: ${response.statusText}`);
                 }
                 
                 const result = await response.json();
                 
+                if (result.design_system_hash && scanTime !== null) {
+                    uploadedDesignSystem = { scanTime: scanTime, hash: result.design_system_hash };
+                }
+                
                 if (result.success) {
                     console.log('✅ 3-stage pipeline completed successfully!');
                     
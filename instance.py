@@ -26,14 +26,30 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import asyncio
 import threading
-import glob
 
 # Add path for src modules
 sys.path.append(os.path.abspath('src'))
 # JSONMigrator is TypeScript, skip for now
 
 # Import QA module
-from scripts.design_qa import DesignQA
+from scripts.design_qa import QA_OUTPUT_MODES, DesignQA
+from scripts.visual_reference_index import select_visual_references
+from scripts.stage_handoff import StageHandoff
+from scripts.json_extract import extract_json_text
+from scripts.json_repair import format_repairs, parse_json_tolerant
+from scripts.design_system_registry import get_registry
+from scripts.design_system_cache import DEFAULT_MEMORY_BUDGET_MB, DesignSystemCache
+from scripts.design_system_manifest import get_manifest
+from scripts.color_index import ColorSnapper, get_color_index
+from scripts.component_index import ComponentResolver, get_component_index
+from scripts.icon_index import IconResolver, get_icon_index
+from scripts.layout_normalizer import LayoutNormalizer, summarize_changes
+from scripts.schema_compiler import validate_figma_json
+from scripts.auto_layout import check_layout
+from scripts.headless_renderer import render_figma_json, require_pillow
+from scripts.text_metrics import TextChecker, get_text_fitter
+from scripts.contrast_checker import ContrastChecker, get_contrast_matrix
+from scripts.tree_walker import TreeWalker
 
 # QA Configuration
 QA_CONFIG = {
@@ -41,6 +57,11 @@ QA_CONFIG = {
     'max_iterations': 3,  # Configurable iteration count
 }
 
+# Visual reference selection: only the most relevant references are attached
+VISUAL_REFS_CONFIG = {
+    'top_k': 3,  # Max references attached to stages 1 and 2
+}
+
 # Load environment variables from .env file
 def load_env():
     env_file = Path(".env")
@@ -327,9 +348,17 @@ class PipelineRunner:
 class Alternative3StagePipeline:
     """Alternative 3-stage pipeline: User Request Analyzer -> UX UI Designer -> JSON Engineer"""
     
-    def __init__(self, api_key: Optional[str] = None, max_qa_loops: int = 0):
+    def __init__(self, api_key: Optional[str] = None, max_qa_loops: int = 0, screenshot_source: str = "figma",
+                 qa_output: str = "json"):
         self.api_key = api_key
         self.max_qa_loops = max_qa_loops
+        # 'json': QA returns the whole fixed JSON; 'patch': JSON Patch operations applied locally
+        self.qa_output = qa_output
+        # 'figma': wait for the plugin's screenshot; 'local': render it headlessly
+        self.screenshot_source = screenshot_source
+        if screenshot_source == "local":
+            # Fail at startup rather than skipping every screenshot later
+            require_pillow()
         self.gemini_client = None
         self.output_dir = Path("./python_outputs")
         self.output_dir.mkdir(exist_ok=True)
@@ -380,65 +409,37 @@ class Alternative3StagePipeline:
     
     def load_design_system_data(self) -> str:
         """Load design system scan data for UX UI Designer stage"""
-        # Use live data if available
-        if hasattr(self, 'live_design_system_data') and self.live_design_system_data:
-            if isinstance(self.live_design_system_data, list):
-                print(f"📊 Using live design system data: {len(self.live_design_system_data)} components")
-                # Debug: show first component for verification
-                if len(self.live_design_system_data) > 0:
-                    first_component = self.live_design_system_data[0]
-                    print(f"🔍 First component example: {first_component.get('id', 'no-id')} - {first_component.get('name', 'no-name')} - {first_component.get('suggestedType', 'no-type')}")
-                return json.dumps(self.live_design_system_data, indent=2)
-            else:
-                return str(self.live_design_system_data)
+        # Use live data if available (parsed and rendered once per payload hash)
+        live_snapshot = getattr(self, 'live_design_system_snapshot', None)
+        if live_snapshot is not None:
+            components = live_snapshot.components
+            print(f"📊 Using request design system ({live_snapshot.content_hash[:12]}): {len(components)} components")
+            # Debug: show first component for verification
+            if len(components) > 0:
+                first_component = components[0]
+                print(f"🔍 First component example: {first_component.get('id', 'no-id')} - {first_component.get('name', 'no-name')} - {first_component.get('suggestedType', 'no-type')}")
+            self.design_system_snapshot = live_snapshot
+            return live_snapshot.to_json(indent=2)
         
         # Auto-select newest design system file from design-system folder
         design_system_folder = "design-system"
         if not os.path.exists(design_system_folder):
             return "No design system data available - folder not found"
         
-        # Find all design system files and get the newest one
-        design_files = glob.glob(os.path.join(design_system_folder, "design-system-raw-data-*.json"))
-        if not design_files:
-            return "No design system data available - no files found"
-        
-        # IMPROVED: Parse timestamps from filenames for proper datetime sorting
-        def get_file_timestamp(filepath):
-            """Extract timestamp from filename and parse it as datetime"""
-            import re
-            from datetime import datetime
-            
-            filename = os.path.basename(filepath)
-            # Extract ISO timestamp from filename: design-system-raw-data-2025-07-23T20-03-48.json
-            match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2})', filename)
-            if match:
-                try:
-                    timestamp_str = match.group(1)
-                    # Convert from 2025-07-23T20-03-48 to 2025-07-23T20:03:48
-                    # Split by T to handle date and time parts separately
-                    date_part, time_part = timestamp_str.split('T')
-                    time_part_fixed = time_part.replace('-', ':')  # Only fix time part
-                    timestamp_iso = f"{date_part}T{time_part_fixed}"
-                    return datetime.fromisoformat(timestamp_iso)
-                except ValueError:
-                    pass
-            
-            # Fallback: use file modification time
-            return datetime.fromtimestamp(os.path.getmtime(filepath))
-        
-        # Sort by parsed timestamp to get truly newest file
-        newest_file = max(design_files, key=get_file_timestamp)
-        
-        # Get the timestamp for logging
-        newest_timestamp = get_file_timestamp(newest_file)
-        print(f"📊 Using design system: {os.path.basename(newest_file)} (timestamp: {newest_timestamp})")
-        
+        # Shared registry: the file is read and parsed once, not on every stage call
         try:
-            with open(newest_file, 'r', encoding='utf-8') as f:
-                return f.read()
+            snapshot = get_registry().latest(design_system_folder)
         except Exception as e:
             print(f"❌ Failed to load design system data: {e}")
             return "Design system data loading failed"
+        
+        if not snapshot:
+            return "No design system data available - no files found"
+        
+        current = get_manifest(design_system_folder).current()
+        print(f"📊 Using design system: {os.path.basename(snapshot.path)} (timestamp: {current['exportedAt'] if current else 'unknown'})")
+        self.design_system_snapshot = snapshot
+        return snapshot.text
     
     def extract_design_tokens_context(self, design_system_data: str) -> str:
         """NEW: Extract and format design tokens for AI prompt context"""
@@ -474,7 +475,7 @@ class Alternative3StagePipeline:
                 print(f"🎨 Found {len(design_tokens)} design tokens for AI context (summarized)")
             
             # Extract Color Styles (fallback support)
-            color_styles = data.get('colorStyles', {})
+            color_styles = data.get('colorStyles') or {}
             if color_styles and any(styles for styles in color_styles.values()):
                 context_parts.append("\n\n=== COLOR STYLES (FALLBACK) ===")
                 
@@ -513,7 +514,15 @@ class Alternative3StagePipeline:
     def format_ux_ui_prompt(self, prompt_template: str, analyzer_output: str, design_system_data: str) -> str:
         """Format UX UI Designer prompt with analyzer output and design system data"""
         # NEW: Extract design tokens context for enhanced AI understanding
-        design_tokens_context = self.extract_design_tokens_context(design_system_data)
+        snapshot = getattr(self, 'design_system_snapshot', None)
+        if snapshot is not None and snapshot.text == design_system_data:
+            # Pre-rendered once per snapshot and kept in the sidecar cache
+            design_tokens_context = snapshot.render(
+                'design_tokens_context', lambda: self.extract_design_tokens_context(design_system_data),
+                depends_on=['designTokens', 'colorStyles']
+            )
+        else:
+            design_tokens_context = self.extract_design_tokens_context(design_system_data)
         
         # Replace placeholders in prompt with actual content
         formatted_prompt = prompt_template.replace('{{USER_REQUEST_ANALYZER_OUTPUT}}', analyzer_output)
@@ -569,6 +578,22 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
         print(f"📸 Created screenshot request: {request_file}")
         return str(request_file)
     
+    def get_screenshot(self, run_id: str, figma_json: Dict[str, Any]) -> Optional[str]:
+        """Screenshot of figma_json from the configured source (Figma plugin or local renderer)"""
+        if self.screenshot_source != "local":
+            self.create_screenshot_request(run_id, json.dumps(figma_json, indent=2))
+            return self.wait_for_screenshot(run_id)
+        
+        screenshot_file = self.screenshots_dir / f"screenshot_{run_id}.png"
+        snapshot = getattr(self, 'design_system_snapshot', None) or get_registry().latest("design-system")
+        try:
+            render_figma_json(figma_json, screenshot_file, snapshot)
+        except Exception as e:
+            print(f"❌ Local render failed: {e}")
+            return None
+        print(f"🖼️ Rendered local screenshot: {screenshot_file}")
+        return str(screenshot_file)
+    
     def wait_for_screenshot(self, run_id: str, timeout: int = 300) -> Optional[str]:
         """Wait for screenshot to be created by plugin"""
         screenshot_file = self.screenshots_dir / f"screenshot_{run_id}.png"
@@ -693,6 +718,13 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
         # Load prompt and format it based on stage
         prompt_template = self.load_alt_prompt(stage_num, design_reviewer_mode)
         
+        # Keep only references relevant to this stage's input: the raw request
+        # for stage 1, the analyzer's interpretation of it for stage 2
+        if visual_refs and stage_num in [1, 2]:
+            all_refs = visual_refs
+            visual_refs = select_visual_references(all_refs, input_data, VISUAL_REFS_CONFIG['top_k'])
+            print(f"📸 Selected {len(visual_refs)}/{len(all_refs)} relevant visual references: {[os.path.basename(ref) for ref in visual_refs]}")
+        
         # Add visual reference context for stages 1 and 2
         if visual_refs and stage_num in [1, 2]:
             visual_context = self.format_visual_context(len(visual_refs))
@@ -762,11 +794,12 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
         
         results = {}
         current_input = initial_input
+        handoff = StageHandoff()
         
         for stage_num in range(1, 4):  # Only 3 stages
             result = await self.run_alt_stage(stage_num, current_input, run_id, visual_refs)
             results[f"stage_{stage_num}"] = result
-            current_input = result.content
+            current_input = self.prepare_handoff(handoff, stage_num, result.content)
             
             # Add QA validation after Stage 2 (UX/UI Designer)
             if self.max_qa_loops > 0 and stage_num == 2:
@@ -775,7 +808,7 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
                 print(f"{'='*50}")
                 
                 # Initialize QA
-                qa = DesignQA(self.api_key)
+                qa = DesignQA(self.api_key, getattr(self, 'design_system_snapshot', None), self.qa_output)
                 
                 # Get designer output from Stage 2 (raw string with rationale)
                 designer_output = result.content
@@ -805,7 +838,8 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
                         'timestamp': run_id,
                         'validated_json': validated_json,
                         'history': qa_history,
-                        'iterations_used': len(qa_history)
+                        'iterations_used': len(qa_history),
+                        'rule_fixes': qa.rule_fixes
                     }
                     
                     # Save to file
@@ -823,45 +857,31 @@ Focus on: layout patterns, color schemes, visual hierarchy, component arrangemen
 
 Design has been validated and corrected through {len(qa_history)} QA iteration(s).
 
+Fixed by design-system rules:
+{chr(10).join(['- ' + fix for fix in qa.rule_fixes]) or 'None'}
+
 Issues fixed:
-{chr(10).join(['- ' + issue for h in qa_history for issue in h.get('issues', [])])}
+{chr(10).join(['- ' + issue for h in qa_history for issue in h.get('issues', [])]) or 'None'}
 
 ---RATIONALE-SEPARATOR---
 
 {json.dumps(validated_json, indent=2)}
 """
                     
-                    # Update the current input for next stage
-                    current_input = formatted_for_engineer
+                    # Update the current input for next stage (layout JSON only)
+                    current_input = handoff.layout(formatted_for_engineer, target_stage=3)
                     
-                    print(f"✅ QA Validation complete: {len(qa_history)} iteration(s) used")
+                    print(f"✅ QA Validation complete: {len(qa_history)} LLM iteration(s) used, {len(qa.rule_fixes)} rule fix(es)")
                 else:
                     # QA failed, continue with original designer output
                     print(f"⚠️ QA Validation skipped: {len(qa_history)} iteration(s) attempted")
                     # current_input remains unchanged (original designer output)
             
         # Apply JSON migration
-        final_json_str = results["stage_3"].content
-        
-        # Handle rationale separator format from JSON Engineer
-        if "---RATIONALE-SEPARATOR---" in final_json_str:
-            parts = final_json_str.split("---RATIONALE-SEPARATOR---")
-            if len(parts) >= 2:
-                final_json_str = parts[1].strip()
-                print("✅ Extracted JSON after rationale separator")
-        elif "---RATIONALE_SEPARATOR---" in final_json_str:
-            parts = final_json_str.split("---RATIONALE_SEPARATOR---")
-            if len(parts) >= 2:
-                final_json_str = parts[1].strip()
-                print("✅ Extracted JSON after rationale separator (underscore format)")
-        
-        # Use regex to extract the JSON if wrapped in markdown
-        match = re.search(r'```json\n(.*)\n```', final_json_str, re.DOTALL)
-        if match:
-            final_json_str = match.group(1)
+        final_json_str = self.extract_json_from_response(results["stage_3"].content)
 
         try:
-            final_json = json.loads(final_json_str)
+            final_json = self.postprocess_figma_json(json.loads(final_json_str))
             # Skip JSONMigrator for now (TypeScript only)
             results["stage_3"].content = json.dumps(final_json, indent=2)
             print("✅ JSON parsing successful (migration skipped)")
@@ -886,6 +906,7 @@ Issues fixed:
             "initial_input": initial_input,
             "total_stages": 3,
             "ai_enabled": bool(self.gemini_client),
+            "handoff": self.save_handoff_report(handoff, run_id),
             "results": {k: asdict(v) for k, v in results.items()}
         }
         
@@ -906,12 +927,13 @@ Issues fixed:
         
         results = {}
         current_input = initial_input
+        handoff = StageHandoff()
         
         # Stage 1-3: Standard pipeline
         for stage_num in range(1, 4):
             result = await self.run_alt_stage(stage_num, current_input, run_id, visual_refs)
             results[f"stage_{stage_num}"] = result
-            current_input = result.content
+            current_input = self.prepare_handoff(handoff, stage_num, result.content)
             
             # Add QA validation after Stage 2 (UX/UI Designer) 
             if self.max_qa_loops > 0 and stage_num == 2:
@@ -920,7 +942,7 @@ Issues fixed:
                 print(f"{'='*50}")
                 
                 # Initialize QA
-                qa = DesignQA(self.api_key)
+                qa = DesignQA(self.api_key, getattr(self, 'design_system_snapshot', None), self.qa_output)
                 
                 # Get designer output from Stage 2 (raw string with rationale)
                 designer_output = result.content
@@ -950,7 +972,8 @@ Issues fixed:
                         'timestamp': run_id,
                         'validated_json': validated_json,
                         'history': qa_history,
-                        'iterations_used': len(qa_history)
+                        'iterations_used': len(qa_history),
+                        'rule_fixes': qa.rule_fixes
                     }
                     
                     # Save to file
@@ -968,18 +991,21 @@ Issues fixed:
 
 Design has been validated and corrected through {len(qa_history)} QA iteration(s).
 
+Fixed by design-system rules:
+{chr(10).join(['- ' + fix for fix in qa.rule_fixes]) or 'None'}
+
 Issues fixed:
-{chr(10).join(['- ' + issue for h in qa_history for issue in h.get('issues', [])])}
+{chr(10).join(['- ' + issue for h in qa_history for issue in h.get('issues', [])]) or 'None'}
 
 ---RATIONALE-SEPARATOR---
 
 {json.dumps(validated_json, indent=2)}
 """
                     
-                    # Update the current input for next stage
-                    current_input = formatted_for_engineer
+                    # Update the current input for next stage (layout JSON only)
+                    current_input = handoff.layout(formatted_for_engineer, target_stage=3)
                     
-                    print(f"✅ QA Validation complete: {len(qa_history)} iteration(s) used")
+                    print(f"✅ QA Validation complete: {len(qa_history)} LLM iteration(s) used, {len(qa.rule_fixes)} rule fix(es)")
                 else:
                     # QA failed, continue with original designer output
                     print(f"⚠️ QA Validation skipped: {len(qa_history)} iteration(s) attempted")
@@ -990,7 +1016,7 @@ Issues fixed:
         initial_json_str = self.extract_json_from_response(initial_json_str)
         
         try:
-            initial_json = json.loads(initial_json_str)
+            initial_json = self.postprocess_figma_json(json.loads(initial_json_str))
             
             # Save original JSON
             figma_ready_dir = Path("figma-ready")
@@ -1000,16 +1026,13 @@ Issues fixed:
                 json.dump(initial_json, f, indent=2)
             print(f"💾 Original JSON saved: {original_json_file}")
             
-            # Create screenshot request
-            screenshot_request_file = self.create_screenshot_request(run_id, json.dumps(initial_json, indent=2))
-            
-            # Wait for screenshot
-            screenshot_path = self.wait_for_screenshot(run_id)
+            # Screenshot from the Figma plugin, or rendered locally for unattended runs
+            screenshot_path = self.get_screenshot(run_id, initial_json)
             
             if screenshot_path:
                 # Stage 4: Visual UX Designer
                 # Prepare input data for Visual UX Designer with proper formatting
-                visual_input = f"{results['stage_1'].content}\n\n---\n\n{results['stage_2'].content}"
+                visual_input = handoff.visual_input(results['stage_1'].content, results['stage_2'].content)
                 
                 result_4 = await self.run_alt_stage(4, visual_input, run_id, visual_refs, screenshot_path)
                 results["stage_4"] = result_4
@@ -1023,7 +1046,7 @@ Issues fixed:
                 improved_json_str = self.extract_json_from_response(improved_json_str)
                 
                 try:
-                    improved_json = json.loads(improved_json_str)
+                    improved_json = self.postprocess_figma_json(json.loads(improved_json_str))
                     
                     # Save improved JSON (this replaces the original)
                     final_json_file = figma_ready_dir / f"figma_ready_{run_id}.json"
@@ -1061,6 +1084,7 @@ Issues fixed:
             "total_stages": total_stages,
             "ai_enabled": bool(self.gemini_client),
             "visual_feedback_enabled": total_stages > 3,
+            "handoff": self.save_handoff_report(handoff, run_id),
             "results": {k: asdict(v) for k, v in results.items()}
         }
         
@@ -1071,34 +1095,136 @@ Issues fixed:
             "summary": summary
         }
     
+    def prepare_handoff(self, handoff: StageHandoff, stage_num: int, content: str) -> str:
+        """Compact a stage's output down to the sections the next stage consumes"""
+        if stage_num == 1:
+            return handoff.requirements(content, target_stage=2)
+        if stage_num == 2:
+            return handoff.layout(content, target_stage=3)
+        return content
+    
+    def save_handoff_report(self, handoff: StageHandoff, run_id: str) -> Dict[str, Any]:
+        """Save per-stage handoff token savings next to the stage outputs"""
+        report = handoff.report()
+        report_file = self.output_dir / f"alt3_{run_id}_handoff_report.json"
+        with open(report_file, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✂️ Handoff compaction saved ~{report['total_tokens_saved']} tokens: {report_file}")
+        return report
+    
+    def postprocess_figma_json(self, figma_json: Any) -> Any:
+        """Deterministic fixes applied to figma-ready JSON before it is saved (best effort, never raises)"""
+        snapshot = getattr(self, 'design_system_snapshot', None) or get_registry().latest("design-system")
+        
+        # Every fix and check that only needs the tree shares one iterative walk, run per node in
+        # this order; a visitor that raises is logged and dropped instead of costing the output
+        def report_error(visitor, node, error):
+            print(f"⚠️ Post-processing step '{visitor.__qualname__}' failed at {node.path}, skipped: {error}")
+        walker = TreeWalker(on_error=report_error)
+        
+        def register(build):
+            try:
+                return build().register(walker)
+            except Exception as e:
+                print(f"⚠️ Post-processing step setup failed, skipped: {e}")
+                return None
+        
+        # Layout metadata and sizing rules need no design system
+        normalizer = register(LayoutNormalizer)
+        components = icons = colors = contrast = text = None
+        if snapshot is not None:
+            # Hallucinated component ids / names -> closest real component (n-gram + edit distance index)
+            components = register(lambda: ComponentResolver(get_component_index(snapshot)))
+            # Guessed iconSwaps names -> full icon names the plugin matches exactly
+            icons = register(lambda: IconResolver(get_icon_index(snapshot)))
+            # Raw hex colors / style ids -> valid color style names, one vectorized query after the walk
+            colors = register(lambda: ColorSnapper(get_color_index(snapshot)))
+            # Contrast is checked against the precomputed style matrix instead of an LLM QA pass
+            contrast = register(lambda: ContrastChecker(get_contrast_matrix(snapshot), snapshot.text_styles_by_name))
+            # Text wrapping / truncation predicted from the text styles' font metrics, no screenshot needed
+            text = register(lambda: TextChecker(get_text_fitter(snapshot)))
+        
+        def walk():
+            walker.walk(figma_json)
+            if normalizer and normalizer.changes:
+                print(f"📐 Normalized layout: {summarize_changes(normalizer.changes)}")
+            for correction in components.corrections if components else ():
+                print(f"🧩 Resolved {correction['path']}: {correction['from']} -> {correction['to']} "
+                      f"({correction['name']}, score {correction['score']}, {correction['reason']})")
+            for result in icons.results if icons else ():
+                if result['to']:
+                    print(f"🔣 Icon {result['path']}: {result['from']} -> {result['to']} ({result['reason']})")
+                else:
+                    print(f"⚠️ Icon {result['path']}: no icon matches {result['from']!r}")
+        
+        def snap_colors():
+            for correction in colors.finish():
+                print(f"🎨 Snapped {correction['path']}: {correction['from']} -> {correction['to']}")
+        
+        def check_contrast():
+            # Reads the colors snap_colors left
+            for issue in contrast.finish():
+                print(f"⚠️ Low contrast {issue['path']}: {issue['color']} on {issue['background']} "
+                      f"= {issue['ratio']}:1 (needs {issue['required']}:1), suggested {issue['suggestion']}")
+        
+        def check_text():
+            _, text_issues = text.finish()
+            for issue in text_issues:
+                print(f"✂️ Text {issue['rule']} {issue['path']}: {issue['message']}")
+        
+        def layout():
+            # Bounds of every node from a local auto-layout pass: overflow and clipping without a screenshot
+            _, layout_issues = check_layout(figma_json, snapshot, get_text_fitter(snapshot) if snapshot is not None else None)
+            for issue in layout_issues:
+                print(f"📦 Layout {issue['rule']} {issue['path']}: {issue['message']}")
+        
+        def schema():
+            # Whatever is still malformed after the fixes (compiled schema check, microseconds)
+            for issue in validate_figma_json(figma_json):
+                print(f"⚠️ Schema {issue}")
+        
+        steps = [walk]
+        steps += [step for step, visitor in ((snap_colors, colors), (check_contrast, contrast), (check_text, text))
+                  if visitor is not None]
+        steps += [layout, schema]
+        for step in steps:
+            try:
+                step()
+            except Exception as e:
+                print(f"⚠️ Post-processing step '{step.__name__}' failed, skipped: {e}")
+        return figma_json
+    
     def extract_json_from_response(self, response_str: str) -> str:
         """Extract JSON from AI response, handling various formats"""
-        # Handle rationale separator format
-        if "---RATIONALE-SEPARATOR---" in response_str:
-            parts = response_str.split("---RATIONALE-SEPARATOR---")
-            if len(parts) >= 2:
-                response_str = parts[1].strip()
-        elif "---RATIONALE_SEPARATOR---" in response_str:
-            parts = response_str.split("---RATIONALE_SEPARATOR---")
-            if len(parts) >= 2:
-                response_str = parts[1].strip()
-        
-        # Extract JSON from markdown code blocks
-        match = re.search(r'```json\n(.*)\n```', response_str, re.DOTALL)
-        if match:
-            response_str = match.group(1)
-            
-        return response_str.strip()
+        # First complete JSON value after the rationale separator / code fence
+        json_str = extract_json_text(response_str)
+        try:
+            json.loads(json_str)
+            return json_str
+        except json.JSONDecodeError:
+            pass
+        
+        # Comments, trailing commas, bad escapes, truncated tail: repair without guessing at structure
+        try:
+            parsed, repairs = parse_json_tolerant(json_str)
+        except ValueError as e:
+            print(f"⚠️ JSON repair failed: {e}")
+            return json_str
+        print(f"🔧 Repaired JSON: {format_repairs(repairs)}")
+        return json.dumps(parsed, indent=2, ensure_ascii=False)
 
 
 class HTTPServer:
     """HTTP Server for Figma Plugin Integration"""
     
-    def __init__(self, api_key: Optional[str] = None, port: int = 8000):
+    def __init__(self, api_key: Optional[str] = None, port: int = 8000,
+                 design_system_cache_mb: int = DEFAULT_MEMORY_BUDGET_MB):
         self.app = Flask(__name__)
         CORS(self.app)  # Enable CORS for Figma plugin
         self.port = port
         self.pipeline = Alternative3StagePipeline(api_key)
+        # Design systems of every library this server works with, keyed by content hash
+        self.design_systems = DesignSystemCache(design_system_cache_mb)
         self.setup_routes()
     
     def setup_routes(self):
@@ -1118,10 +1244,30 @@ class HTTPServer:
                 # Create a fresh pipeline instance for this request
                 fresh_pipeline = Alternative3StagePipeline(self.pipeline.api_key)
                 
-                # Use live design system data if provided
+                # Use live design system data if provided; once the server holds a
+                # payload the plugin can send just its hash
+                snapshot = None
                 if 'design_system_data' in data:
-                    fresh_pipeline.live_design_system_data = data['design_system_data']
-                    print(f"📊 Using live design system data: {len(data['design_system_data'])} components")
+                    snapshot = self.design_systems.add(data['design_system_data'])
+                    print(f"📊 Received live design system data (hash {snapshot.content_hash[:12]})")
+                elif 'design_system_hash' in data:
+                    snapshot = self.design_systems.get(data['design_system_hash'])
+                    if snapshot is None:
+                        return jsonify({
+                            "error": "Unknown design_system_hash, resend design_system_data",
+                            "design_system_missing": True
+                        }), 409
+                    print(f"📊 Using cached live design system data (hash {snapshot.content_hash[:12]})")
+                elif 'design_system_file' in data:
+                    # A specific export from design-system/ instead of whatever is newest
+                    design_system_file = os.path.join("design-system", os.path.basename(data['design_system_file']))
+                    try:
+                        snapshot = self.design_systems.add_file(design_system_file)
+                    except FileNotFoundError:
+                        return jsonify({"error": f"Design system file not found: {data['design_system_file']}"}), 404
+                    print(f"📊 Using design system file {design_system_file} (hash {snapshot.content_hash[:12]})")
+                if snapshot is not None:
+                    fresh_pipeline.live_design_system_snapshot = snapshot
                 
                 # Run the pipeline in a new event loop
                 loop = asyncio.new_event_loop()
@@ -1131,6 +1277,8 @@ class HTTPServer:
                     result = loop.run_until_complete(
                         fresh_pipeline.run_all_alt_stages(data['prompt'])
                     )
+                    if snapshot is not None:
+                        result['design_system_hash'] = snapshot.content_hash
                     return jsonify(result)
                 finally:
                     loop.close()
@@ -1138,6 +1286,34 @@ class HTTPServer:
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
         
+        @self.app.route('/api/design-systems', methods=['GET'])
+        def list_design_systems():
+            """Design systems currently held by the server"""
+            return jsonify({"design_systems": self.design_systems.stats()})
+
+        @self.app.route('/api/design-systems/<filename>/components', methods=['GET'])
+        def list_design_system_components(filename):
+            """Component summaries of a design system file, filtered by ?name= / ?type=
+            (memory-mapped: only the map's index is read)"""
+            try:
+                mapped = get_registry().mapped(os.path.join("design-system", os.path.basename(filename)))
+            except FileNotFoundError:
+                return jsonify({"error": f"Design system file not found: {filename}"}), 404
+            components = list(mapped.summaries(request.args.get('name'), request.args.get('type')))
+            return jsonify({"file": filename, "total": len(mapped), "types": mapped.types, "components": components})
+
+        @self.app.route('/api/design-systems/<filename>/components/<component_id>', methods=['GET'])
+        def get_design_system_component(filename, component_id):
+            """One full component record, decoded on demand from the memory-mapped file"""
+            try:
+                mapped = get_registry().mapped(os.path.join("design-system", os.path.basename(filename)))
+            except FileNotFoundError:
+                return jsonify({"error": f"Design system file not found: {filename}"}), 404
+            component = mapped.component(component_id)
+            if component is None:
+                return jsonify({"error": f"Unknown component: {component_id}"}), 404
+            return jsonify(component)
+
         @self.app.route('/api/screenshot-request', methods=['GET'])
         def get_screenshot_request():
             """Check for pending screenshot requests"""
@@ -1197,6 +1373,9 @@ class HTTPServer:
     
     def run(self):
         """Start the HTTP server"""
+        # Pick up new design system exports without waiting for the next request
+        get_manifest("design-system").start_watching()
+        
         print(f"🚀 Starting HTTP Server on http://localhost:{self.port}")
         print(f"🔗 Health check: http://localhost:{self.port}/api/health")
         print(f"📝 Generate API: http://localhost:{self.port}/api/generate")
@@ -1215,10 +1394,16 @@ def main():
     parser.add_argument("--original-prompt", help="Original prompt for modification pipeline")
     parser.add_argument("--modification", help="Modification request for existing UI")
     parser.add_argument("--port", type=int, default=8000, help="Port for HTTP server (default: 8000)")
+    parser.add_argument("--design-system-cache-mb", type=int, default=DEFAULT_MEMORY_BUDGET_MB,
+                       help=f"Memory budget for design systems held by the server (default: {DEFAULT_MEMORY_BUDGET_MB})")
     parser.add_argument("--start-stage", type=int, help="Start stage number (for selective pipeline runs)")
     parser.add_argument("--end-stage", type=int, help="End stage number (for selective pipeline runs)")
     parser.add_argument("--input-file", help="Input file path for custom pipeline stages")
     parser.add_argument("--timestamp", help="Custom timestamp for consistent file naming")
+    parser.add_argument("--screenshot-source", choices=["figma", "local"], default="figma",
+                        help="alt3-visual screenshots: wait for the Figma plugin or render locally (default: figma)")
+    parser.add_argument("--qa-output", choices=list(QA_OUTPUT_MODES), default="json",
+                        help="Stage 2.5 QA response: full fixed JSON or a JSON Patch applied locally (default: json)")
     parser.add_argument("--design-reviewer-mode", action='store_true', 
                        help='Use design-reviewer-json-engineer prompt instead of standard json-engineer')
     
@@ -1253,7 +1438,7 @@ def main():
     
     elif args.stage == "alt3":
         # Alternative 3-stage pipeline
-        alt_runner = Alternative3StagePipeline(api_key, max_qa_loops)
+        alt_runner = Alternative3StagePipeline(api_key, max_qa_loops, qa_output=args.qa_output)
         default_input = "create a login page for a SaaS app"
         
         # 🔥 TESTING: Read from user-request.txt if it exists
@@ -1273,7 +1458,11 @@ def main():
     
     elif args.stage == "alt3-visual":
         # Alternative 5-stage pipeline with visual feedback
-        alt_runner = Alternative3StagePipeline(api_key, max_qa_loops)
+        try:
+            alt_runner = Alternative3StagePipeline(api_key, max_qa_loops, args.screenshot_source, args.qa_output)
+        except ImportError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
         default_input = "create a login page for a SaaS app"
         
         # 🔥 TESTING: Read from user-request.txt if it exists
@@ -1294,7 +1483,7 @@ def main():
     elif args.stage == "alt3" and (args.start_stage or args.end_stage or args.input_file or args.timestamp):
         # Special handling for selective alt3 pipeline runs (for design reviewer)
         async def run_selective_alt3():
-            alt_runner = Alternative3StagePipeline(api_key, max_qa_loops)
+            alt_runner = Alternative3StagePipeline(api_key, max_qa_loops, qa_output=args.qa_output)
             
             # Load input from file if specified
             if args.input_file and os.path.exists(args.input_file):
@@ -1329,7 +1518,7 @@ def main():
     
     elif args.stage.startswith("alt3-"):
         # Single stage from alternative 3-stage pipeline
-        alt_runner = Alternative3StagePipeline(api_key, max_qa_loops)
+        alt_runner = Alternative3StagePipeline(api_key, max_qa_loops, qa_output=args.qa_output)
         stage_num = int(args.stage.split("-")[1])
         if stage_num < 1 or stage_num > 3:
             print("❌ Alt3 stage must be between 1 and 3")
@@ -1354,7 +1543,7 @@ def main():
     
     elif args.stage == "server":
         # HTTP Server for Figma Plugin Integration
-        server = HTTPServer(api_key, args.port)
+        server = HTTPServer(api_key, args.port, args.design_system_cache_mb)
         server.run()
     
     else:
@@ -9,6 +9,7 @@ import asyncio
 import sys
 from pathlib import Path
 from instance import Alternative3StagePipeline
+from scripts.json_extract import extract_json
 
 async def run_stage5(run_id: str):
     """Run stage 5 with stage 4 output"""
@@ -42,13 +43,7 @@ async def run_stage5(run_id: str):
         # Generate final improved JSON
         try:
             # Extract JSON from the content
-            content = result_5.content
-            if content.startswith('```json'):
-                content = content.split('```json')[1].split('```')[0].strip()
-            elif content.startswith('```'):
-                content = content.split('```')[1].split('```')[0].strip()
-            
-            improved_json = json.loads(content)
+            improved_json = pipeline.postprocess_figma_json(extract_json(result_5.content))
             figma_ready_dir = Path("figma-ready")
             figma_ready_dir.mkdir(exist_ok=True)
             final_json_file = figma_ready_dir / f"figma_ready_improved_{run_id}.json"
@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""
+Auto-layout simulator for figma-ready JSON.
+
+Computes the bounding box of every node the way Figma's auto-layout would
+place it, for the subset of auto-layout the figma-ready format uses:
+layoutMode (HORIZONTAL / VERTICAL / NONE), paddings, itemSpacing (numbers
+and 'AUTO'), primary / counter axis alignment and sizing modes, FILL / HUG /
+FIXED sizing, layoutAlign STRETCH, layoutGrow, min / max sizes and absolute
+positioning. The root frame is the viewport: its width (375 by default) and
+minHeight (812), growing with its content like the renderer's root.
+
+Widths are decided top-down (the parent's inner width, shared between
+growing children in rows), heights bottom-up (text is wrapped with
+scripts/text_metrics.py). Snapshots carry no component dimensions, so
+instances get Material 3 default sizes by suggestedType, and hugging ones
+the width of their text.
+
+check_layout() then reports, without rendering anything:
+- overflow    children that need more room than their fixed-size frame has
+- clipped     nodes partly or fully outside the frame that clips them
+              (the topmost one only; frames clip their content)
+- zero-size   nodes laid out with no width or no height
+
+Usage:
+    python scripts/auto_layout.py figma-ready/figma_ready_<run_id>.json [--boxes]
+"""
+
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.figma_schema import CHILD_FIELDS
+from scripts.icon_index import is_icon_component
+from scripts.text_metrics import VIEWPORT_WIDTH, TextFitter, TextStyle, layout_text, text_width
+from scripts.tree_walker import frame_properties
+
+ROOT_MIN_HEIGHT = 812
+# Size of a frame created without one (figma.createFrame())
+DEFAULT_FRAME_SIZE = 100
+# The renderer never gives constrained text less than this
+MIN_TEXT_WIDTH = 100
+CONTAINER_TYPES = ('layoutContainer',)
+RENDERED_TYPES = ('layoutContainer', 'component', 'native-text', 'native-rectangle', 'native-circle')
+
+# suggestedType -> (width, height, horizontal padding); width None: hugs its text
+COMPONENT_SIZES: Dict[str, Tuple[Optional[float], float, float]] = {
+    'icon': (24, 24, 0),
+    'icon-button': (48, 48, 0),
+    'checkbox': (48, 48, 0),
+    'radio': (48, 48, 0),
+    'switch': (52, 32, 0),
+    'badge': (16, 16, 0),
+    'avatar': (40, 40, 0),
+    'rating': (120, 24, 0),
+    'button': (None, 40, 24),
+    'chip': (None, 32, 16),
+    'tab': (None, 48, 16),
+    'tooltip': (None, 24, 8),
+    'text': (None, 20, 0),
+    'input': (280, 56, 16),
+    'select': (280, 56, 16),
+    'searchbar': (360, 56, 16),
+    'list-item': (360, 56, 16),
+    'list': (360, 168, 16),
+    'appbar': (360, 64, 16),
+    'navigation': (360, 80, 0),
+    'snackbar': (344, 48, 16),
+    'card': (360, 120, 16),
+    'dialog': (312, 200, 24),
+    'context-menu': (200, 144, 12),
+    'divider': (360, 1, 0),
+    'chart': (360, 200, 0),
+    'video': (360, 203, 0),
+    'upload': (360, 120, 16),
+    'calendar': (328, 400, 12),
+}
+DEFAULT_COMPONENT_SIZE = (None, 48, 16)
+# Text of instances whose slot has no known style
+COMPONENT_TEXT_SIZE = 14
+
+
+@dataclass
+class Box:
+    path: str
+    type: str
+    name: str
+    x: float
+    y: float
+    width: float
+    height: float
+    # Index of the enclosing box in the layout (-1 for the root)
+    parent: int = -1
+    # The laid out dict
+    node: Optional[Dict[str, Any]] = field(default=None, repr=False, compare=False)
+
+    def right(self) -> float:
+        return self.x + self.width
+
+    def bottom(self) -> float:
+        return self.y + self.height
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'path': self.path, 'type': self.type, 'name': self.name, 'x': round(self.x, 1),
+                'y': round(self.y, 1), 'width': round(self.width, 1), 'height': round(self.height, 1)}
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _clamp(value: float, frame: Dict[str, Any], axis: str) -> float:
+    low, high = _number(frame.get(f"min{axis}")), _number(frame.get(f"max{axis}"))
+    if high is not None:
+        value = min(value, high)
+    if low is not None:
+        value = max(value, low)
+    return value
+
+
+class _Frame:
+    """Auto-layout properties of a container, with the renderer's defaults."""
+
+    __slots__ = ('props', 'mode', 'top', 'bottom', 'left', 'right', 'spacing', 'space_between',
+                 'primary_align', 'counter_align')
+
+    def __init__(self, props: Dict[str, Any]):
+        self.props = props
+        mode = props.get('layoutMode')
+        self.mode = mode if mode in ('HORIZONTAL', 'VERTICAL') else 'NONE'
+        self.top = _number(props.get('paddingTop')) or 0
+        self.bottom = _number(props.get('paddingBottom')) or 0
+        self.left = _number(props.get('paddingLeft')) or 0
+        self.right = _number(props.get('paddingRight')) or 0
+        spacing = props.get('itemSpacing')
+        self.spacing = _number(spacing) or 0
+        self.space_between = spacing == 'AUTO' or props.get('primaryAxisAlignItems') == 'SPACE_BETWEEN'
+        self.primary_align = props.get('primaryAxisAlignItems', 'MIN')
+        self.counter_align = props.get('counterAxisAlignItems', 'MIN')
+
+    def fixed(self, axis: str) -> bool:
+        """Whether the frame keeps its own size on an axis ('Width' / 'Height') instead of hugging."""
+        primary = (self.mode == 'HORIZONTAL') == (axis == 'Width')
+        mode = self.props.get('primaryAxisSizingMode' if primary else 'counterAxisSizingMode')
+        if mode in ('FIXED', 'AUTO'):
+            return mode == 'FIXED' or self.mode == 'NONE'
+        return self.mode == 'NONE' or _number(self.props.get(axis.lower())) is not None
+
+    def size(self, axis: str) -> float:
+        return _number(self.props.get(axis.lower())) or DEFAULT_FRAME_SIZE
+
+
+def _in_flow(item: Any) -> bool:
+    return isinstance(item, dict) and item.get('layoutPositioning') != 'ABSOLUTE'
+
+
+class LayoutEngine:
+    """Lays out figma-ready documents against a design system snapshot (optional)."""
+
+    def __init__(self, snapshot=None, fitter: Optional[TextFitter] = None,
+                 viewport_width: float = VIEWPORT_WIDTH):
+        self.components = snapshot.components_by_id if snapshot is not None else {}
+        self.fitter = fitter
+        self.viewport_width = viewport_width
+
+    # Sizes of leaves
+
+    def text_style(self, properties: Dict[str, Any]) -> TextStyle:
+        if self.fitter is not None:
+            return self.fitter.text_style(properties)
+        return TextStyle.default(properties.get('fontSize'))
+
+    def component_spec(self, node: Dict[str, Any]) -> Tuple[Optional[float], float, float]:
+        component = self.components.get(node.get('componentNodeId')) or {}
+        # 'icon/star' may be typed 'rating', 'icon/videocam' 'video', ...: the name decides
+        kind = 'icon' if component and is_icon_component(component) else component.get('suggestedType')
+        return COMPONENT_SIZES.get(kind, DEFAULT_COMPONENT_SIZE)
+
+    def component_size(self, node: Dict[str, Any]) -> Tuple[float, float]:
+        width, height, padding = self.component_spec(node)
+        if width is None:
+            widths = [text_width(text, style) for text, style in self.component_texts(node)]
+            width = max(widths, default=24) + 2 * padding
+        return width, height
+
+    def component_texts(self, node: Dict[str, Any]) -> List[Tuple[str, TextStyle]]:
+        """Text properties of an instance, each with the text style of its slot."""
+        slots = self.fitter.slots.get(node.get('componentNodeId'), {}) if self.fitter is not None else {}
+        properties = node.get('properties') if isinstance(node.get('properties'), dict) else {}
+        texts = []
+        for key, value in properties.items():
+            # Sizing keys written into properties are not text
+            if isinstance(value, str) and value.strip() and key not in CHILD_FIELDS:
+                slot = slots.get(str(key).strip().lower().replace(' ', '-'))
+                texts.append((value, slot[1] if slot else TextStyle.default(COMPONENT_TEXT_SIZE)))
+        return texts
+
+    def hug_width(self, node: Dict[str, Any], cache: Dict[int, float]) -> float:
+        """Width a node takes when nothing stretches it."""
+        cached = cache.get(id(node))
+        if cached is not None:
+            return cached
+        node_type = node.get('type')
+        properties = node.get('properties') if isinstance(node.get('properties'), dict) else {}
+        if node_type == 'native-text':
+            content = properties.get('content')
+            style = self.text_style(properties)
+            width = max((text_width(line.upper() if style.upper else line, style)
+                         for line in content.split('\n')), default=0.0) if isinstance(content, str) else 0.0
+        elif node_type in ('native-rectangle', 'native-circle'):
+            width = _number(properties.get('width')) or _number(node.get('width')) or DEFAULT_FRAME_SIZE
+        elif node_type == 'component':
+            width = _number(node.get('width')) or self.component_size(node)[0]
+        elif node_type in CONTAINER_TYPES or node_type is None:
+            frame = _Frame(frame_properties(node))
+            if frame.fixed('Width'):
+                width = frame.size('Width')
+            else:
+                children = [self.hug_width(item, cache) for item in self._items(node) if _in_flow(item)]
+                if frame.mode == 'HORIZONTAL':
+                    content = sum(children) + frame.spacing * max(len(children) - 1, 0)
+                else:
+                    content = max(children, default=0.0)
+                width = _clamp(content + frame.left + frame.right, frame.props, 'Width')
+        else:
+            width = 0.0
+        cache[id(node)] = width
+        return width
+
+    @staticmethod
+    def _items(node: Dict[str, Any]) -> List[Any]:
+        items = node.get('items')
+        if not isinstance(items, list):
+            wrapper = node.get('layoutContainer')
+            items = wrapper.get('items') if isinstance(wrapper, dict) and node.get('type') != 'layoutContainer' else []
+        return items if isinstance(items, list) else []
+
+    # Layout
+
+    def layout(self, document: Dict[str, Any]) -> List[Box]:
+        """Boxes of every node in document order, in absolute viewport coordinates."""
+        boxes: List[Box] = []
+        hug: Dict[int, float] = {}
+        root = frame_properties(document)
+        width = _number(root.get('width')) or self.viewport_width
+        self._container(document, '$' if 'items' in document or document.get('type') == 'layoutContainer'
+                        else '$.layoutContainer', -1, width, None, boxes, hug, root=True)
+        # Children were placed relative to their parents; parents always precede them
+        for box in boxes:
+            if box.parent >= 0:
+                box.x += boxes[box.parent].x
+                box.y += boxes[box.parent].y
+        return boxes
+
+    def _container(self, node: Dict[str, Any], path: str, parent: int, width: float, height: Optional[float],
+                   boxes: List[Box], hug: Dict[int, float], root: bool = False) -> float:
+        """Lay out a frame of the given width (and height, if its parent decides it); returns its height."""
+        props = frame_properties(node)
+        frame = _Frame(props)
+        index = len(boxes)
+        boxes.append(Box(path if not root else '$', node.get('type') or 'root', str(props.get('name', '')),
+                         0.0, 0.0, width, 0.0, parent, node))
+        inner_width = width - frame.left - frame.right
+        items_path = '$.layoutContainer' if path.endswith('.layoutContainer') else path
+        children = [(item, f"{items_path}.items[{i}]") for i, item in enumerate(self._items(node))
+                    if isinstance(item, dict)]
+        flow = [(item, item_path) for item, item_path in children if _in_flow(item)]
+
+        # Widths: the inner width in columns, shared between growing children in rows
+        widths: Dict[int, float] = {}
+        stretch: Dict[int, bool] = {}
+        if frame.mode == 'HORIZONTAL':
+            growing = []
+            used = frame.spacing * max(len(flow) - 1, 0) if not frame.space_between else 0.0
+            for item, _ in flow:
+                stretch[id(item)] = item.get('layoutAlign') == 'STRETCH' or item.get('horizontalSizing') == 'FILL' \
+                    or (item.get('type') == 'native-text' and item.get('_useFlexFill') is True)
+                if self._grows(item):
+                    growing.append(item)
+                else:
+                    widths[id(item)] = self._own_width(item, inner_width, hug)
+                    used += widths[id(item)]
+            for item in growing:
+                widths[id(item)] = max((inner_width - used) / len(growing), 0.0)
+        else:
+            for item, _ in flow:
+                stretch[id(item)] = frame.mode == 'VERTICAL' and self._stretches(item)
+                widths[id(item)] = inner_width if stretch[id(item)] else self._own_width(item, inner_width, hug)
+
+        # Heights bottom-up, children placed relative to this frame
+        placed: List[Tuple[int, Dict[str, Any]]] = []
+        for item, item_path in children:
+            item_width = widths.get(id(item)) or self._own_width(item, inner_width, hug)
+            placed.append((self._node(item, item_path, index, item_width, boxes, hug), item))
+
+        in_flow = [(box_index, item) for box_index, item in placed if _in_flow(item)]
+        sizes = [boxes[box_index] for box_index, _ in in_flow]
+        if frame.mode == 'HORIZONTAL':
+            content_height = max((box.height for box in sizes), default=0.0)
+        elif frame.mode == 'VERTICAL':
+            content_height = sum(box.height for box in sizes) + \
+                (frame.spacing * max(len(sizes) - 1, 0) if not frame.space_between else 0.0)
+        else:
+            content_height = max((box.bottom() for box in sizes), default=0.0)
+
+        if root:
+            own_height = max(content_height + frame.top + frame.bottom,
+                             _number(props.get('minHeight')) or ROOT_MIN_HEIGHT)
+        elif height is not None:
+            own_height = height
+        elif frame.fixed('Height'):
+            own_height = frame.size('Height')
+        else:
+            own_height = _clamp(content_height + frame.top + frame.bottom, props, 'Height')
+        boxes[index].height = own_height
+        inner_height = own_height - frame.top - frame.bottom
+
+        if frame.mode == 'HORIZONTAL':
+            for box_index, item in in_flow:
+                if stretch.get(id(item)):
+                    boxes[box_index].height = inner_height
+            self._arrange(sizes, 'x', 'width', frame.left, inner_width, frame)
+            self._cross(sizes, 'y', 'height', frame.top, inner_height, frame.counter_align)
+        elif frame.mode == 'VERTICAL':
+            self._arrange(sizes, 'y', 'height', frame.top, inner_height, frame)
+            self._cross(sizes, 'x', 'width', frame.left, inner_width, frame.counter_align)
+        for box_index, item in placed:
+            if not _in_flow(item) or frame.mode == 'NONE':
+                boxes[box_index].x = _number(item.get('x')) or 0.0
+                boxes[box_index].y = _number(item.get('y')) or 0.0
+        return own_height
+
+    def _node(self, item: Dict[str, Any], path: str, parent: int, width: float,
+              boxes: List[Box], hug: Dict[int, float]) -> int:
+        """Lay out one child at the given width; returns its box index."""
+        item_type = item.get('type')
+        if item_type in CONTAINER_TYPES:
+            index = len(boxes)
+            self._container(item, path, parent, width, None, boxes, hug)
+            return index
+        properties = item.get('properties') if isinstance(item.get('properties'), dict) else {}
+        if item_type == 'native-text':
+            content = properties.get('content')
+            # Empty text still takes one line
+            height = layout_text(content if isinstance(content, str) else '', self.text_style(properties), width).height
+        elif item_type in ('native-rectangle', 'native-circle'):
+            height = _number(properties.get('height')) or _number(item.get('height')) or DEFAULT_FRAME_SIZE
+        elif item_type == 'component':
+            height = _number(item.get('height')) or self.component_size(item)[1]
+        else:
+            # Not rendered
+            width, height = 0.0, 0.0
+        boxes.append(Box(path, item_type or '', str(item.get('name', '')), 0.0, 0.0, width, height, parent, item))
+        return len(boxes) - 1
+
+    def _grows(self, item: Dict[str, Any]) -> bool:
+        if item.get('type') == 'native-text':
+            return item.get('_useFlexFill') is True and item.get('_parentLayout') in (None, 'HORIZONTAL')
+        return item.get('horizontalSizing') == 'FILL' or bool(_number(item.get('layoutGrow')))
+
+    @staticmethod
+    def _stretches(item: Dict[str, Any]) -> bool:
+        if item.get('type') == 'native-text':
+            return item.get('_useFlexFill') is True or item.get('layoutAlign') == 'STRETCH'
+        return item.get('layoutAlign') == 'STRETCH' or item.get('horizontalSizing') == 'FILL'
+
+    def _own_width(self, item: Dict[str, Any], inner_width: float, hug: Dict[int, float]) -> float:
+        if item.get('type') == 'native-text' and item.get('_useFlexFill') is not True:
+            # Constrained text without flex-fill: the renderer sizes it to the container
+            return max(inner_width, MIN_TEXT_WIDTH)
+        if item.get('type') == 'component' and _number(item.get('width')) is None \
+                and self.component_spec(item)[0] is not None:
+            # Default sizes are guesses: assume a fixed-size instance was designed to fit
+            return min(self.hug_width(item, hug), inner_width)
+        return self.hug_width(item, hug)
+
+    @staticmethod
+    def _arrange(boxes: List[Box], position: str, size: str, start: float, room: float, frame: _Frame):
+        """Place boxes along the primary axis."""
+        content = sum(getattr(box, size) for box in boxes)
+        spacing = frame.spacing
+        if frame.space_between:
+            spacing = (room - content) / (len(boxes) - 1) if len(boxes) > 1 else 0.0
+        free = room - content - spacing * max(len(boxes) - 1, 0)
+        offset = start + {'CENTER': free / 2, 'MAX': free}.get(frame.primary_align, 0.0) \
+            if not frame.space_between else start
+        for box in boxes:
+            setattr(box, position, offset)
+            offset += getattr(box, size) + spacing
+
+    @staticmethod
+    def _cross(boxes: List[Box], position: str, size: str, start: float, room: float, align: str):
+        """Place boxes along the counter axis."""
+        for box in boxes:
+            free = room - getattr(box, size)
+            setattr(box, position, start + {'CENTER': free / 2, 'MAX': free}.get(align, 0.0))
+
+
+def visible_regions(boxes: List[Box]) -> List[Tuple[float, float, float, float]]:
+    """(left, top, right, bottom) of each box cut by every frame above it (frames clip their content)."""
+    visible: List[Tuple[float, float, float, float]] = []
+    for box in boxes:
+        if box.parent < 0:
+            visible.append((box.x, box.y, box.right(), box.bottom()))
+            continue
+        left, top, right, bottom = visible[box.parent]
+        visible.append((max(left, box.x), max(top, box.y), min(right, box.right()), min(bottom, box.bottom())))
+    return visible
+
+
+def check_layout(document: Any, snapshot=None, fitter: Optional[TextFitter] = None,
+                 viewport_width: float = VIEWPORT_WIDTH) -> Tuple[List[Box], List[Dict[str, Any]]]:
+    """(boxes, issues) of a figma-ready document."""
+    if not isinstance(document, dict):
+        return [], []
+    boxes = LayoutEngine(snapshot, fitter, viewport_width).layout(document)
+    issues: List[Dict[str, Any]] = []
+    visible = visible_regions(boxes)
+    clipped = set()
+    content: Dict[int, List[float]] = {}
+    for index, box in enumerate(boxes):
+        if box.parent < 0:
+            continue
+        left, top, right, bottom = visible[box.parent]
+        extent = content.setdefault(box.parent, [box.right(), box.bottom()])
+        extent[0], extent[1] = max(extent[0], box.right()), max(extent[1], box.bottom())
+
+        if (box.width < 0.5 or box.height < 0.5) and box.type in RENDERED_TYPES:
+            issues.append({'rule': 'zero-size', 'path': box.path,
+                           'message': f"{box.type} laid out at {box.width:.0f}x{box.height:.0f}px"})
+        if box.parent in clipped:
+            clipped.add(index)
+            continue
+        shown_width = max(min(right, box.right()) - max(left, box.x), 0.0)
+        shown_height = max(min(bottom, box.bottom()) - max(top, box.y), 0.0)
+        if box.width >= 0.5 and box.height >= 0.5 and \
+                (shown_width < box.width - 0.5 or shown_height < box.height - 0.5):
+            clipped.add(index)
+            hidden = 'fully' if shown_width * shown_height == 0 else 'partly'
+            issues.append({'rule': 'clipped', 'path': box.path,
+                           'message': f"{box.type} at ({box.x:.0f}, {box.y:.0f}) {box.width:.0f}x{box.height:.0f}px "
+                                      f"is {hidden} outside the visible {right - left:.0f}x{bottom - top:.0f}px"})
+
+    for index, (right, bottom) in content.items():
+        frame = boxes[index]
+        excess_x, excess_y = right - frame.right(), bottom - frame.bottom()
+        if excess_x > 0.5 or excess_y > 0.5:
+            axis = ', '.join(f"{excess:.0f}px too {name}" for excess, name in
+                             ((excess_x, 'wide'), (excess_y, 'tall')) if excess > 0.5)
+            issues.append({'rule': 'overflow', 'path': frame.path,
+                           'message': f"content of the {frame.width:.0f}x{frame.height:.0f}px frame is {axis}"})
+    issues.sort(key=lambda issue: issue['path'])
+    return boxes, issues
+
+
+def main():
+    import argparse
+    import json
+    import time
+    from scripts.design_system_registry import get_registry
+    from scripts.text_metrics import get_text_fitter
+
+    parser = argparse.ArgumentParser(description="Lay out figma-ready JSON and report overflow and clipping")
+    parser.add_argument("file", help="figma-ready JSON")
+    parser.add_argument("--width", type=float, default=VIEWPORT_WIDTH, help="Viewport width")
+    parser.add_argument("--boxes", action="store_true", help="Print the box of every node")
+    args = parser.parse_args()
+
+    snapshot = get_registry().latest()
+    fitter = get_text_fitter(snapshot) if snapshot is not None else None
+    document = json.loads(Path(args.file).read_text(encoding='utf-8'))
+    started = time.perf_counter()
+    boxes, issues = check_layout(document, snapshot, fitter, args.width)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.boxes:
+        for box in boxes:
+            print(f"📦 {box.path}: {box.type} {box.name!r} ({box.x:.0f}, {box.y:.0f}) {box.width:.0f}x{box.height:.0f}")
+    for issue in issues:
+        print(f"⚠️ [{issue['rule']}] {issue['path']}: {issue['message']}")
+    root = boxes[0] if boxes else None
+    size = f"{root.width:.0f}x{root.height:.0f}px" if root else "empty"
+    print(f"{'✅' if not issues else '⚠️'} {len(boxes)} nodes, {size}, {len(issues)} issues ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Nearest-color index over design-system color styles.
+
+Every color style's colorInfo.color is converted to CIE Lab once, so raw hex
+colors emitted by the model can be matched to the perceptually closest style
+for a whole batch with one NumPy broadcast. ColorSnapper uses it to rewrite a
+figma-ready document's color fields to valid style names from a TreeWalker
+pass shared with other checks, without another LLM or QA round trip.
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.tree_walker import Node, TreeWalker
+
+# Figma-ready fields that hold a color style name or a raw color
+COLOR_KEYS = ('color', 'backgroundColor', 'textColor', 'fill', 'borderColor')
+# Fields the plugin only paints from a hex string (native-rectangle / native-circle
+# fill): these are snapped to the style's hex instead of its name
+HEX_ONLY_KEYS = ('fill',)
+
+HEX_PATTERN = re.compile(r'^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})([0-9a-fA-F]{2})?$')
+
+# CIE76 distance above which a raw color is left alone (~ clearly different hue/tone)
+SNAP_MAX_DELTA_E = 10.0
+
+# sRGB (D65) -> XYZ
+_RGB_TO_XYZ = np.array([
+    [0.4124564, 0.3575761, 0.1804375],
+    [0.2126729, 0.7151522, 0.0721750],
+    [0.0193339, 0.1191920, 0.9503041],
+])
+_D65_WHITE = np.array([0.95047, 1.0, 1.08883])
+
+
+def parse_hex(value: str) -> Optional[Tuple[int, int, int]]:
+    """'#1a2b3c' / '1a2b3c' / '#abc' (alpha ignored) -> (r, g, b), or None."""
+    match = HEX_PATTERN.match(value.strip()) if isinstance(value, str) else None
+    if not match:
+        return None
+    digits = match.group(1)
+    if len(digits) == 3:
+        digits = ''.join(c * 2 for c in digits)
+    return int(digits[0:2], 16), int(digits[2:4], 16), int(digits[4:6], 16)
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """(N, 3) array of 0-255 sRGB values -> (N, 3) CIE Lab."""
+    srgb = np.asarray(rgb, dtype=np.float64) / 255.0
+    linear = np.where(srgb <= 0.04045, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    xyz = linear @ _RGB_TO_XYZ.T / _D65_WHITE
+
+    epsilon, kappa = 216 / 24389, 24389 / 27
+    f = np.where(xyz > epsilon, np.cbrt(xyz), (kappa * xyz + 16) / 116)
+    return np.stack([
+        116 * f[:, 1] - 16,
+        500 * (f[:, 0] - f[:, 1]),
+        200 * (f[:, 1] - f[:, 2]),
+    ], axis=1)
+
+
+def _is_translucent(value: str) -> bool:
+    # Styles are opaque; snapping '#00000080' would silently drop its alpha
+    match = HEX_PATTERN.match(value.strip())
+    return bool(match and match.group(2) and match.group(2).lower() != 'ff')
+
+
+class ColorIndex:
+    """
+    Color styles of one snapshot, indexed for batch nearest-style queries.
+
+    Built from a previous index (reuse), only colors that index did not have
+    are converted to Lab.
+    """
+
+    def __init__(self, color_styles: Sequence[Any], reuse: Optional['ColorIndex'] = None):
+        names, rgbs, ids, hexes = [], [], {}, {}
+        for style in color_styles:
+            name = style.get('name')
+            rgb = parse_hex((style.get('colorInfo') or {}).get('color', ''))
+            if not name or rgb is None:
+                continue
+            names.append(name)
+            rgbs.append(rgb)
+            hexes[name] = '#%02x%02x%02x' % rgb
+            if style.get('id'):
+                # Scanner ids carry a trailing comma: 'S:990b...,'
+                ids[style['id'].rstrip(',')] = name
+
+        self.names = names
+        self.name_set = frozenset(names)
+        self.names_by_id = ids
+        self.hex_by_name = hexes
+        self.rgbs = rgbs
+        known = reuse.lab_by_rgb if reuse is not None else {}
+        new_rgbs = [rgb for rgb in dict.fromkeys(rgbs) if rgb not in known]
+        new_lab = rgb_to_lab(np.array(new_rgbs, dtype=np.float64).reshape(-1, 3))
+        self.lab_by_rgb: Dict[Tuple[int, int, int], np.ndarray] = {rgb: known[rgb] for rgb in rgbs if rgb in known}
+        self.lab_by_rgb.update(zip(new_rgbs, new_lab))
+        self.lab = np.array([self.lab_by_rgb[rgb] for rgb in rgbs], dtype=np.float64).reshape(-1, 3)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest(self, colors: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """(style name, delta E) for each hex color; (None, inf) for unparseable input."""
+        results: List[Tuple[Optional[str], float]] = [(None, float('inf'))] * len(colors)
+        parsed = [(i, parse_hex(c)) for i, c in enumerate(colors)]
+        parsed = [(i, rgb) for i, rgb in parsed if rgb is not None]
+        if not parsed or not len(self):
+            return results
+
+        query = rgb_to_lab(np.array([rgb for _, rgb in parsed], dtype=np.float64))
+        # (M, N) distances in one broadcast
+        distances = np.linalg.norm(query[:, None, :] - self.lab[None, :, :], axis=2)
+        best = distances.argmin(axis=1)
+        best_distances = distances[np.arange(len(parsed)), best]
+        for (i, _), style_index, distance in zip(parsed, best, best_distances):
+            results[i] = (self.names[style_index], float(distance))
+        return results
+
+
+def get_color_index(snapshot) -> ColorIndex:
+    """ColorIndex for a DesignSystemSnapshot, built once; a newer scan converts only its new colors."""
+    return snapshot.derived('color_index', lambda: ColorIndex(snapshot.color_styles), ['colorStyles'],
+                            update=lambda new, previous, changes: ColorIndex(new.color_styles, reuse=previous))
+
+
+class ColorSnapper:
+    """
+    Color fields as a TreeWalker visitor; finish() snaps them after the walk.
+
+    Style ids are replaced by their style name, raw hex colors by the nearest
+    style within max_distance, all raw colors of the document in one
+    vectorized query. HEX_ONLY_KEYS get the style's hex rather than its name.
+    Valid names and anything unrecognized are left untouched.
+    """
+
+    def __init__(self, index: ColorIndex, max_distance: float = SNAP_MAX_DELTA_E):
+        self.index = index
+        self.max_distance = max_distance
+        self.corrections: List[Dict[str, Any]] = []
+        self._hex_fields: List[Tuple[Dict[str, Any], str, str, str]] = []
+
+    def register(self, walker: TreeWalker) -> 'ColorSnapper':
+        # Color fields also live in properties / fill dicts, not only on tree nodes
+        walker.register(self.visit, nested=True)
+        return self
+
+    def visit(self, node: Node):
+        index = self.index
+        for key in COLOR_KEYS:
+            value = node.value.get(key)
+            if not isinstance(value, str) or value in index.name_set:
+                continue
+            path = f"{node.path}.{key}"
+            style_name = index.names_by_id.get(value.rstrip(','))
+            if style_name:
+                target = index.hex_by_name[style_name] if key in HEX_ONLY_KEYS else style_name
+                node.value[key] = target
+                self.corrections.append({'path': path, 'from': value, 'to': target, 'reason': 'style id'})
+            elif parse_hex(value) is not None and not _is_translucent(value):
+                self._hex_fields.append((node.value, key, value, path))
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Snap the raw colors found by the walk; returns every correction."""
+        hex_fields, self._hex_fields = self._hex_fields, []
+        matches = self.index.nearest([value for _, _, value, _ in hex_fields])
+        for (node, key, value, path), (style_name, distance) in zip(hex_fields, matches):
+            if not style_name or distance > self.max_distance:
+                continue
+            target = style_name
+            if key in HEX_ONLY_KEYS:
+                target = self.index.hex_by_name[style_name]
+                if parse_hex(value) == parse_hex(target):
+                    continue
+            node[key] = target
+            self.corrections.append({
+                'path': path, 'from': value, 'to': target,
+                'reason': 'nearest color', 'delta_e': round(distance, 2)
+            })
+        return self.corrections
+
+
+def snap_document_colors(document: Any, index: ColorIndex,
+                         max_distance: float = SNAP_MAX_DELTA_E) -> List[Dict[str, Any]]:
+    """
+    Rewrite color fields in a figma-ready document to valid color style names.
+
+    See ColorSnapper. Modifies document in place; returns the corrections.
+    """
+    walker = TreeWalker()
+    snapper = ColorSnapper(index, max_distance).register(walker)
+    walker.walk(document)
+    return snapper.finish()
@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+Fuzzy resolution of component references against a design-system snapshot.
+
+Model output often points at components that do not exist: placeholder ids
+('button-primary-id', 'CompID:Button'), ids from another library, or names
+instead of ids. ComponentIndex matches such a reference to the most likely
+real component using:
+
+- character trigrams of component names and suggestedTypes (inverted index,
+  Dice / containment scores), refined with edit distance for the best few
+- edit distance between id-like references and ids in the same id prefix
+- the node's own variants and text properties, compared with each
+  component's variant options and text slots
+
+Resolutions are cached per reference, so repeated lookups are dictionary hits.
+ComponentResolver applies the index to a figma-ready document as a TreeWalker
+visitor (resolve_document_components() for a walk of its own).
+
+Usage:
+    python scripts/component_index.py <reference> [<reference> ...]
+    python scripts/component_index.py --file figma-ready/figma_ready_<run_id>.json
+"""
+
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from itertools import chain
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.tree_walker import Node, TreeWalker
+
+# Words that carry no meaning in placeholder references
+NOISE_WORDS = frozenset({'id', 'compid', 'comp', 'component', 'placeholder', 'node', 'instance', 'ref'})
+
+ID_PATTERN = re.compile(r'^\d+:\d+$')
+
+# Minimum combined score for a reference to be rewritten
+MIN_SCORE = 0.6
+
+# Containment (candidate name fully inside a longer reference) counts a bit less than a match
+CONTAINMENT_WEIGHT = 0.85
+
+# Candidates kept after trigram scoring, and refined with edit distance
+TEXT_CANDIDATES = 20
+EDIT_DISTANCE_CANDIDATES = 5
+
+# At most one edit per this many characters counts as a typo
+TYPO_RATIO = 4
+
+# A suggestedType is shared by many components, so it counts less than a name
+TYPE_WEIGHT = 0.8
+
+# Signal weights
+TEXT_WEIGHT = 1.0
+VARIANT_WEIGHT = 1.0
+SLOT_WEIGHT = 0.5
+ID_WEIGHT = 0.5
+
+
+def normalize(text: str) -> str:
+    """'CompID:ButtonPrimary' -> 'button primary'."""
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', str(text))
+    words = re.split(r'[^0-9a-z]+', text.lower())
+    return ' '.join(w for w in words if w and w not in NOISE_WORDS)
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    padded = f" {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Edit distance (insert / delete / substitute), bit-parallel (Myers / Hyyrö)."""
+    if not a or not b:
+        return len(a) + len(b)
+    full = (1 << len(a)) - 1
+    last = 1 << (len(a) - 1)
+    match_masks: Dict[str, int] = {}
+    for i, char in enumerate(a):
+        match_masks[char] = match_masks.get(char, 0) | (1 << i)
+
+    positive, negative, distance = full, 0, len(a)
+    for char in b:
+        eq = match_masks.get(char, 0)
+        xv = eq | negative
+        xh = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive = negative | ~(xh | positive)
+        horizontal_negative = positive & xh
+        if horizontal_positive & last:
+            distance += 1
+        elif horizontal_negative & last:
+            distance -= 1
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(xv | horizontal_positive)) & full
+        negative = horizontal_positive & xv & full
+    return distance
+
+
+def edit_similarity(a: str, b: str) -> float:
+    longest = max(len(a), len(b))
+    return 1.0 - levenshtein(a, b) / longest if longest else 1.0
+
+
+@dataclass
+class Resolution:
+    component_id: str
+    name: str
+    score: float
+    reason: str
+
+
+@dataclass
+class _Entry:
+    component_id: str
+    name: str
+    texts: Tuple[str, str]                  # normalized name, normalized suggestedType
+    grams: Tuple[FrozenSet[str], FrozenSet[str]]
+    gram_counts: Tuple[int, int]
+    variants: Dict[str, FrozenSet[str]]     # lowercased property -> lowercased values
+    slots: FrozenSet[str]
+
+
+def _entry(component: Dict[str, Any]) -> _Entry:
+    name = component.get('name', '')
+    suggested_type = normalize(component.get('suggestedType', ''))
+    texts = (normalize(name), '' if suggested_type == 'unknown' else suggested_type)
+    grams = tuple(trigrams(t) if t else frozenset() for t in texts)
+    variant_options = component.get('variantOptions') or component.get('variantDetails') or {}
+    slot_names = component.get('textSlots') or component.get('textLayers') or ()
+    return _Entry(
+        component_id=component['id'],
+        name=name,
+        texts=texts,
+        grams=grams,
+        gram_counts=(len(grams[0]), len(grams[1])),
+        variants={str(p).lower(): frozenset(str(v).lower() for v in values)
+                  for p, values in variant_options.items()},
+        slots=frozenset(key for slot in slot_names
+                        for key in (str(slot).lower(), str(slot).lower().replace(' ', '-'))),
+    )
+
+
+class ComponentIndex:
+    """
+    Component ids, names and types of one snapshot, indexed for fuzzy lookup.
+
+    Built from a previous index (reuse), the entries of components whose ids
+    are not in changed are taken over instead of being normalized again.
+    """
+
+    def __init__(self, components: Sequence[Any], reuse: Optional['ComponentIndex'] = None,
+                 changed: FrozenSet[str] = frozenset()):
+        self.entries: List[_Entry] = []
+        self._position_by_id: Dict[str, int] = {}
+        # trigram -> [(entry, 0 for name / 1 for type)]
+        self._by_gram: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._by_variant: Dict[str, List[int]] = defaultdict(list)
+        self._by_id_prefix: Dict[str, List[int]] = defaultdict(list)
+        self._cache: Dict[Any, Optional[Resolution]] = {}
+        self._lock = threading.Lock()
+
+        for component in components:
+            component_id = component.get('id')
+            if not component_id or component_id in self._position_by_id:
+                continue
+            previous = reuse._position_by_id.get(component_id) if reuse is not None else None
+            if previous is not None and component_id not in changed:
+                entry = reuse.entries[previous]
+            else:
+                entry = _entry(component)
+
+            position = len(self.entries)
+            self.entries.append(entry)
+            self._position_by_id[component_id] = position
+            for field, field_grams in enumerate(entry.grams):
+                for gram in field_grams:
+                    self._by_gram[gram].append((position, field))
+            for prop in entry.variants:
+                self._by_variant[prop].append(position)
+            self._by_id_prefix[component_id.split(':')[0]].append(position)
+
+        self.ids = frozenset(self._position_by_id)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def resolve(self, reference: Any, variants: Optional[Dict[str, Any]] = None,
+                properties: Optional[Dict[str, Any]] = None, min_score: float = MIN_SCORE) -> Optional[Resolution]:
+        """
+        Most likely component for an invalid reference, or None below min_score.
+
+        variants / properties are the referencing node's own fields; they make
+        ids from another library resolvable by the shape of the component.
+        """
+        reference = '' if reference is None else str(reference)
+        if reference in self._position_by_id:
+            return Resolution(reference, self.entries[self._position_by_id[reference]].name, 1.0, 'exact id')
+
+        variant_keys = {str(p).lower(): str(v).lower() for p, v in (variants or {}).items()}
+        text_keys = frozenset(str(k).lower() for k, v in (properties or {}).items() if isinstance(v, str))
+        cache_key = (reference, tuple(sorted(variant_keys.items())), text_keys, min_score)
+        with self._lock:
+            if cache_key in self._cache:
+                return self._cache[cache_key]
+
+        resolution = self._resolve(reference, variant_keys, text_keys, min_score)
+        with self._lock:
+            self._cache[cache_key] = resolution
+        return resolution
+
+    def resolve_node(self, node: Dict[str, Any], min_score: float = MIN_SCORE) -> Optional[Resolution]:
+        """
+        Component a figma-ready component node refers to, or None below min_score.
+
+        The reference is componentNodeId, falling back to componentId. The node
+        needs componentNodeId set whenever the result's component_id differs
+        from it (including a valid componentId with no componentNodeId).
+        """
+        reference = node.get('componentNodeId') or node.get('componentId')
+        if not reference:
+            return None
+        variants = node.get('variants') if isinstance(node.get('variants'), dict) else None
+        properties = node.get('properties') if isinstance(node.get('properties'), dict) else None
+        return self.resolve(reference, variants, properties, min_score)
+
+    def _text_scores(self, query: str) -> Dict[int, Tuple[float, float]]:
+        """(text score, name score) of the best TEXT_CANDIDATES components for a normalized query."""
+        query_grams = trigrams(query)
+        # Shared trigrams per (entry, field), counted in C
+        common = Counter(chain.from_iterable(self._by_gram.get(gram, ()) for gram in query_grams))
+
+        name_scores: Dict[int, float] = {}
+        type_scores: Dict[int, float] = {}
+        for (position, field), count in common.items():
+            size = self.entries[position].gram_counts[field]
+            score = 2 * count / (len(query_grams) + size)
+            if field == 0:
+                # A whole component name inside a longer reference ('contact-seller-button')
+                name_scores[position] = max(score, CONTAINMENT_WEIGHT * count / size)
+            else:
+                type_scores[position] = score
+
+        # Only the strongest candidates are scored further
+        scores = {position: max(name_scores.get(position, 0.0), TYPE_WEIGHT * type_scores.get(position, 0.0))
+                  for position in set(name_scores) | set(type_scores)}
+        top = sorted(scores, key=lambda p: (scores[p], name_scores.get(p, 0.0)), reverse=True)[:TEXT_CANDIDATES]
+
+        # Edit distance only for the best few names (it is the expensive part)
+        best = max((scores[p] for p in top), default=1.0)
+        for position in top[:EDIT_DISTANCE_CANDIDATES]:
+            name = self.entries[position].texts[0]
+            # The length difference alone bounds the similarity; skip names that cannot take the lead
+            longest = max(len(query), len(name), 1)
+            if min(len(query), len(name)) / longest > best:
+                distance = levenshtein(query, name)
+                # Typos only: a few edits apart ('Buton'); larger distances match unrelated words
+                if distance <= max(1, longest // TYPO_RATIO):
+                    name_scores[position] = max(name_scores.get(position, 0.0), 1.0 - distance / longest)
+                    scores[position] = max(scores[position], name_scores[position])
+                    best = max(best, scores[position])
+        return {position: (scores[position], name_scores.get(position, 0.0)) for position in top}
+
+    def _resolve(self, reference: str, variant_keys: Dict[str, str], text_keys: FrozenSet[str],
+                 min_score: float) -> Optional[Resolution]:
+        id_like = bool(ID_PATTERN.match(reference))
+        query = '' if id_like else normalize(reference)
+        text_scores = self._text_scores(query) if query else {}
+
+        # Candidates: shared trigrams, shared variant properties
+        candidates = set(text_scores)
+        for prop in variant_keys:
+            candidates.update(self._by_variant.get(prop, ()))
+        if not candidates:
+            # An id alone says nothing about which component was meant
+            return None
+        id_candidates = frozenset(self._by_id_prefix.get(reference.split(':')[0], ())) if id_like else frozenset()
+
+        scored: List[Tuple[float, int, str]] = []
+        for position in candidates:
+            entry = self.entries[position]
+            signals: List[Tuple[float, float, str]] = []
+            if query:
+                signals.append((text_scores.get(position, (0.0, 0.0))[0], TEXT_WEIGHT, 'name'))
+            if variant_keys:
+                props = [p for p in variant_keys if p in entry.variants]
+                values = [p for p in props if variant_keys[p] in entry.variants[p]]
+                signals.append(((len(props) + len(values)) / (2 * len(variant_keys)), VARIANT_WEIGHT, 'variants'))
+            if text_keys and entry.slots:
+                signals.append((len(text_keys & entry.slots) / len(text_keys), SLOT_WEIGHT, 'text slots'))
+            if id_candidates:
+                id_score = edit_similarity(reference, entry.component_id) if position in id_candidates else 0.0
+                signals.append((id_score, ID_WEIGHT, 'id'))
+            score = sum(s * w for s, w, _ in signals) / sum(w for _, w, _ in signals)
+            reason = '+'.join(label for s, _, label in signals if s > 0) or 'none'
+            scored.append((score, position, reason))
+
+        # Highest score; ties go to the closer name, the shorter (more generic) name, then the id
+        scored.sort(key=lambda s: (-s[0], -text_scores.get(s[1], (0.0, 0.0))[1],
+                                   len(self.entries[s[1]].name), self.entries[s[1]].component_id))
+        score, position, reason = scored[0]
+        if score < min_score:
+            return None
+        entry = self.entries[position]
+        return Resolution(entry.component_id, entry.name, round(score, 3), reason)
+
+
+def get_component_index(snapshot) -> ComponentIndex:
+    """ComponentIndex for a DesignSystemSnapshot, built once; a newer scan re-indexes only its changed components."""
+    return snapshot.derived(
+        'component_index', lambda: ComponentIndex(snapshot.components), ['components'],
+        update=lambda new, previous, changes: ComponentIndex(new.components, reuse=previous,
+                                                             changed=frozenset(changes.components.changed_keys()))
+    )
+
+
+class ComponentResolver:
+    """
+    Invalid componentNodeId references as a TreeWalker visitor; corrections accumulate in .corrections.
+
+    A component node without componentNodeId falls back to its componentId,
+    which is copied into componentNodeId when valid (as DesignRules does).
+    References that cannot be resolved above min_score are left as they are.
+    """
+
+    def __init__(self, index: ComponentIndex, min_score: float = MIN_SCORE):
+        self.index = index
+        self.min_score = min_score
+        self.corrections: List[Dict[str, Any]] = []
+
+    def register(self, walker: TreeWalker) -> 'ComponentResolver':
+        walker.register(self.visit, types=('component',), nested=True)
+        return self
+
+    def visit(self, node: Node):
+        value = node.value
+        if value.get('componentNodeId') in self.index.ids:
+            return
+        reference = value.get('componentNodeId') or value.get('componentId')
+        resolution = self.index.resolve_node(value, self.min_score)
+        if resolution:
+            value['componentNodeId'] = resolution.component_id
+            self.corrections.append({
+                'path': f"{node.path}.componentNodeId", 'from': reference, 'to': resolution.component_id,
+                'name': resolution.name, 'score': resolution.score, 'reason': resolution.reason
+            })
+
+
+def resolve_document_components(document: Any, index: ComponentIndex,
+                                min_score: float = MIN_SCORE) -> List[Dict[str, Any]]:
+    """
+    Rewrite invalid componentNodeId references in a figma-ready document.
+
+    See ComponentResolver. Modifies document in place; returns the corrections.
+    """
+    walker = TreeWalker()
+    resolver = ComponentResolver(index, min_score).register(walker)
+    walker.walk(document)
+    return resolver.corrections
+
+
+def main():
+    import argparse
+    import json
+    import time
+    from scripts.design_system_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Resolve component references against the design system")
+    parser.add_argument("references", nargs="*", help="Component ids or names to resolve")
+    parser.add_argument("--file", help="figma-ready JSON to resolve in place (printed, not saved)")
+    args = parser.parse_args()
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("❌ No design system snapshot found")
+        sys.exit(1)
+    index = get_component_index(snapshot)
+
+    for reference in args.references:
+        started = time.perf_counter()
+        resolution = index.resolve(reference)
+        elapsed = (time.perf_counter() - started) * 1e6
+        if resolution:
+            print(f"🧩 {reference} -> {resolution.component_id} ({resolution.name}, "
+                  f"score {resolution.score}, {resolution.reason}) {elapsed:.0f} µs")
+        else:
+            print(f"❓ {reference}: no component above {MIN_SCORE} ({elapsed:.0f} µs)")
+
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        for correction in resolve_document_components(document, index):
+            print(f"🧩 {correction['path']}: {correction['from']} -> {correction['to']} "
+                  f"({correction['name']}, score {correction['score']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+WCAG contrast checks for figma-ready JSON against design-system color styles.
+
+The contrast ratio of every pair of color styles is precomputed once per
+snapshot (NumPy, kept with the snapshot), so checking a document is a walk
+with table lookups: each native-text color is compared with the nearest
+ancestor background, and failing pairs get the closest color style that
+passes against that background. ContrastChecker does this as a visitor on a
+shared TreeWalker.
+
+Usage:
+    python scripts/contrast_checker.py figma-ready/figma_ready_<run_id>.json
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.color_index import ColorIndex, get_color_index, parse_hex, rgb_to_lab
+from scripts.tree_walker import Node, TreeWalker
+
+# WCAG 2.x AA thresholds
+MIN_CONTRAST_NORMAL = 4.5
+MIN_CONTRAST_LARGE = 3.0
+LARGE_TEXT_SIZE = 24.0        # 18pt
+LARGE_BOLD_TEXT_SIZE = 18.66  # 14pt bold
+BOLD_STYLES = ('bold', 'semibold', 'semi bold', 'extrabold', 'extra bold', 'black', 'heavy')
+
+# Figma frames are white unless a background is set
+DEFAULT_BACKGROUND = '#ffffff'
+
+
+def relative_luminance(rgb: np.ndarray) -> np.ndarray:
+    """(N, 3) array of 0-255 sRGB values -> (N,) WCAG relative luminance."""
+    srgb = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+    linear = np.where(srgb <= 0.03928, srgb / 12.92, ((srgb + 0.055) / 1.055) ** 2.4)
+    return linear @ np.array([0.2126, 0.7152, 0.0722])
+
+
+def contrast_ratios(foreground: np.ndarray, background: np.ndarray) -> np.ndarray:
+    """Elementwise / broadcast contrast ratio between luminance arrays."""
+    lighter = np.maximum(foreground, background)
+    darker = np.minimum(foreground, background)
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+class ContrastMatrix:
+    """
+    Contrast ratio of every color-style pair of one snapshot.
+
+    Built from a previous matrix (reuse), the ratios between colors both
+    snapshots have are copied; only rows and columns of new colors are computed.
+    """
+
+    def __init__(self, index: ColorIndex, color_styles: List[Any], reuse: Optional['ContrastMatrix'] = None):
+        self.index = index
+        hex_by_name = {s.get('name'): (s.get('colorInfo') or {}).get('color', '') for s in color_styles}
+        self.rgbs = [parse_hex(hex_by_name[name]) for name in index.names]
+        self.position = {name: i for i, name in enumerate(index.names)}
+        self.luminance = relative_luminance(np.array(self.rgbs, dtype=np.float64).reshape(-1, 3))
+
+        previous = {rgb: i for i, rgb in reversed(list(enumerate(reuse.rgbs)))} if reuse is not None else {}
+        kept = [i for i, rgb in enumerate(self.rgbs) if rgb in previous]
+        fresh = [i for i, rgb in enumerate(self.rgbs) if rgb not in previous]
+        if not kept:
+            self.matrix = contrast_ratios(self.luminance[:, None], self.luminance[None, :])
+            return
+        self.matrix = np.empty((len(self.rgbs), len(self.rgbs)))
+        source = [previous[self.rgbs[i]] for i in kept]
+        self.matrix[np.ix_(kept, kept)] = reuse.matrix[np.ix_(source, source)]
+        if fresh:
+            # The ratio is symmetric: new rows, mirrored into the new columns
+            rows = contrast_ratios(self.luminance[fresh, None], self.luminance[None, :])
+            self.matrix[fresh, :] = rows
+            self.matrix[:, fresh] = rows.T
+
+    def _luminance_of(self, color: str) -> Optional[float]:
+        if color in self.position:
+            return float(self.luminance[self.position[color]])
+        rgb = parse_hex(color)
+        return float(relative_luminance(np.array(rgb))[0]) if rgb else None
+
+    def ratio(self, foreground: str, background: str) -> Optional[float]:
+        """Contrast ratio of two style names or hex colors, None if either is unknown."""
+        if foreground in self.position and background in self.position:
+            return float(self.matrix[self.position[foreground], self.position[background]])
+        fg, bg = self._luminance_of(foreground), self._luminance_of(background)
+        if fg is None or bg is None:
+            return None
+        return float(contrast_ratios(np.array(fg), np.array(bg)))
+
+    def suggest(self, foreground: str, background: str, min_ratio: float) -> Optional[str]:
+        """Color style closest to foreground (in Lab) that passes against background."""
+        if background in self.position:
+            against_background = self.matrix[:, self.position[background]]
+        else:
+            bg = self._luminance_of(background)
+            if bg is None:
+                return None
+            against_background = contrast_ratios(self.luminance, bg)
+
+        passing = np.flatnonzero(against_background >= min_ratio)
+        if not len(passing):
+            return None
+
+        if foreground in self.position:
+            target = self.index.lab[self.position[foreground]]
+        else:
+            rgb = parse_hex(foreground)
+            if rgb is None:
+                return None
+            target = rgb_to_lab(np.array([rgb], dtype=np.float64))[0]
+        distances = np.linalg.norm(self.index.lab[passing] - target, axis=1)
+        return self.index.names[passing[distances.argmin()]]
+
+
+def get_contrast_matrix(snapshot) -> ContrastMatrix:
+    """ContrastMatrix for a DesignSystemSnapshot, built once; a newer scan computes only its new colors."""
+    return snapshot.derived('contrast_matrix',
+                            lambda: ContrastMatrix(get_color_index(snapshot), snapshot.color_styles),
+                            ['colorStyles'],
+                            update=lambda new, previous, changes: ContrastMatrix(get_color_index(new), new.color_styles,
+                                                                                 reuse=previous))
+
+
+def _background_of(node: Dict[str, Any]) -> Optional[str]:
+    properties = node.get('properties') if isinstance(node.get('properties'), dict) else {}
+    for source in (node, properties):
+        background = source.get('backgroundColor')
+        if isinstance(background, str):
+            return background
+        fill = source.get('fill')
+        if isinstance(fill, str):
+            return fill
+        if isinstance(fill, dict) and isinstance(fill.get('color'), str):
+            return fill['color']
+    return None
+
+
+def _min_ratio_for(text_style: Optional[str], text_styles_by_name) -> float:
+    style = text_styles_by_name.get(text_style) if text_style else None
+    if not style:
+        return MIN_CONTRAST_NORMAL
+    size = style.get('fontSize') or 0
+    weight = ((style.get('fontName') or {}).get('style') or '').lower()
+    if size >= LARGE_TEXT_SIZE or (size >= LARGE_BOLD_TEXT_SIZE and weight in BOLD_STYLES):
+        return MIN_CONTRAST_LARGE
+    return MIN_CONTRAST_NORMAL
+
+
+class ContrastChecker:
+    """
+    Text / background pairs as a TreeWalker visitor; finish() checks them.
+
+    Colors are read in finish(), so a ColorSnapper on the same walk (whose
+    finish() runs first) has already turned raw colors into style names.
+    """
+
+    def __init__(self, matrix: ContrastMatrix, text_styles_by_name: Optional[Dict[str, Any]] = None):
+        self.matrix = matrix
+        self.text_styles_by_name = text_styles_by_name or {}
+        self.issues: List[Dict[str, Any]] = []
+        # id(node) -> the nearest node (itself or an ancestor) that sets a background
+        self._background_nodes: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._texts: List[Tuple[Dict[str, Any], str, Optional[Dict[str, Any]]]] = []
+
+    def register(self, walker: TreeWalker) -> 'ContrastChecker':
+        walker.register(self.visit)
+        return self
+
+    def visit(self, node: Node):
+        value = node.value
+        if _background_of(value):
+            background_node = value
+        else:
+            background_node = self._background_nodes.get(id(node.parent.value)) if node.parent else None
+        self._background_nodes[id(value)] = background_node
+        if value.get('type') == 'native-text' and isinstance(value.get('properties'), dict):
+            self._texts.append((value['properties'], node.path, background_node))
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Low-contrast native-text elements with their background and a suggested style."""
+        matrix = self.matrix
+        for properties, path, background_node in self._texts:
+            color = properties.get('color')
+            if not isinstance(color, str):
+                continue
+            background = (_background_of(background_node) if background_node else None) or DEFAULT_BACKGROUND
+            min_ratio = _min_ratio_for(properties.get('textStyle'), self.text_styles_by_name)
+            ratio = matrix.ratio(color, background)
+            if ratio is not None and ratio < min_ratio:
+                self.issues.append({
+                    'path': path,
+                    'content': properties.get('content', ''),
+                    'color': color,
+                    'background': background,
+                    'ratio': round(ratio, 2),
+                    'required': min_ratio,
+                    'suggestion': matrix.suggest(color, background, min_ratio),
+                })
+        self._texts = []
+        return self.issues
+
+
+def check_document_contrast(document: Any, matrix: ContrastMatrix,
+                            text_styles_by_name: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Low-contrast native-text elements with their background and a suggested style."""
+    walker = TreeWalker()
+    checker = ContrastChecker(matrix, text_styles_by_name).register(walker)
+    walker.walk(document)
+    return checker.finish()
+
+
+def main():
+    import json
+    from scripts.design_system_registry import get_registry
+
+    if len(sys.argv) < 2:
+        print("Usage: python scripts/contrast_checker.py <figma_ready_file.json>")
+        sys.exit(1)
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("❌ No design system snapshot found")
+        sys.exit(1)
+
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        document = json.load(f)
+
+    issues = check_document_contrast(document, get_contrast_matrix(snapshot), snapshot.text_styles_by_name)
+    for issue in issues:
+        print(f"⚠️ {issue['path']} \"{issue['content'][:40]}\": {issue['color']} on {issue['background']} "
+              f"= {issue['ratio']}:1 (needs {issue['required']}:1), try {issue['suggestion']}")
+    print(f"{'✅' if not issues else '❌'} {len(issues)} low-contrast text element(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,52 @@
 import json
 import os
+import re
 from pathlib import Path
 from datetime import datetime
-import re
+
+from scripts.design_rules import check_design
+from scripts.design_system_registry import get_registry
+from scripts.json_extract import extract_json
+from scripts.json_patch import apply_patch, describe_operation, validate_patch
+from scripts.json_repair import extract_json_tolerant, format_repairs
+
+# 'json': the model returns the whole fixed JSON; 'patch': only RFC 6902 operations, applied locally
+QA_OUTPUT_MODES = ('json', 'patch')
+QA_SECTIONS = ('ISSUES-FOUND', 'FIXED-JSON', 'PATCH', 'CHANGES-MADE', 'CHANGE-LOG')
+QA_SECTION_HEADER = re.compile(r'^[ \t]*---(' + '|'.join(QA_SECTIONS) + r')---[ \t]*$', re.MULTILINE)
+QA_PROMPTS = {
+    'json': "src/prompts/roles/alt2-5-design-qa.txt",
+    'patch': "src/prompts/roles/alt2-5-design-qa-patch.txt",
+}
 
 class DesignQA:
-    def __init__(self, gemini_api_key):
-        """Initialize with Gemini API key."""
+    def __init__(self, gemini_api_key, design_system=None, output_mode='json'):
+        """Initialize with Gemini API key and, optionally, the design system snapshot to check against."""
+        if output_mode not in QA_OUTPUT_MODES:
+            raise ValueError(f"Unknown QA output mode: {output_mode} (expected one of {', '.join(QA_OUTPUT_MODES)})")
         self.api_key = gemini_api_key
+        self.design_system = design_system
+        self.output_mode = output_mode
+        # Set by run_qa_loop: what the rule-based pass fixed / left for the LLM (not LLM iterations)
+        self.rule_fixes = []
+        self.rule_issues = []
         # Import here to avoid issues if not installed
         import google.generativeai as genai
         genai.configure(api_key=self.api_key)
         self.model = genai.GenerativeModel('gemini-1.5-flash')
         
     def load_design_system_data(self):
-        """Load the newest design system data file."""
-        design_system_dir = Path("design-system")
-        files = list(design_system_dir.glob("design-system-raw-data-*.json"))
+        """Load the pipeline's design system snapshot, or the newest one (shared, parsed once per process)."""
+        snapshot = self.design_system or get_registry().latest(Path("design-system"))
         
-        if not files:
+        if not snapshot:
             raise FileNotFoundError("No design system files found")
             
-        # Sort by timestamp in filename
-        newest_file = max(files, key=lambda f: f.stem.split('-data-')[1])
-        
-        with open(newest_file, 'r') as f:
-            return json.load(f)
+        return snapshot
     
     def load_qa_prompt(self):
         """Load the QA prompt template."""
-        prompt_path = Path("src/prompts/roles/alt2-5-design-qa.txt")
+        prompt_path = Path(QA_PROMPTS[self.output_mode])
         with open(prompt_path, 'r') as f:
             return f.read()
     
@@ -48,146 +65,66 @@ class DesignQA:
             return designer_output
             
         if isinstance(designer_output, str):
-            # Look for separator patterns
-            separators = [
-                "---RATIONALE-SEPARATOR---",
-                "---JSON-START---",
-                "## DESIGN SPECIFICATION",
-                "```json"
-            ]
-            
-            json_str = designer_output
-            for separator in separators:
-                if separator in designer_output:
-                    # Take everything after the separator
-                    parts = designer_output.split(separator)
-                    json_str = parts[-1] if len(parts) > 1 else parts[0]
-                    break
-            
-            # Clean up markdown if present
-            json_str = json_str.strip()
-            if json_str.startswith("```"):
-                # Extract from markdown code block using regex for all cases
-                match = re.search(r'```(?:json)?\s*\n?(.*?)\n?```', json_str, re.DOTALL)
-                if match:
-                    json_str = match.group(1).strip()
-            
-            # Handle "Extra data" issue - extract just the JSON object
-            if json_str.startswith('{'):
-                # Find the matching closing brace for the main JSON object
-                brace_count = 0
-                json_end = 0
-                for i, char in enumerate(json_str):
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            json_end = i + 1
-                            break
-                
-                if json_end > 0:
-                    json_str = json_str[:json_end]
-            
-            # Parse JSON
+            # First complete JSON value after the separator / code fence, repaired
+            # (comments, trailing commas, bad escapes, truncation) only if it is not strict JSON
             try:
-                return json.loads(json_str)
-            except json.JSONDecodeError as e:
+                parsed, repairs = extract_json_tolerant(designer_output)
+            except ValueError as e:
                 print(f"⚠️ Failed to parse JSON from designer output: {e}")
-                print(f"🔧 Attempting to fix common JSON issues...")
-                
-                # Fix common escape sequence issues
-                fixed_json_str = self.fix_json_escape_issues(json_str)
-                
-                try:
-                    return json.loads(fixed_json_str)
-                except json.JSONDecodeError as e2:
-                    print(f"⚠️ Still failed after fixing escapes: {e2}")
-                    print(f"📝 Problematic JSON snippet (first 500 chars):")
-                    print(f"'{fixed_json_str[:500]}...'")
-                    
-                    # Try one more time with just the curly braces content
-                    match = re.search(r'\{.*\}', fixed_json_str, re.DOTALL)
-                    if match:
-                        try:
-                            return json.loads(match.group(0))
-                        except json.JSONDecodeError as e3:
-                            print(f"❌ Final attempt failed: {e3}")
-                            raise Exception(f"Cannot parse designer JSON output: {e3}")
-                    else:
-                        raise Exception("No JSON object found in designer output")
+                raise Exception(f"Cannot parse designer JSON output: {e}")
+            if repairs:
+                print(f"🔧 Repaired designer JSON: {format_repairs(repairs)}")
+            return parsed
         
         return designer_output
     
-    def fix_json_escape_issues(self, json_str):
-        """Fix common JSON issues that AI models introduce."""
-        fixed_str = json_str
-        
-        # 1. Remove JSON comments (// comments)
-        fixed_str = re.sub(r'//.*?(?=\n|$)', '', fixed_str)
-        
-        # 2. Remove trailing commas before } or ]
-        fixed_str = re.sub(r',(\s*[}\]])', r'\1', fixed_str)
-        
-        # 3. Fix invalid escape sequences in JSON strings
-        escape_fixes = [
-            (r'\\%', r'%'),           # \% -> %
-            (r'\\&', r'&'),           # \& -> &
-            (r'\\\$', r'$'),          # \$ -> $
-            (r'\\#', r'#'),           # \# -> #
-            (r'\\@', r'@'),           # \@ -> @
-        ]
-        
-        for pattern, replacement in escape_fixes:
-            fixed_str = re.sub(pattern, replacement, fixed_str)
-        
-        return fixed_str
-    
     def parse_qa_response(self, response_text):
         """Parse the QA response into components."""
         result = {
             'issues': [],
             'fixed_json': None,
+            'patch': None,
             'changes': [],
             'change_log': []
         }
         
-        # Split by section markers
-        sections = response_text.split('---')
+        # Sections start at an exact ---NAME--- header line; prose mentioning a
+        # section name (or a '---' inside a section) does not start one
+        headers = list(QA_SECTION_HEADER.finditer(response_text))
+        sections = {}
+        for i, header in enumerate(headers):
+            body_end = headers[i+1].start() if i+1 < len(headers) else len(response_text)
+            sections.setdefault(header.group(1), response_text[header.end():body_end].strip())
+        
+        def lines(text):
+            if text == "NONE":
+                return []
+            return [line.strip() for line in text.split('\n') if line.strip()]
+        
+        if 'ISSUES-FOUND' in sections:
+            result['issues'] = lines(sections['ISSUES-FOUND'])
+        
+        if 'FIXED-JSON' in sections:
+            try:
+                # Plain JSON or JSON inside a markdown block
+                result['fixed_json'] = extract_json(sections['FIXED-JSON'])
+            except json.JSONDecodeError:
+                pass
+        
+        if 'PATCH' in sections:
+            # The JSON Patch (validated before it is applied)
+            try:
+                result['patch'] = extract_json(sections['PATCH'])
+            except json.JSONDecodeError:
+                # Kept as text so the loop reports it instead of treating it as "no changes"
+                result['patch'] = sections['PATCH']
+        
+        if 'CHANGES-MADE' in sections:
+            result['changes'] = lines(sections['CHANGES-MADE'])
         
-        for i, section in enumerate(sections):
-            if 'ISSUES-FOUND' in section:
-                # Next section has issues
-                if i+1 < len(sections):
-                    issues_text = sections[i+1].strip()
-                    if issues_text != "NONE":
-                        result['issues'] = [line.strip() for line in issues_text.split('\n') if line.strip()]
-                    
-            elif 'FIXED-JSON' in section:
-                # Next section has JSON
-                if i+1 < len(sections):
-                    json_text = sections[i+1].strip()
-                    try:
-                        result['fixed_json'] = json.loads(json_text)
-                    except json.JSONDecodeError:
-                        # Try to extract JSON from markdown blocks
-                        match = re.search(r'```json\n(.*)\n```', json_text, re.DOTALL)
-                        if match:
-                            result['fixed_json'] = json.loads(match.group(1))
-                        
-            elif 'CHANGES-MADE' in section:
-                # Next section has changes
-                if i+1 < len(sections):
-                    changes_text = sections[i+1].strip()
-                    if changes_text != "NONE":
-                        result['changes'] = [line.strip() for line in changes_text.split('\n') if line.strip()]
-                        
-            elif 'CHANGE-LOG' in section:
-                # Next section has detailed change log
-                if i+1 < len(sections):
-                    log_text = sections[i+1].strip()
-                    if log_text != "NONE":
-                        result['change_log'] = [line.strip() for line in log_text.split('\n') if line.strip()]
+        if 'CHANGE-LOG' in sections:
+            # Detailed change log
+            result['change_log'] = lines(sections['CHANGE-LOG'])
         
         return result
     
@@ -195,12 +132,12 @@ class DesignQA:
         """Run a single QA iteration."""
         # Load prompt and data
         prompt_template = self.load_qa_prompt()
-        design_system_data = self.load_design_system_data()
+        design_system = self.load_design_system_data()
         
         # Fill in the prompt
         prompt = prompt_template.replace(
             "{{DESIGN_SYSTEM_DATA}}", 
-            json.dumps(design_system_data, indent=2)
+            design_system.to_json(indent=2)
         ).replace(
             "{{CURRENT_JSON}}", 
             json.dumps(current_json, indent=2)
@@ -232,17 +169,32 @@ class DesignQA:
         print(f"Starting QA Validation (max {max_iterations} iterations)")
         print(f"{'='*50}")
         
+        # Deterministic checks against the design system first: safe fixes are applied
+        # locally and only what the rules cannot fix goes to the LLM
+        fixed, remaining = check_design(current_json, self.load_design_system_data())
+        for issue in fixed:
+            print(f"🔧 {issue}")
+        self.rule_fixes = [str(issue) for issue in fixed]
+        self.rule_issues = [str(issue) for issue in remaining]
+        if not remaining:
+            print(f"✅ Rule-based QA clean ({len(fixed)} fix(es) applied), skipping LLM QA")
+            return current_json, history
+        print(f"📏 Rule-based QA: {len(fixed)} fixed, {len(remaining)} left for LLM QA")
+        
         for iteration in range(max_iterations):
             print(f"\n📋 QA Iteration {iteration + 1}/{max_iterations}")
             
             # Build history string for prompt
-            history_text = ""
-            if history:
-                history_text = "## Previous Attempts:\n"
-                for h in history:
-                    history_text += f"\n**Iteration {h['iteration']}:**\n"
-                    history_text += f"Issues: {', '.join(h['issues']) if h['issues'] else 'None'}\n"
-                    history_text += f"Changes: {', '.join(h['changes']) if h['changes'] else 'None'}\n"
+            history_text = "## Previous Attempts:\n"
+            history_text += "\n**Rule-based checks (fixed issues are already applied):**\n"
+            history_text += f"Unresolved: {', '.join(self.rule_issues)}\n"
+            history_text += f"Changes: {', '.join(self.rule_fixes) if self.rule_fixes else 'None'}\n"
+            for h in history:
+                history_text += f"\n**Iteration {h['iteration']}:**\n"
+                history_text += f"Issues: {', '.join(h['issues']) if h['issues'] else 'None'}\n"
+                history_text += f"Changes: {', '.join(h['changes']) if h['changes'] else 'None'}\n"
+                if h.get('patch_errors'):
+                    history_text += f"Patch rejected (not applied): {'; '.join(h['patch_errors'])}\n"
             
             # Run QA check
             result = self.run_qa_iteration(current_json, history_text)
@@ -257,7 +209,10 @@ class DesignQA:
                 print(f"   - {issue}")
             
             # Update JSON if fixes were made
-            if result['fixed_json']:
+            patch_errors = []
+            if self.output_mode == 'patch':
+                current_json, patch_errors = self.apply_qa_patch(current_json, result['patch'])
+            elif result['fixed_json']:
                 current_json = result['fixed_json']
                 print(f"✏️  Applied {len(result['changes'])} fix(es)")
             
@@ -268,8 +223,11 @@ class DesignQA:
                 'changes': result['changes'],
                 'change_log': result.get('change_log', [])
             })
+            if self.output_mode == 'patch':
+                history[-1].update(patch=result['patch'] if not patch_errors else None, patch_errors=patch_errors)
             
-            # Check if we're stuck (same issues repeating)
+            # Check if we're stuck (same issues repeating); after a rejected patch the
+            # next iteration is the retry, so repeated bad patches stop here too
             if len(history) >= 2:
                 if history[-1]['issues'] == history[-2]['issues']:
                     print("⚠️  Same issues repeating, stopping QA loop")
@@ -281,6 +239,34 @@ class DesignQA:
         
         return current_json, history
     
+    def apply_qa_patch(self, current_json, patch):
+        """
+        Apply a model-proposed JSON Patch to current_json.
+        
+        The patch is validated against the document first and applied as a whole
+        or not at all; returns (json, errors) with the unchanged json on errors.
+        """
+        if patch is None:
+            print("⚠️  QA response has no ---PATCH--- section (format error), JSON unchanged")
+            return current_json, ["format error: the response has no ---PATCH--- section"]
+        if isinstance(patch, str):
+            print("⚠️  PATCH section is not valid JSON, JSON unchanged")
+            return current_json, ["PATCH section is not a JSON array"]
+        
+        errors = validate_patch(current_json, patch)
+        if errors:
+            print(f"⚠️  Rejected patch ({len(patch) if isinstance(patch, list) else 0} operation(s)), JSON unchanged:")
+            for error in errors:
+                print(f"   - {error}")
+            return current_json, errors
+        
+        if patch:
+            current_json = apply_patch(current_json, patch)
+            print(f"✏️  Applied {len(patch)} patch operation(s)")
+            for operation in patch:
+                print(f"   {describe_operation(operation)}")
+        return current_json, []
+    
     def save_change_log(self, history, output_file):
         """Save detailed change log for retrospective analysis."""
         log_data = {
@@ -288,6 +274,7 @@ class DesignQA:
             'total_iterations': len(history),
             'total_issues_found': sum(len(h.get('issues', [])) for h in history),
             'total_changes_made': sum(len(h.get('changes', [])) for h in history),
+            'rule_fixes': self.rule_fixes,
             'iterations': []
         }
         
@@ -300,6 +287,9 @@ class DesignQA:
                 'changes': iteration.get('changes', []),
                 'detailed_change_log': iteration.get('change_log', [])
             }
+            if 'patch' in iteration:
+                iteration_data['patch'] = iteration['patch']
+                iteration_data['patch_errors'] = iteration.get('patch_errors', [])
             log_data['iterations'].append(iteration_data)
         
         with open(output_file, 'w') as f:
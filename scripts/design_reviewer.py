@@ -10,6 +10,7 @@ Gemini-based visual analysis and JSON improvement system
 """
 
 import os
+import sys
 import json
 import base64
 from pathlib import Path
@@ -17,6 +18,13 @@ from datetime import datetime
 from typing import Dict, Optional, Tuple, List
 import google.generativeai as genai
 
+# Add parent directory to path (run_review.py imports this module from scripts/)
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.design_system_registry import get_registry
+from scripts.json_extract import extract_json_text
+from scripts.json_repair import format_repairs, parse_json_tolerant
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -231,12 +239,10 @@ Focus on fixing real problems visible in the image rather than redesigning worki
         # 3. Підготувати reviewer prompt з контекстом
         reviewer_prompt_template = self.load_reviewer_prompt()
         
-        # Завантажити design system data - використовуємо найновіший файл
-        design_system_path = self.base_path / "design-system" / "design-system-raw-data-2025-08-16T14-11-15.json"
-        design_system_data = ""
-        if design_system_path.exists():
-            with open(design_system_path, 'r', encoding='utf-8') as f:
-                design_system_data = f.read()
+        # Завантажити design system data - найновіший snapshot зі спільного registry
+        design_system = get_registry().latest(self.base_path / "design-system")
+        if design_system:
+            design_system_data = design_system.text
             print(f"📊 Reviewer loaded design system data: {len(design_system_data)} characters")
         else:
             print("⚠️ Design system data не знайдено для reviewer")
@@ -356,46 +362,20 @@ Focus on fixing real problems visible in the image rather than redesigning worki
         Витягнути JSON з відповіді Gemini reviewer
         """
         try:
-            # Метод 1: Шукати JSON блок в markdown
-            start_marker = "```json"
-            end_marker = "```"
-            
-            start_idx = response.find(start_marker)
-            if start_idx != -1:
-                start_idx += len(start_marker)
-                end_idx = response.find(end_marker, start_idx)
-                if end_idx != -1:
-                    json_str = response[start_idx:end_idx].strip()
-                    
-                    # Очистити коментарі JavaScript-стилю
-                    import re
-                    json_str = re.sub(r'//.*$', '', json_str, flags=re.MULTILINE)
-                    json_str = re.sub(r'/\*.*?\*/', '', json_str, flags=re.DOTALL)
-                    
-                    return json.loads(json_str)
-            
-            # Метод 2: Шукати JSON після "# DESIGN SPECIFICATION"
-            spec_marker = "# DESIGN SPECIFICATION"
-            spec_idx = response.find(spec_marker)
-            if spec_idx != -1:
-                # Шукати перші дужки після marker
-                start_brace = response.find("{", spec_idx)
-                if start_brace != -1:
-                    # Знайти відповідну закриваючу дужку
-                    brace_count = 0
-                    for i in range(start_brace, len(response)):
-                        if response[i] == '{':
-                            brace_count += 1
-                        elif response[i] == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                json_str = response[start_brace:i+1]
-                                return json.loads(json_str)
+            # Перше повне JSON значення після ```json або "# DESIGN SPECIFICATION"
+            json_str = extract_json_text(response, separators=("```json", "# DESIGN SPECIFICATION"))
+            if json_str.startswith(('{', '[')):
+                # Коментарі, зайві коми, невалідні escape та обрізаний хвіст виправляються
+                # токенізатором (вміст рядків не зачіпається)
+                parsed, repairs = parse_json_tolerant(json_str)
+                if repairs:
+                    print(f"🔧 Виправлено JSON reviewer: {format_repairs(repairs)}")
+                return parsed
             
             print("⚠️ JSON не знайдено у відповіді reviewer")
             return None
             
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             print(f"⚠️ Помилка парсингу JSON: {e}")
             return None
         except Exception as e:
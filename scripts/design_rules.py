@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Deterministic design checks compiled from a design-system snapshot.
+
+DesignRules turns a snapshot into lookup tables once (kept with the snapshot):
+component ids, variant options, text slot limits, text and color style names.
+check_design() then walks a designer / figma-ready document in one TreeWalker
+pass (DesignCheck) and reports the mechanical problems the LLM QA used to find:
+
+- unknown-component     componentNodeId not in the design system
+- invalid-variant       variant property or value the component does not have
+- text-too-long         component text longer than its slot's maxLength
+- unknown-icon          iconSwaps value that names no icon component
+- missing-text-style    native-text without a known textStyle
+- missing-color-style   color that is neither a color style nor a raw color
+- sizing                invalid sizing values and conflicting combinations
+
+Safe fixes (canonical casing of names and values, style ids and near-identical
+raw colors to style names, unknown components the ComponentIndex resolves
+confidently, iconSwaps resolved to full icon names, FILL without STRETCH,
+fixed width on FILL) are applied in place. Issues without a safe fix are left for the LLM QA.
+
+Usage:
+    python scripts/design_rules.py <figma_ready_or_designer_output> [--no-fix]
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.color_index import HEX_ONLY_KEYS, ColorIndex, ColorSnapper, get_color_index, parse_hex
+from scripts.component_index import ComponentIndex, get_component_index
+from scripts.figma_schema import AXIS_SIZING_VALUES, LAYOUT_ALIGN_VALUES, LAYOUT_MODES, SIZING_VALUES
+from scripts.icon_index import IconIndex, get_icon_index
+from scripts.tree_walker import Node, TreeWalker
+
+# Color fields checked on containers / shapes and on native-text properties
+CONTAINER_COLOR_KEYS = ('backgroundColor', 'fill', 'borderColor')
+TEXT_COLOR_KEYS = ('color', 'textColor')
+
+
+@dataclass
+class RuleIssue:
+    rule: str
+    path: str
+    message: str
+    fixed: bool = False
+
+    def __str__(self) -> str:
+        return f"[{self.rule}] {self.path}: {self.message}"
+
+
+def _slot_keys(slot_name: str) -> Tuple[str, ...]:
+    # Same matching as the renderer: exact (case-insensitive) or spaces as hyphens
+    lowered = slot_name.lower()
+    return lowered, lowered.replace(' ', '-')
+
+
+class DesignRules:
+    """Lookup tables for one snapshot; check() validates (and fixes) a document."""
+
+    def __init__(self, snapshot):
+        self.component_ids = frozenset(snapshot.components_by_id)
+        self.component_names: Dict[str, str] = {}
+        self.variants: Dict[str, Dict[str, Tuple[str, Dict[str, str]]]] = {}
+        self.text_slots: Dict[str, Dict[str, Tuple[str, Optional[int]]]] = {}
+
+        for component_id, component in snapshot.components_by_id.items():
+            self.component_names[component_id] = component.get('name', '')
+            # Older scans list values under variantDetails
+            variant_options = component.get('variantOptions') or component.get('variantDetails') or {}
+            if variant_options:
+                self.variants[component_id] = {
+                    prop.lower(): (prop, {str(value).lower(): value for value in values})
+                    for prop, values in variant_options.items()
+                }
+            text_slots = component.get('textSlots') or {}
+            # maxLength is measured from the placeholder; hug-content components grow with their text
+            hugs = (component.get('layoutBehavior') or {}).get('type') == 'hug-content'
+            if text_slots:
+                slots: Dict[str, Tuple[str, Optional[int]]] = {}
+                for slot_name, slot in text_slots.items():
+                    for key in _slot_keys(slot_name):
+                        slots.setdefault(key, (slot_name, None if hugs else (slot or {}).get('maxLength')))
+                self.text_slots[component_id] = slots
+
+        self.component_index: ComponentIndex = get_component_index(snapshot)
+        self.icon_index: IconIndex = get_icon_index(snapshot)
+        self.text_styles = {name.lower(): name for name in snapshot.text_styles_by_name}
+        self.color_index: ColorIndex = get_color_index(snapshot)
+        self.color_styles = {name.lower(): name for name in self.color_index.names}
+
+    def check(self, document: Any, fix: bool = True) -> List[RuleIssue]:
+        """
+        All rule violations in document, fixed ones marked fixed=True.
+
+        With fix=True safe fixes are applied to document in place.
+        """
+        walker = TreeWalker()
+        check = DesignCheck(self, fix).register(walker)
+        walker.walk(document)
+        return check.finish()
+
+    # ----- components -----
+
+    def _check_component(self, node: Dict[str, Any], path: str, issues: List[RuleIssue], fix: bool):
+        component_id = node.get('componentNodeId')
+        if component_id not in self.component_ids:
+            reference = component_id or node.get('componentId')
+            resolution = self.component_index.resolve_node(node)
+            if resolution is None:
+                message = (f"component {reference!r} is not in the design system" if reference
+                           else "component has no componentNodeId")
+                issues.append(RuleIssue('unknown-component', f"{path}.componentNodeId", message))
+                return
+            if fix:
+                node['componentNodeId'] = resolution.component_id
+            issues.append(RuleIssue('unknown-component', f"{path}.componentNodeId",
+                                    f"{reference!r} -> {resolution.component_id!r} ({resolution.name}, "
+                                    f"score {resolution.score})", fix))
+            if not fix:
+                return
+            component_id = resolution.component_id
+        name = self.component_names.get(component_id, '')
+
+        variants = node.get('variants')
+        if isinstance(variants, dict) and variants:
+            options = self.variants.get(component_id, {})
+            for prop in list(variants):
+                value = variants[prop]
+                variant_path = f"{path}.variants.{prop}"
+                option = options.get(str(prop).strip().lower())
+                if option is None:
+                    known = ', '.join(p for p, _ in options.values()) or 'none'
+                    issues.append(RuleIssue('invalid-variant', variant_path,
+                                            f"{name} has no variant property {prop!r} (has: {known})"))
+                    continue
+                canonical_prop, values = option
+                canonical_value = values.get(str(value).strip().lower())
+                if canonical_value is None:
+                    issues.append(RuleIssue('invalid-variant', variant_path,
+                                            f"{value!r} is not a {name} {canonical_prop} value "
+                                            f"(allowed: {', '.join(values.values())})"))
+                    continue
+                if canonical_prop != prop or canonical_value != value:
+                    if fix:
+                        del variants[prop]
+                        variants[canonical_prop] = canonical_value
+                    issues.append(RuleIssue('invalid-variant', variant_path,
+                                            f"{prop}={value!r} -> {canonical_prop}={canonical_value!r}", fix))
+
+        properties = node.get('properties')
+        slots = self.text_slots.get(component_id)
+        if isinstance(properties, dict) and slots:
+            for key, value in properties.items():
+                slot = slots.get(str(key).lower()) if isinstance(value, str) else None
+                if slot and slot[1] and len(value) > slot[1]:
+                    issues.append(RuleIssue('text-too-long', f"{path}.properties.{key}",
+                                            f"{len(value)} chars, {name} slot {slot[0]!r} fits {slot[1]}"))
+
+        swaps = node.get('iconSwaps')
+        if isinstance(swaps, dict):
+            for slot_name, requested in swaps.items():
+                if not isinstance(requested, str):
+                    continue
+                resolution = self.icon_index.resolve(requested)
+                swap_path = f"{path}.iconSwaps.{slot_name}"
+                if resolution is None:
+                    issues.append(RuleIssue('unknown-icon', swap_path, f"no icon component matches {requested!r}"))
+                elif not resolution.matches(requested):
+                    if fix:
+                        swaps[slot_name] = resolution.name
+                    issues.append(RuleIssue('unknown-icon', swap_path,
+                                            f"{requested!r} -> {resolution.name!r} ({resolution.reason})", fix))
+
+    # ----- styles -----
+
+    def _check_text(self, node: Dict[str, Any], path: str, issues: List[RuleIssue], fix: bool):
+        properties = node.get('properties')
+        if not isinstance(properties, dict):
+            return
+        # The renderer also reads textStyleName
+        style_key = 'textStyle' if 'textStyle' in properties or 'textStyleName' not in properties else 'textStyleName'
+        style = properties.get(style_key)
+        style_path = f"{path}.properties.{style_key}"
+        if not style:
+            issues.append(RuleIssue('missing-text-style', style_path, "native-text has no textStyle"))
+        elif style not in self.text_styles.values():
+            canonical = self.text_styles.get(str(style).strip().lower())
+            if canonical:
+                if fix:
+                    properties[style_key] = canonical
+                issues.append(RuleIssue('missing-text-style', style_path, f"{style!r} -> {canonical!r}", fix))
+            else:
+                issues.append(RuleIssue('missing-text-style', style_path,
+                                        f"text style {style!r} is not in the design system"))
+
+    def _check_color(self, source: Dict[str, Any], key: str, path: str, issues: List[RuleIssue], fix: bool):
+        value = source.get(key)
+        if isinstance(value, dict):
+            # fill: {"type": "SOLID", "color": ...}
+            self._check_color(value, 'color', f"{path}.{key}", issues, fix)
+            return
+        if not isinstance(value, str) or parse_hex(value):
+            return
+        if value in self.color_index.name_set and key not in HEX_ONLY_KEYS:
+            return
+        if value.lower() in ('transparent', 'none'):
+            return
+        canonical = self.color_styles.get(value.strip().lower())
+        if canonical and key in HEX_ONLY_KEYS:
+            # Shape fills are painted from hex only
+            canonical = self.color_index.hex_by_name[canonical]
+        if canonical:
+            if fix:
+                source[key] = canonical
+            issues.append(RuleIssue('missing-color-style', f"{path}.{key}", f"{value!r} -> {canonical!r}", fix))
+        else:
+            issues.append(RuleIssue('missing-color-style', f"{path}.{key}",
+                                    f"color {value!r} is neither a color style nor a hex color"))
+
+    # ----- sizing -----
+
+    def _check_enum(self, node: Dict[str, Any], key: str, allowed: Tuple[str, ...], path: str,
+                    issues: List[RuleIssue], fix: bool, aliases: Optional[Dict[str, str]] = None) -> Optional[str]:
+        value = node.get(key)
+        if value is None:
+            return None
+        normalized = str(value).strip().upper()
+        normalized = (aliases or {}).get(normalized, normalized)
+        if normalized not in allowed:
+            issues.append(RuleIssue('sizing', f"{path}.{key}",
+                                    f"{value!r} is not one of {', '.join(allowed)}"))
+            return None
+        if normalized != value:
+            if fix:
+                node[key] = normalized
+            issues.append(RuleIssue('sizing', f"{path}.{key}", f"{value!r} -> {normalized!r}", fix))
+        return normalized
+
+    def _check_sizing(self, node: Dict[str, Any], path: str, parent: Optional[Dict[str, Any]],
+                      issues: List[RuleIssue], fix: bool):
+        # 'STRETCH' is the layoutAlign spelling of FILL
+        horizontal = self._check_enum(node, 'horizontalSizing', SIZING_VALUES, path, issues, fix, aliases={'STRETCH': 'FILL'})
+        self._check_enum(node, 'verticalSizing', SIZING_VALUES, path, issues, fix, aliases={'STRETCH': 'FILL'})
+        layout_mode = self._check_enum(node, 'layoutMode', LAYOUT_MODES, path, issues, fix)
+        for key in ('primaryAxisSizingMode', 'counterAxisSizingMode'):
+            self._check_enum(node, key, AXIS_SIZING_VALUES, path, issues, fix, aliases={'HUG': 'AUTO'})
+        layout_align = self._check_enum(node, 'layoutAlign', LAYOUT_ALIGN_VALUES, path, issues, fix,
+                                         aliases={'START': 'MIN', 'END': 'MAX'})
+
+        if horizontal == 'FILL':
+            # The renderer only stretches FILL children with layoutAlign STRETCH
+            if layout_align and layout_align != 'STRETCH':
+                if fix:
+                    node['layoutAlign'] = 'STRETCH'
+                issues.append(RuleIssue('sizing', f"{path}.layoutAlign",
+                                        f"FILL with layoutAlign {layout_align!r} -> 'STRETCH'", fix))
+            # A fixed width fights the parent's auto-layout; FILL decides the width
+            if isinstance(node.get('width'), (int, float)) and parent is not None:
+                if fix:
+                    del node['width']
+                issues.append(RuleIssue('sizing', f"{path}.width", "fixed width on a FILL element removed", fix))
+
+        if layout_mode == 'HORIZONTAL' and horizontal in ('HUG', 'AUTO'):
+            items = node.get('items') if isinstance(node.get('items'), list) else []
+            if any(isinstance(item, dict) and item.get('horizontalSizing') == 'FILL' for item in items):
+                issues.append(RuleIssue('sizing', f"{path}.horizontalSizing",
+                                        "HUG row has FILL children; the row width is undefined"))
+
+
+class DesignCheck:
+    """
+    One DesignRules check of a document as TreeWalker visitors; finish() returns the issues.
+
+    With fix=True raw colors and style ids are snapped by a ColorSnapper on the
+    same walk; the color rules run in finish(), after the snapping.
+    """
+
+    def __init__(self, rules: DesignRules, fix: bool = True):
+        self.rules = rules
+        self.fix = fix
+        self.issues: List[RuleIssue] = []
+        self.snapper = ColorSnapper(rules.color_index) if fix else None
+        # (dict, key, path) of every color field, checked once colors are snapped
+        self._colors: List[Tuple[Dict[str, Any], str, str]] = []
+
+    def register(self, walker: TreeWalker) -> 'DesignCheck':
+        if self.snapper is not None:
+            self.snapper.register(walker)
+        walker.register(self.visit)
+        return self
+
+    def visit(self, node: Node):
+        rules, value, path = self.rules, node.value, node.path
+        node_type = value.get('type')
+        if node_type == 'component':
+            rules._check_component(value, path, self.issues, self.fix)
+        elif node_type == 'native-text':
+            rules._check_text(value, path, self.issues, self.fix)
+            if isinstance(value.get('properties'), dict):
+                self._colors.extend((value['properties'], key, f"{path}.properties") for key in TEXT_COLOR_KEYS)
+        if node_type != 'native-text':
+            self._colors.extend((value, key, path) for key in CONTAINER_COLOR_KEYS)
+        rules._check_sizing(value, path, node.parent.value if node.parent else None, self.issues, self.fix)
+
+    def finish(self) -> List[RuleIssue]:
+        issues: List[RuleIssue] = []
+        if self.snapper is not None:
+            for correction in self.snapper.finish():
+                issues.append(RuleIssue('missing-color-style', correction['path'],
+                                        f"{correction['from']} -> {correction['to']} ({correction['reason']})", True))
+        for source, key, path in self._colors:
+            self.rules._check_color(source, key, path, self.issues, self.fix)
+        self._colors = []
+        return issues + self.issues
+
+
+def get_design_rules(snapshot) -> DesignRules:
+    """DesignRules for a DesignSystemSnapshot, compiled once per snapshot."""
+    # Reads every section, so a newer scan never inherits it
+    return snapshot.derived('design_rules', lambda: DesignRules(snapshot))
+
+
+def check_design(document: Any, snapshot, fix: bool = True) -> Tuple[List[RuleIssue], List[RuleIssue]]:
+    """(fixed, remaining) issues of document against snapshot; fixes are applied in place."""
+    issues = get_design_rules(snapshot).check(document, fix)
+    return [i for i in issues if i.fixed], [i for i in issues if not i.fixed]
+
+
+def main():
+    import argparse
+    import json
+    import time
+    from scripts.design_system_registry import get_registry
+    from scripts.json_repair import extract_json_tolerant
+
+    parser = argparse.ArgumentParser(description="Rule-based design QA against the design system")
+    parser.add_argument("file", help="figma-ready JSON or designer output")
+    parser.add_argument("--no-fix", action="store_true", help="Report only")
+    args = parser.parse_args()
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("❌ No design system snapshot found")
+        sys.exit(1)
+
+    try:
+        document, _ = extract_json_tolerant(Path(args.file).read_text(encoding='utf-8'))
+    except ValueError as e:
+        print(f"❌ Cannot parse {args.file}: {e}")
+        sys.exit(1)
+    started = time.perf_counter()
+    fixed, remaining = check_design(document, snapshot, fix=not args.no_fix)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    for issue in fixed:
+        print(f"🔧 {issue}")
+    for issue in remaining:
+        print(f"❌ {issue}")
+    print(f"{'✅' if not remaining else '⚠️'} {len(fixed)} fixed, {len(remaining)} remaining ({elapsed:.1f} ms)")
+    if fixed and not args.no_fix:
+        print(json.dumps(document, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
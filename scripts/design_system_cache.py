@@ -0,0 +1,91 @@
+"""
+Memory-bounded cache of the design systems a pipeline server is working with.
+
+One server process can serve several Figma libraries at once. Each design
+system (a live payload sent by the plugin, or a snapshot file picked by name)
+is held as a DesignSystemSnapshot keyed by content hash, with its own indexes
+and prompt renders. The least recently used entries are dropped once the
+estimated memory of all entries exceeds the budget, so one team's large
+library cannot evict everything else and no request silently falls back to
+another team's snapshot. The plugin can send just the hash on later requests
+while the server still holds that snapshot. Evicted file snapshots are also
+dropped from the process-wide registry, so eviction actually frees them.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from scripts.design_system_registry import DesignSystemSnapshot, PathLike, get_registry
+
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Parsed + frozen Python objects take several times the size of the JSON text
+PARSED_SIZE_FACTOR = 8
+
+
+def estimate_memory(snapshot: DesignSystemSnapshot) -> int:
+    """Rough resident size of a snapshot with its renders, in bytes."""
+    return len(snapshot.text) * PARSED_SIZE_FACTOR + sum(len(r) for r in snapshot.renders.values())
+
+
+class DesignSystemCache:
+    """LRU of design-system snapshots keyed by content hash, bounded by memory."""
+
+    def __init__(self, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, DesignSystemSnapshot]' = OrderedDict()
+
+    def add(self, payload: Any) -> DesignSystemSnapshot:
+        """Snapshot for a live payload; an identical earlier payload returns the cached instance."""
+        return self._insert(DesignSystemSnapshot.from_data(payload))
+
+    def add_file(self, path: PathLike) -> DesignSystemSnapshot:
+        """Snapshot for a design-system export on disk (or in the snapshot store)."""
+        return self._insert(get_registry().get(path))
+
+    def get(self, content_hash: str) -> Optional[DesignSystemSnapshot]:
+        """Cached snapshot for a hash the plugin received earlier, or None."""
+        with self._lock:
+            snapshot = self._entries.get(content_hash)
+            if snapshot is not None:
+                self._entries.move_to_end(content_hash)
+                self._evict()
+            return snapshot
+
+    def _insert(self, snapshot: DesignSystemSnapshot) -> DesignSystemSnapshot:
+        with self._lock:
+            cached = self._entries.get(snapshot.content_hash)
+            if cached is not None:
+                self._entries.move_to_end(snapshot.content_hash)
+                return cached
+            self._entries[snapshot.content_hash] = snapshot
+            self._evict()
+        return snapshot
+
+    def _evict(self):
+        # Renders grow after insertion, so sizes are re-estimated on every check;
+        # the newest entry is always kept even when it alone exceeds the budget
+        total = sum(estimate_memory(s) for s in self._entries.values())
+        while total > self.memory_budget and len(self._entries) > 1:
+            content_hash, evicted = self._entries.popitem(last=False)
+            total -= estimate_memory(evicted)
+            # File snapshots are shared through the registry; drop them there too
+            if evicted.path is not None:
+                get_registry().discard(content_hash)
+            print(f"🗑️ Evicted design system {content_hash[:12]} from server cache")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Cached entries, most recently used last (read only: nothing is evicted)."""
+        with self._lock:
+            return [{
+                'hash': content_hash,
+                'path': snapshot.path,
+                'estimated_bytes': estimate_memory(snapshot),
+                'renders': sorted(snapshot.renders),
+            } for content_hash, snapshot in self._entries.items()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Design system snapshot manifest.
+
+Keeps design-system/manifest.json with one entry per snapshot (export
+timestamp, size, content hash, scanner metadata) and the name of the current
+(newest) snapshot, so resolving the newest design system is a dictionary
+lookup instead of a glob + filename parse on every stage call.
+
+The manifest is updated when a snapshot is written through write_snapshot(),
+lazily when the folder changes on disk, and by an optional polling watcher.
+Consumers can subscribe() to change events.
+
+Usage:
+    python scripts/design_system_manifest.py            # Rebuild and show current snapshot
+    python scripts/design_system_manifest.py --watch    # Keep watching for new snapshots
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+# Add parent directory to path (also run directly as a CLI)
+sys.path.append(str(Path(__file__).parent.parent))
+
+from scripts.snapshot_store import get_store
+
+DESIGN_SYSTEM_FOLDER = "design-system"
+SNAPSHOT_PREFIX = "design-system-raw-data-"
+SNAPSHOT_PATTERN = f"{SNAPSHOT_PREFIX}*.json"
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+PathLike = Union[str, Path]
+Subscriber = Callable[[Dict[str, Any]], None]
+
+
+def filename_timestamp(filename: str) -> Optional[datetime]:
+    """Parse the export timestamp embedded in a snapshot filename."""
+    # Extract ISO timestamp from filename: design-system-raw-data-2025-07-23T20-03-48.json
+    match = re.search(r'(\d{4}-\d{2}-\d{2}T\d{2}-\d{2}-\d{2})', filename)
+    if match:
+        try:
+            # Convert from 2025-07-23T20-03-48 to 2025-07-23T20:03:48 (time part only)
+            date_part, time_part = match.group(1).split('T')
+            return datetime.fromisoformat(f"{date_part}T{time_part.replace('-', ':')}")
+        except ValueError:
+            pass
+    return None
+
+
+def snapshot_timestamp(filepath: PathLike) -> datetime:
+    """Export timestamp of a snapshot file (mtime fallback)"""
+    exported = filename_timestamp(os.path.basename(filepath))
+    if exported:
+        return exported
+    return datetime.fromtimestamp(os.path.getmtime(filepath))
+
+
+def is_snapshot_filename(filename: str) -> bool:
+    return filename.startswith(SNAPSHOT_PREFIX) and filename.endswith('.json')
+
+
+class SnapshotManifest:
+    """Manifest of the snapshots in one design-system folder."""
+
+    def __init__(self, folder: PathLike = DESIGN_SYSTEM_FOLDER):
+        self.folder = Path(folder)
+        self.manifest_path = self.folder / MANIFEST_FILENAME
+        self._lock = threading.RLock()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[str] = None
+        self._folder_mtime_ns: Optional[int] = None
+        self._subscribers: List[Subscriber] = []
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+        self._load()
+
+    # ----- persistence -----
+
+    def _load(self):
+        if not self.manifest_path.exists():
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable manifest {self.manifest_path}: {e}")
+            return
+        if manifest.get('version') != MANIFEST_VERSION:
+            return
+        self._entries = manifest.get('snapshots', {})
+        self._current = manifest.get('current')
+
+    def _save(self):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'updatedAt': datetime.now().isoformat(),
+            'current': self._current,
+            'snapshots': self._entries,
+        }
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            print(f"⚠️ Failed to save design system manifest: {e}")
+
+    # ----- entries -----
+
+    def _describe(self, path: Path, stat: os.stat_result) -> Dict[str, Any]:
+        """Build a manifest entry; reads the file once to hash it."""
+        with open(path, 'rb') as f:
+            raw = f.read()
+        metadata: Dict[str, Any] = {}
+        try:
+            data = json.loads(raw)
+            if isinstance(data, dict) and isinstance(data.get('metadata'), dict):
+                metadata = data['metadata']
+        except ValueError:
+            pass
+
+        exported = snapshot_timestamp(path)
+        return {
+            'timestamp': exported.timestamp(),
+            'exportedAt': exported.isoformat(),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'content_hash': hashlib.sha256(raw).hexdigest(),
+            'metadata': metadata,
+        }
+
+    def _describe_stored(self, filename: str, ref: Dict[str, Any]) -> Dict[str, Any]:
+        exported = filename_timestamp(filename) or datetime.fromtimestamp(0)
+        return {
+            'timestamp': exported.timestamp(),
+            'exportedAt': exported.isoformat(),
+            'size': ref['size'],
+            'mtime_ns': None,
+            'content_hash': ref['hash'],
+            'metadata': ref.get('metadata', {}),
+            'stored': True,
+        }
+
+    def refresh(self) -> bool:
+        """Reconcile the manifest with the folder; returns True if anything changed."""
+        events: List[Dict[str, Any]] = []
+        with self._lock:
+            if not self.folder.exists():
+                return False
+
+            seen = set()
+            for dir_entry in os.scandir(self.folder):
+                if not dir_entry.is_file() or not is_snapshot_filename(dir_entry.name):
+                    continue
+                seen.add(dir_entry.name)
+                stat = dir_entry.stat()
+                known = self._entries.get(dir_entry.name)
+                if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+                    continue
+                try:
+                    self._entries[dir_entry.name] = self._describe(Path(dir_entry.path), stat)
+                except OSError as e:
+                    print(f"⚠️ Failed to index snapshot {dir_entry.name}: {e}")
+                    continue
+                events.append({'type': 'updated' if known else 'added', 'filename': dir_entry.name})
+
+            # Snapshots packed into the content-addressed store (original file pruned)
+            for filename, ref in get_store(self.folder).refs().items():
+                if filename in seen:
+                    continue
+                seen.add(filename)
+                known = self._entries.get(filename)
+                if known and known.get('content_hash') == ref['hash']:
+                    continue
+                self._entries[filename] = self._describe_stored(filename, ref)
+                events.append({'type': 'updated' if known else 'added', 'filename': filename})
+
+            for filename in list(self._entries):
+                if filename not in seen:
+                    del self._entries[filename]
+                    events.append({'type': 'removed', 'filename': filename})
+
+            events.extend(self._update_current())
+            if events:
+                self._save()
+            # Taken after saving so our own manifest write doesn't trigger a rescan
+            self._folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+
+        self._notify(events)
+        return bool(events)
+
+    def _update_current(self) -> List[Dict[str, Any]]:
+        newest = max(self._entries, key=lambda name: self._entries[name]['timestamp'], default=None)
+        if newest == self._current:
+            return []
+        self._current = newest
+        return [{'type': 'current_changed', 'filename': newest, 'entry': self._entries.get(newest)}]
+
+    def _sync_if_changed(self):
+        """One stat of the folder; rescan only if files were added/removed."""
+        try:
+            folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if folder_mtime_ns != self._folder_mtime_ns:
+            self.refresh()
+
+    def record(self, path: PathLike):
+        """Register a snapshot that was just written to the folder."""
+        path = Path(path)
+        events: List[Dict[str, Any]] = []
+        with self._lock:
+            known = path.name in self._entries
+            self._entries[path.name] = self._describe(path, os.stat(path))
+            events.append({'type': 'updated' if known else 'added', 'filename': path.name})
+            events.extend(self._update_current())
+            self._save()
+            self._folder_mtime_ns = os.stat(self.folder).st_mtime_ns
+        self._notify(events)
+
+    def write_snapshot(self, data: Any, exported_at: Optional[datetime] = None, packed: bool = False) -> Path:
+        """
+        Write a scanner export with the standard filename and record it.
+        
+        With packed=True the export only goes into the content-addressed store
+        (no full JSON document on disk); it is still listed and loadable by name.
+        """
+        exported_at = exported_at or datetime.now()
+        self.folder.mkdir(exist_ok=True)
+        path = self.folder / f"{SNAPSHOT_PREFIX}{exported_at.strftime('%Y-%m-%dT%H-%M-%S')}.json"
+        if packed:
+            get_store(self.folder).add_data(path.name, data)
+            self.refresh()
+            return path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        self.record(path)
+        return path
+
+    # ----- lookups -----
+
+    def current(self) -> Optional[Dict[str, Any]]:
+        """Manifest entry of the newest snapshot, or None."""
+        self._sync_if_changed()
+        with self._lock:
+            return self._entries.get(self._current) if self._current else None
+
+    def current_path(self) -> Optional[str]:
+        # Resolved against this folder so the manifest stays valid from any cwd
+        self._sync_if_changed()
+        with self._lock:
+            return str(self.folder / self._current) if self._current else None
+
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        self._sync_if_changed()
+        with self._lock:
+            return dict(self._entries)
+
+    # ----- change events -----
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """Call callback(event) on every change; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def _notify(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for event in events:
+            for callback in subscribers:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"⚠️ Design system manifest subscriber failed: {e}")
+
+    def start_watching(self, interval: float = 2.0):
+        """Poll the folder in a daemon thread and emit change events."""
+        if self._watcher and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+
+        def watch():
+            while not self._stop_watching.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"⚠️ Design system watcher error: {e}")
+
+        self._watcher = threading.Thread(target=watch, name="design-system-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        self._stop_watching.set()
+
+
+_manifests: Dict[str, SnapshotManifest] = {}
+_manifests_lock = threading.Lock()
+
+
+def get_manifest(folder: PathLike = DESIGN_SYSTEM_FOLDER) -> SnapshotManifest:
+    """Process-wide manifest for a design-system folder."""
+    key = os.path.abspath(folder)
+    with _manifests_lock:
+        if key not in _manifests:
+            _manifests[key] = SnapshotManifest(folder)
+        return _manifests[key]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild or watch the design system snapshot manifest")
+    parser.add_argument("--folder", default=DESIGN_SYSTEM_FOLDER, help="Design system folder (default: design-system)")
+    parser.add_argument("--watch", action="store_true", help="Keep watching the folder for new snapshots")
+    parser.add_argument("--interval", type=float, default=2.0, help="Watch polling interval in seconds")
+    args = parser.parse_args()
+
+    manifest = get_manifest(args.folder)
+    manifest.refresh()
+    current = manifest.current()
+    if not current:
+        print(f"❌ No snapshots found in {args.folder}")
+        sys.exit(1)
+
+    print(f"📊 {len(manifest.entries())} snapshots indexed in {manifest.manifest_path}")
+    print(f"✅ Current: {os.path.basename(manifest.current_path())} (exported {current['exportedAt']}, hash {current['content_hash'][:12]})")
+
+    if args.watch:
+        manifest.subscribe(lambda event: print(f"🔔 {event['type']}: {event['filename']}"))
+        manifest.start_watching(args.interval)
+        print("👀 Watching for changes, press Ctrl+C to stop")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            manifest.stop_watching()
+
+
+if __name__ == "__main__":
+    main()
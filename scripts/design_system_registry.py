@@ -0,0 +1,479 @@
+"""
+Process-wide registry of loaded design-system snapshots.
+
+Every consumer (pipeline stages, DesignQA, DesignReviewer, color fixer) gets
+the same parsed snapshot instead of re-reading and re-parsing the JSON file.
+Each snapshot is loaded once per file version and indexed by component id,
+name, suggestedType, color-style name and text-style name. Snapshots are
+handed out as read-only views; call thaw() for a mutable copy.
+
+Parsed snapshots and their prompt renders are kept in a binary sidecar cache
+(see snapshot_cache) keyed by content hash, so later processes skip json.loads.
+For very large libraries, mapped() exposes a memory-mapped view that decodes
+single components on demand (see mapped_snapshot); the server browses
+design-system files through it (/api/design-systems/<file>/components).
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from scripts import snapshot_cache
+from scripts.design_system_manifest import DESIGN_SYSTEM_FOLDER, get_manifest, is_snapshot_filename
+from scripts.mapped_snapshot import MappedSnapshot, build_mapped_snapshot
+from scripts.snapshot_diff import ChangeSet, diff_snapshots
+from scripts.snapshot_store import get_store
+
+PathLike = Union[str, Path]
+# (new snapshot, object derived from the previous snapshot, ChangeSet) -> object for the new one, or None
+DerivedUpdate = Callable[['DesignSystemSnapshot', Any, ChangeSet], Optional[Any]]
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Inverse of freeze(): plain dicts/lists that json can serialize."""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+class DesignSystemSnapshot:
+    """Read-only, indexed view of one design-system export."""
+
+    def __init__(self, text: str, path: Optional[str] = None, content_hash: Optional[str] = None,
+                 data: Any = None, renders: Optional[Dict[str, str]] = None,
+                 render_deps: Optional[Dict[str, Optional[List[str]]]] = None):
+        self.path = path
+        self.text = text
+        self.content_hash = content_hash or hashlib.sha256(text.encode('utf-8')).hexdigest()
+        # Parsed lazily: callers that only need the text never pay for json.loads
+        self._plain = data
+        self._data: Any = None
+        self._indexes: Optional[Dict[str, MappingProxyType]] = None
+        self._renders: Dict[str, str] = dict(renders or {})
+        # Top-level sections each render was built from (None = whole snapshot)
+        self._render_deps: Dict[str, Optional[List[str]]] = dict(render_deps or {})
+        # In-memory indexes built from the snapshot (color index, component index, ...),
+        # with the top-level sections each was built from, like renders
+        self._derived: Dict[str, Any] = {}
+        self._derived_deps: Dict[str, Optional[List[str]]] = {}
+        # How to carry each one over to a newer snapshot whose changes do affect it
+        self._derived_updates: Dict[str, Optional[DerivedUpdate]] = {}
+        self._lock = threading.Lock()
+        self._derived_lock = threading.Lock()
+        # Set by the registry to persist new renders to the sidecar cache
+        self.on_render: Optional[Callable[['DesignSystemSnapshot'], None]] = None
+
+    @classmethod
+    def from_data(cls, data: Any, path: Optional[str] = None) -> 'DesignSystemSnapshot':
+        """Build a snapshot from already-parsed data (e.g. a live plugin payload)."""
+        return cls(json.dumps(data, ensure_ascii=False), path, data=data)
+
+    @property
+    def data(self) -> Any:
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    plain = self._plain if self._plain is not None else json.loads(self.text)
+                    self._data = freeze(plain)
+                    self._plain = None
+        return self._data
+
+    def plain_data(self) -> Any:
+        """Parsed data as plain dicts/lists (not a copy when already at hand)."""
+        if self._plain is not None:
+            return self._plain
+        if self._data is not None:
+            return thaw(self._data)
+        return json.loads(self.text)
+
+    @property
+    def components(self) -> Tuple[Any, ...]:
+        # Live plugin payloads are a bare component list
+        if isinstance(self.data, tuple):
+            return self.data
+        return self.data.get('components') or ()
+
+    @property
+    def color_styles(self) -> Tuple[Any, ...]:
+        """All color styles, flattened across categories."""
+        if isinstance(self.data, tuple):
+            return ()
+        styles = []
+        for category_styles in (self.data.get('colorStyles') or {}).values():
+            styles.extend(category_styles)
+        return tuple(styles)
+
+    @property
+    def text_styles(self) -> Tuple[Any, ...]:
+        if isinstance(self.data, tuple):
+            return ()
+        return self.data.get('textStyles') or ()
+
+    def _index(self, name: str) -> MappingProxyType:
+        if self._indexes is None:
+            self._indexes = self._build_indexes()
+        return self._indexes[name]
+
+    def _build_indexes(self) -> Dict[str, MappingProxyType]:
+        by_id: Dict[str, Any] = {}
+        by_name: Dict[str, List[Any]] = {}
+        by_type: Dict[str, List[Any]] = {}
+        for component in self.components:
+            if component.get('id'):
+                by_id[component['id']] = component
+            by_name.setdefault(component.get('name', ''), []).append(component)
+            by_type.setdefault(component.get('suggestedType', 'unknown'), []).append(component)
+
+        return {
+            'components_by_id': MappingProxyType(by_id),
+            'components_by_name': MappingProxyType({k: tuple(v) for k, v in by_name.items()}),
+            'components_by_type': MappingProxyType({k: tuple(v) for k, v in by_type.items()}),
+            'color_styles_by_name': MappingProxyType({s.get('name'): s for s in self.color_styles}),
+            'text_styles_by_name': MappingProxyType({s.get('name'): s for s in self.text_styles}),
+        }
+
+    @property
+    def components_by_id(self) -> MappingProxyType:
+        return self._index('components_by_id')
+
+    @property
+    def components_by_name(self) -> MappingProxyType:
+        return self._index('components_by_name')
+
+    @property
+    def components_by_type(self) -> MappingProxyType:
+        return self._index('components_by_type')
+
+    @property
+    def color_styles_by_name(self) -> MappingProxyType:
+        return self._index('color_styles_by_name')
+
+    @property
+    def text_styles_by_name(self) -> MappingProxyType:
+        return self._index('text_styles_by_name')
+
+    def render(self, name: str, build: Callable[[], str], depends_on: Optional[List[str]] = None) -> str:
+        """
+        Prompt text variant of the snapshot, built once and kept in the sidecar cache.
+
+        depends_on lists the top-level sections the render reads; a newer snapshot
+        that leaves them unchanged inherits the render instead of rebuilding it.
+        """
+        if name not in self._renders:
+            self._renders[name] = build()
+            self._render_deps[name] = list(depends_on) if depends_on is not None else None
+            if self.on_render:
+                self.on_render(self)
+        return self._renders[name]
+
+    @property
+    def renders(self) -> MappingProxyType:
+        """Prompt renders built so far, by name."""
+        return MappingProxyType(self._renders)
+
+    def derived(self, name: str, build: Callable[[], Any], depends_on: Optional[List[str]] = None,
+                update: Optional['DerivedUpdate'] = None) -> Any:
+        """
+        Object built from the snapshot (an index, a matrix, ...), built once and kept with it.
+
+        depends_on lists the top-level sections build reads; a newer snapshot that
+        leaves them unchanged inherits the object instead of rebuilding it. When
+        they did change item by item (components, colorStyles, textStyles),
+        update(new_snapshot, previous_object, changes) may carry the object over
+        by redoing only the changed items; it returns None to rebuild instead.
+        """
+        with self._derived_lock:
+            if name in self._derived:
+                return self._derived[name]
+        # Built outside the lock: builders may ask for other derived objects
+        value = build()
+        with self._derived_lock:
+            if name not in self._derived:
+                self._derived[name] = value
+                self._derived_deps[name] = list(depends_on) if depends_on is not None else None
+                self._derived_updates[name] = update
+            return self._derived[name]
+
+    def inherit(self, previous: 'DesignSystemSnapshot') -> List[str]:
+        """
+        Copy renders and derived objects from an older snapshot that the changes between them leave valid.
+
+        Derived objects with an update function are also carried over when their
+        sections changed item by item; those are listed as '<name> (updated)'.
+        """
+        missing_renders = [name for name in previous._renders if name not in self._renders]
+        with previous._derived_lock:
+            previous_derived = dict(previous._derived)
+            previous_deps = dict(previous._derived_deps)
+            previous_updates = dict(previous._derived_updates)
+        with self._derived_lock:
+            missing_derived = [name for name in previous_derived if name not in self._derived]
+        if not missing_renders and not missing_derived:
+            return []
+
+        changes = diff_snapshots(previous.plain_data(), self.plain_data())
+        inherited = []
+        for name in missing_renders:
+            depends_on = previous._render_deps.get(name)
+            if depends_on is not None and not changes.affects(depends_on):
+                self._renders[name] = previous._renders[name]
+                self._render_deps[name] = depends_on
+                inherited.append(name)
+        if inherited and self.on_render:
+            self.on_render(self)
+        for name in missing_derived:
+            depends_on = previous_deps.get(name)
+            if depends_on is None:
+                continue
+            label, value = name, previous_derived[name]
+            if changes.affects(depends_on):
+                update = previous_updates.get(name)
+                if update is None or not changes.itemized(depends_on):
+                    continue
+                # Outside the lock: updates may ask this snapshot for other derived objects
+                label, value = f"{name} (updated)", update(self, value, changes)
+                if value is None:
+                    continue
+            with self._derived_lock:
+                if name not in self._derived:
+                    self._derived[name] = value
+                    self._derived_deps[name] = depends_on
+                    self._derived_updates[name] = previous_updates.get(name)
+                    inherited.append(label)
+        return inherited
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """JSON text of the snapshot, rendered once per indent setting."""
+        return self.render(f"json:indent={indent}", lambda: json.dumps(self.plain_data(), indent=indent))
+
+    def thaw(self) -> Any:
+        """Mutable deep copy of the snapshot data."""
+        return json.loads(self.text)
+
+
+class DesignSystemRegistry:
+    """Loads each snapshot file once and shares it across the process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_path: Dict[str, Tuple[Tuple[Any, Any], DesignSystemSnapshot]] = {}
+        self._by_hash: Dict[str, DesignSystemSnapshot] = {}
+        self._latest_by_folder: Dict[str, DesignSystemSnapshot] = {}
+        self._mapped: Dict[str, MappedSnapshot] = {}
+
+    def get(self, path: PathLike) -> DesignSystemSnapshot:
+        """Snapshot for a file, re-read only when the file changes on disk."""
+        path = os.path.abspath(path)
+        if not os.path.exists(path):
+            return self._get_stored(path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            cached = self._by_path.get(path)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        # The manifest already knows the hash of an unchanged file, so a sidecar
+        # hit skips reading and parsing the JSON entirely
+        folder = os.path.dirname(path)
+        key = self._manifest_key(path, signature)
+
+        snapshot = self._load_cached(folder, key, path) if key else None
+        if snapshot is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            snapshot = DesignSystemSnapshot(text, path)
+            key = snapshot.content_hash
+            snapshot = self._load_cached(folder, key, path) or self._cache(folder, key, snapshot)
+        snapshot = self._intern(snapshot)
+
+        with self._lock:
+            self._by_path[path] = (signature, snapshot)
+        return snapshot
+
+    def _get_stored(self, path: str) -> DesignSystemSnapshot:
+        """Materialize a snapshot whose file was packed into the snapshot store."""
+        folder, filename = os.path.split(path)
+        store = get_store(folder)
+        ref = store.refs().get(filename)
+        if not ref:
+            raise FileNotFoundError(f"Design system snapshot not found: {path}")
+        signature = ('stored', ref['hash'])
+
+        with self._lock:
+            cached = self._by_path.get(path)
+            if cached and cached[0] == signature:
+                return cached[1]
+
+        snapshot = self._load_cached(folder, ref['hash'], path)
+        if snapshot is None:
+            text = store.read_text(filename, ref['hash'])
+            snapshot = self._cache(folder, ref['hash'], DesignSystemSnapshot(text, path))
+        snapshot = self._intern(snapshot)
+
+        with self._lock:
+            self._by_path[path] = (signature, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _manifest_key(path: str, signature: Tuple[Any, Any]) -> Optional[str]:
+        folder, filename = os.path.split(path)
+        if not is_snapshot_filename(filename):
+            return None
+        entry = get_manifest(folder).entries().get(filename)
+        if entry and (entry.get('size'), entry.get('mtime_ns')) == signature:
+            return entry['content_hash']
+        return None
+
+    def mapped(self, path: PathLike) -> MappedSnapshot:
+        """
+        Memory-mapped view of a snapshot file for per-component access.
+
+        The map is built once per snapshot version next to the sidecar cache;
+        later calls (and processes) only decode its offset index. Building it
+        parses the file once without registering a snapshot, so the parsed
+        data is freed as soon as the map is written.
+        """
+        path = os.path.abspath(path)
+        folder, filename = os.path.split(path)
+        text = None
+        if os.path.exists(path):
+            stat = os.stat(path)
+            key = self._manifest_key(path, (stat.st_size, stat.st_mtime_ns))
+            if key is None:
+                with open(path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+                key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        else:
+            ref = get_store(folder).refs().get(filename)
+            if not ref:
+                raise FileNotFoundError(f"Design system snapshot not found: {path}")
+            key = ref['hash']
+
+        with self._lock:
+            mapped = self._mapped.get(key)
+            loaded = self._by_hash.get(key)
+        if mapped is not None:
+            return mapped
+
+        map_path = Path(folder) / snapshot_cache.CACHE_DIRNAME / f"{key}.dsmap"
+        try:
+            mapped = MappedSnapshot(map_path) if map_path.exists() else None
+        except ValueError:
+            mapped = None
+        if mapped is None:
+            if loaded is not None:
+                data = loaded.plain_data()
+            elif os.path.exists(path):
+                if text is None:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                data = json.loads(text)
+            else:
+                data = get_store(folder).get(key)
+            build_mapped_snapshot(data, map_path)
+            del data, text
+            mapped = MappedSnapshot(map_path)
+        with self._lock:
+            return self._mapped.setdefault(key, mapped)
+
+    def _load_cached(self, folder: str, key: str, path: str) -> Optional[DesignSystemSnapshot]:
+        entry = snapshot_cache.load(folder, key)
+        if entry is None:
+            return None
+        with self._lock:
+            # Already loaded under another filename: keep the existing instance
+            if entry['content_hash'] in self._by_hash:
+                return self._by_hash[entry['content_hash']]
+        snapshot = DesignSystemSnapshot(entry['text'], path, entry['content_hash'], entry['data'],
+                                        entry['renders'], entry.get('render_deps'))
+        snapshot.on_render = self._persister(folder, key)
+        return snapshot
+
+    def _cache(self, folder: str, key: str, snapshot: DesignSystemSnapshot) -> DesignSystemSnapshot:
+        persist = self._persister(folder, key)
+        persist(snapshot)
+        snapshot.on_render = persist
+        return snapshot
+
+    @staticmethod
+    def _persister(folder: str, key: str) -> Callable[[DesignSystemSnapshot], None]:
+        def persist(snapshot: DesignSystemSnapshot):
+            snapshot_cache.save(folder, key, snapshot.content_hash, snapshot.plain_data(),
+                                snapshot.text, snapshot._renders, snapshot._render_deps)
+        return persist
+
+    def latest(self, folder: PathLike = DESIGN_SYSTEM_FOLDER) -> Optional[DesignSystemSnapshot]:
+        """Newest snapshot in folder, or None when there is none."""
+        # Manifest lookup instead of globbing and parsing every filename
+        newest_file = get_manifest(folder).current_path()
+        if not newest_file:
+            return None
+        snapshot = self.get(newest_file)
+
+        # A new scan arrived: keep the renders and indexes its changes did not invalidate
+        folder_key = os.path.abspath(folder)
+        with self._lock:
+            previous = self._latest_by_folder.get(folder_key)
+            self._latest_by_folder[folder_key] = snapshot
+        if previous is not None and previous is not snapshot:
+            inherited = snapshot.inherit(previous)
+            if inherited:
+                print(f"♻️ Reused {len(inherited)} design system render(s)/index(es) unaffected by the new scan: {', '.join(inherited)}")
+        return snapshot
+
+    def from_data(self, data: Any) -> DesignSystemSnapshot:
+        """Snapshot for in-memory data, shared with any identical snapshot."""
+        return self._intern(DesignSystemSnapshot.from_data(data))
+
+    def _intern(self, snapshot: DesignSystemSnapshot) -> DesignSystemSnapshot:
+        # Identical exports (same bytes) share one parsed instance
+        with self._lock:
+            return self._by_hash.setdefault(snapshot.content_hash, snapshot)
+
+    def discard(self, content_hash: str) -> bool:
+        """
+        Forget a snapshot so its memory can be freed once callers drop it.
+
+        The newest snapshot of a folder is kept (the pipeline falls back to it);
+        returns whether the snapshot was dropped. A later get() reloads it.
+        """
+        with self._lock:
+            if any(s.content_hash == content_hash for s in self._latest_by_folder.values()):
+                return False
+            self._by_hash.pop(content_hash, None)
+            for path in [p for p, (_, s) in self._by_path.items() if s.content_hash == content_hash]:
+                del self._by_path[path]
+            self._mapped.pop(content_hash, None)
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._by_path.clear()
+            self._by_hash.clear()
+            self._latest_by_folder.clear()
+            self._mapped.clear()
+
+
+_registry = DesignSystemRegistry()
+
+
+def get_registry() -> DesignSystemRegistry:
+    """The process-wide registry instance."""
+    return _registry
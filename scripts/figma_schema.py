@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Formal schema of the figma-ready format.
+
+The format the renderer (src/core/figma-renderer.ts) consumes, written down as
+data: a root container (either a layoutContainer node or
+{'layoutContainer': {...properties}, 'items': [...]}), then a tree of nodes
+under 'items', each dispatched on 'type'. NODE_TYPES lists the fields each
+node type may carry; fields not listed are allowed and ignored, as the
+renderer ignores them.
+
+validate_interpreted() checks a document by interpreting the schema. It is
+the reference implementation; scripts/schema_compiler.py compiles the same
+schema into straight-line functions that report identical issues much faster.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+SIZING_VALUES = ('FILL', 'HUG', 'FIXED', 'AUTO')
+AXIS_SIZING_VALUES = ('FIXED', 'AUTO')
+LAYOUT_MODES = ('HORIZONTAL', 'VERTICAL', 'NONE')
+LAYOUT_ALIGN_VALUES = ('MIN', 'CENTER', 'MAX', 'STRETCH', 'INHERIT')
+PRIMARY_AXIS_ALIGN_VALUES = ('MIN', 'CENTER', 'MAX', 'SPACE_BETWEEN')
+COUNTER_AXIS_ALIGN_VALUES = ('MIN', 'CENTER', 'MAX', 'BASELINE')
+LAYOUT_WRAP_VALUES = ('NO_WRAP', 'WRAP')
+LAYOUT_POSITIONING_VALUES = ('AUTO', 'ABSOLUTE')
+PARENT_LAYOUTS = ('VERTICAL', 'HORIZONTAL', 'VERTICAL_IN_HORIZONTAL')
+# Instance sublayer ids: '123:456', nested 'I123:456;789:10'
+NODE_ID_PATTERN = r'^I?\d+:\d+(;\d+:\d+)*$'
+
+# Schema type name -> Python types it accepts (bool is not a number)
+TYPES = {
+    'string': (str,),
+    'number': (int, float),
+    'boolean': (bool,),
+    'object': (dict,),
+    'array': (list,),
+    'null': (type(None),),
+}
+
+
+@dataclass(frozen=True)
+class Field:
+    types: Tuple[str, ...]
+    required: bool = False
+    # Allowed string values
+    enum: Optional[Tuple[str, ...]] = None
+    # Lower bound for numbers
+    minimum: Optional[float] = None
+    # Objects: schema of known keys, types of every value, pattern of every key
+    fields: Optional[Dict[str, 'Field']] = None
+    values: Optional[Tuple[str, ...]] = None
+    key_pattern: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class NodeSchema:
+    fields: Dict[str, Field]
+    # Whether 'items' children are rendered
+    container: bool = False
+
+
+class SchemaIssue(NamedTuple):
+    rule: str
+    path: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[{self.rule}] {self.path}: {self.message}"
+
+
+def _size(required: bool = False) -> Field:
+    return Field(('number',), required=required, minimum=0)
+
+
+# Fields every node placed in 'items' may carry (applied by its parent's auto-layout)
+CHILD_FIELDS = {
+    'type': Field(('string',), required=True),
+    'name': Field(('string',)),
+    'horizontalSizing': Field(('string',), enum=SIZING_VALUES),
+    'verticalSizing': Field(('string',), enum=SIZING_VALUES),
+    'layoutAlign': Field(('string',), enum=LAYOUT_ALIGN_VALUES),
+    'layoutGrow': Field(('number',), minimum=0),
+    'layoutPositioning': Field(('string',), enum=LAYOUT_POSITIONING_VALUES),
+    'width': _size(),
+    'height': _size(),
+    'minWidth': _size(),
+    'maxWidth': _size(),
+    'minHeight': _size(),
+    'maxHeight': _size(),
+}
+
+# Auto-layout frame properties, on layoutContainer nodes and on the root
+CONTAINER_FIELDS = {
+    'layoutMode': Field(('string',), enum=LAYOUT_MODES),
+    'items': Field(('array',)),
+    'itemSpacing': Field(('number', 'string'), enum=('AUTO',), minimum=0),
+    'paddingTop': _size(),
+    'paddingBottom': _size(),
+    'paddingLeft': _size(),
+    'paddingRight': _size(),
+    'primaryAxisSizingMode': Field(('string',), enum=AXIS_SIZING_VALUES),
+    'counterAxisSizingMode': Field(('string',), enum=AXIS_SIZING_VALUES),
+    'primaryAxisAlignItems': Field(('string',), enum=PRIMARY_AXIS_ALIGN_VALUES),
+    'counterAxisAlignItems': Field(('string',), enum=COUNTER_AXIS_ALIGN_VALUES),
+    'layoutWrap': Field(('string',), enum=LAYOUT_WRAP_VALUES),
+    'backgroundColor': Field(('string', 'object')),
+}
+
+SHAPE_PROPERTIES = Field(('object',), required=True, fields={
+    'width': _size(),
+    'height': _size(),
+    'cornerRadius': _size(),
+    'fill': Field(('string', 'object')),
+})
+
+NODE_TYPES: Dict[str, NodeSchema] = {
+    'layoutContainer': NodeSchema({
+        **CHILD_FIELDS,
+        **CONTAINER_FIELDS,
+        'layoutMode': Field(('string',), required=True, enum=LAYOUT_MODES),
+        'items': Field(('array',), required=True),
+    }, container=True),
+    'component': NodeSchema({
+        **CHILD_FIELDS,
+        'componentNodeId': Field(('string',), required=True),
+        'properties': Field(('object',)),
+        'variants': Field(('object',), values=('string', 'boolean')),
+        'visibilityOverrides': Field(('object',), values=('boolean',), key_pattern=NODE_ID_PATTERN),
+        'iconSwaps': Field(('object',), values=('string',)),
+    }),
+    'native-text': NodeSchema({
+        **CHILD_FIELDS,
+        'properties': Field(('object',), required=True, fields={
+            'content': Field(('string',), required=True),
+            'textStyle': Field(('string',)),
+            'color': Field(('string', 'object')),
+            'colorStyleName': Field(('string',)),
+            'alignment': Field(('string',)),
+            'fontSize': Field(('number',), minimum=1),
+        }),
+        '_useFlexFill': Field(('boolean',)),
+        '_parentLayout': Field(('string',), enum=PARENT_LAYOUTS),
+    }),
+    'native-rectangle': NodeSchema({**CHILD_FIELDS, 'properties': SHAPE_PROPERTIES}),
+    'native-circle': NodeSchema({**CHILD_FIELDS, 'properties': SHAPE_PROPERTIES}),
+}
+
+# The root frame: the viewport, so no child fields; wrapper-format roots keep
+# the frame properties in 'layoutContainer'
+ROOT = NodeSchema({
+    **CONTAINER_FIELDS,
+    'layoutContainer': Field(('object',), fields={**CONTAINER_FIELDS, 'name': Field(('string',))}),
+    'name': Field(('string',)),
+    'width': _size(),
+    'minHeight': _size(),
+}, container=True)
+
+
+def type_names(value: Any) -> str:
+    for name, python_types in TYPES.items():
+        if type(value) in python_types:
+            return name
+    return type(value).__name__
+
+
+# Issue messages, shared with the compiled validator so both report the same text
+
+def missing_message(name: str) -> str:
+    return f"missing required {name!r}"
+
+
+def type_message(name: str, types: Tuple[str, ...], value: Any) -> str:
+    return f"{name!r} must be {' or '.join(types)}, got {type_names(value)}"
+
+
+def enum_message(name: str, enum: Tuple[str, ...], value: Any) -> str:
+    return f"{name!r} must be one of {', '.join(enum)}, got {value!r}"
+
+
+def minimum_message(name: str, minimum: float, value: Any) -> str:
+    return f"{name!r} must be >= {minimum}, got {value!r}"
+
+
+def key_message(name: str, key: str, pattern: str) -> str:
+    return f"{name!r} key {key!r} does not match {pattern}"
+
+
+def _check_field(name: str, spec: Field, value: Any, path: str, issues: List[SchemaIssue]):
+    types = [t for t in spec.types if type(value) in TYPES[t]]
+    if not types:
+        issues.append(SchemaIssue('type', path, type_message(name, spec.types, value)))
+        return
+    kind = types[0]
+    if kind == 'string' and spec.enum is not None and value not in spec.enum:
+        issues.append(SchemaIssue('enum', path, enum_message(name, spec.enum, value)))
+    elif kind == 'number' and spec.minimum is not None and value < spec.minimum:
+        issues.append(SchemaIssue('minimum', path, minimum_message(name, spec.minimum, value)))
+    elif kind == 'object':
+        if spec.fields is not None:
+            _check_fields(spec.fields, value, path, issues)
+        if spec.values is not None or spec.key_pattern is not None:
+            pattern = re.compile(spec.key_pattern) if spec.key_pattern else None
+            for key, item in value.items():
+                item_path = f"{path}.{key}"
+                if pattern is not None and not pattern.match(key):
+                    issues.append(SchemaIssue('key', item_path, key_message(name, key, spec.key_pattern)))
+                if spec.values is not None and not any(type(item) in TYPES[t] for t in spec.values):
+                    issues.append(SchemaIssue('type', item_path, type_message(key, spec.values, item)))
+
+
+def _check_fields(fields: Dict[str, Field], node: Dict[str, Any], path: str, issues: List[SchemaIssue]):
+    for name, spec in fields.items():
+        if name not in node:
+            if spec.required:
+                issues.append(SchemaIssue('required', f"{path}.{name}", missing_message(name)))
+            continue
+        _check_field(name, spec, node[name], f"{path}.{name}", issues)
+
+
+def validate_interpreted(document: Any, node_types: Dict[str, NodeSchema] = NODE_TYPES,
+                         root: NodeSchema = ROOT) -> List[SchemaIssue]:
+    """Schema issues of document, found by interpreting the schema (reference implementation)."""
+    issues: List[SchemaIssue] = []
+    if not isinstance(document, dict):
+        return [SchemaIssue('type', '$', type_message('document', ('object',), document))]
+
+    if document.get('type') == 'layoutContainer':
+        stack = [(document, '$')]
+    else:
+        _check_fields(root.fields, document, '$', issues)
+        wrapper = document.get('layoutContainer')
+        items_owner = document if 'items' in document or not isinstance(wrapper, dict) else wrapper
+        owner_path = '$' if items_owner is document else '$.layoutContainer'
+        items = items_owner.get('items')
+        if not isinstance(items, list):
+            if 'items' not in items_owner:
+                issues.append(SchemaIssue('required', f"{owner_path}.items", missing_message('items')))
+            items = []
+        stack = [(item, f"{owner_path}.items[{i}]") for i, item in reversed(list(enumerate(items)))]
+
+    while stack:
+        node, path = stack.pop()
+        if not isinstance(node, dict):
+            issues.append(SchemaIssue('type', path, type_message('item', ('object',), node)))
+            continue
+        node_type = node.get('type')
+        schema = node_types.get(node_type)
+        if schema is not None:
+            _check_fields(schema.fields, node, path, issues)
+        elif 'type' not in node:
+            issues.append(SchemaIssue('required', f"{path}.type", missing_message('type')))
+        else:
+            issues.append(SchemaIssue('unknown-type', f"{path}.type", f"unknown node type {node_type!r}"))
+        items = node.get('items')
+        if isinstance(items, list):
+            if schema is not None and not schema.container:
+                issues.append(SchemaIssue('unexpected-items', f"{path}.items",
+                                          f"{node_type} items are not rendered"))
+            stack.extend((item, f"{path}.items[{i}]") for i, item in reversed(list(enumerate(items))))
+    return issues
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Headless renderer: figma-ready JSON -> approximate PNG, without Figma.
+
+A local stand-in for the plugin screenshot, so the visual stages (4 and 5 of
+alt3-visual) can run unattended. Boxes come from the auto-layout simulator
+(scripts/auto_layout.py); each node is then drawn with Pillow, clipped to the
+frames above it:
+
+- frames        backgroundColor (white when unset, like a new Figma frame)
+- shapes        fill and cornerRadius; image fills as a grey placeholder
+- text          wrapped lines in the text style's size, line height and color
+                (installed font files when available, else Pillow's font)
+- components    a placeholder of the instance's box with its component name
+                and text properties
+
+Colors may be hex strings, color style names of the snapshot, or Figma
+{'r', 'g', 'b'} / {'type': 'SOLID', 'color': ...} paints.
+
+Usage:
+    python scripts/headless_renderer.py figma-ready/figma_ready_<run_id>.json [more.json ...] [--out screenshots]
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.auto_layout import Box, LayoutEngine, visible_regions
+from scripts.color_index import parse_hex
+from scripts.text_metrics import TextFitter, TextStyle, font_file, get_text_fitter, layout_text
+from scripts.tree_walker import frame_properties
+
+RGBA = Tuple[int, int, int, int]
+
+FRAME_FILL: RGBA = (255, 255, 255, 255)
+TEXT_COLOR: RGBA = (0, 0, 0, 255)
+IMAGE_FILL: RGBA = (204, 204, 204, 255)
+SHAPE_FILL: RGBA = (217, 217, 217, 255)
+COMPONENT_FILL: RGBA = (236, 236, 242, 255)
+COMPONENT_OUTLINE: RGBA = (150, 150, 166, 255)
+COMPONENT_LABEL: RGBA = (110, 110, 124, 255)
+COMPONENT_LABEL_SIZE = 10
+
+
+def color_styles(snapshot) -> Dict[str, RGBA]:
+    """Color style name -> RGBA of a snapshot."""
+    styles: Dict[str, RGBA] = {}
+    if snapshot is None:
+        return styles
+    for name, style in snapshot.color_styles_by_name.items():
+        info = style.get('colorInfo') or {}
+        rgb = parse_hex(info.get('color', ''))
+        if rgb is not None:
+            styles[name] = (*rgb, round(255 * float(info.get('opacity', 1) or 1)))
+    return styles
+
+
+def resolve_color(value: Any, styles: Dict[str, RGBA]) -> Optional[RGBA]:
+    """RGBA of a hex string, color style name or Figma color / paint dict; None if not a color."""
+    if isinstance(value, str):
+        if value in styles:
+            return styles[value]
+        rgb = parse_hex(value)
+        if rgb is None:
+            return None
+        digits = value.strip().lstrip('#')
+        alpha = int(digits[6:8], 16) if len(digits) == 8 else 255
+        return (*rgb, alpha)
+    if isinstance(value, dict):
+        if isinstance(value.get('color'), (dict, str)):
+            color = resolve_color(value['color'], styles)
+            opacity = value.get('opacity')
+            if color is not None and isinstance(opacity, (int, float)):
+                color = (*color[:3], round(color[3] * opacity))
+            return color
+        if all(isinstance(value.get(channel), (int, float)) for channel in 'rgb'):
+            alpha = value.get('a', 1)
+            return tuple(round(255 * min(max(float(c), 0.0), 1.0))
+                         for c in (value['r'], value['g'], value['b'], alpha if isinstance(alpha, (int, float)) else 1))
+    return None
+
+
+_fonts: Dict[Tuple[str, str, int], Any] = {}
+
+
+def require_pillow():
+    """Raise ImportError with an install hint when Pillow is missing (nothing can be drawn without it)."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError as e:
+        raise ImportError("Local screenshots need Pillow: pip install Pillow (see requirements.txt)") from e
+
+
+def _font(style: TextStyle, scale: float):
+    from PIL import ImageFont
+
+    size = max(round(style.font_size * scale), 1)
+    key = (style.family, style.style, size)
+    font = _fonts.get(key)
+    if font is None:
+        path = font_file(style.family, style.style)
+        try:
+            font = ImageFont.truetype(str(path), size) if path else ImageFont.load_default(size)
+        except (OSError, TypeError):
+            # Pillow without FreeType: fixed-size bitmap font
+            font = ImageFont.load_default()
+        _fonts[key] = font
+    return font
+
+
+class HeadlessRenderer:
+    """Draws figma-ready documents with the colors and text styles of a snapshot (optional)."""
+
+    def __init__(self, snapshot=None, fitter: Optional[TextFitter] = None, scale: float = 1.0):
+        require_pillow()
+        self.fitter = fitter if fitter is not None or snapshot is None else get_text_fitter(snapshot)
+        self.engine = LayoutEngine(snapshot, self.fitter)
+        self.components = snapshot.components_by_id if snapshot is not None else {}
+        self.styles = color_styles(snapshot)
+        self.scale = scale
+
+    def render(self, document: Dict[str, Any]):
+        """PIL image of document."""
+        from PIL import Image
+
+        boxes = self.engine.layout(document)
+        root = boxes[0]
+        canvas = Image.new('RGBA', (self._px(root.width), self._px(root.height)), FRAME_FILL)
+        for box, region in zip(boxes, visible_regions(boxes)):
+            draw = self._painter(box)
+            if draw is not None:
+                self._clipped(canvas, box, region, draw)
+        return canvas.convert('RGB')
+
+    def render_to_file(self, document: Dict[str, Any], path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.render(document).save(path, 'PNG')
+        return path
+
+    def _px(self, value: float) -> int:
+        return max(round(value * self.scale), 1)
+
+    def _clipped(self, canvas, box: Box, region: Tuple[float, float, float, float], draw: Callable):
+        """Run draw(ImageDraw, box origin) on a layer the size of the visible region, then composite it."""
+        from PIL import Image, ImageDraw
+
+        left, top, right, bottom = (round(v * self.scale) for v in region)
+        if right - left < 1 or bottom - top < 1:
+            return
+        layer = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+        draw(ImageDraw.Draw(layer), (box.x * self.scale - left, box.y * self.scale - top))
+        canvas.alpha_composite(layer, (left, top))
+
+    def _painter(self, box: Box) -> Optional[Callable]:
+        node = box.node or {}
+        properties = node.get('properties') if isinstance(node.get('properties'), dict) else {}
+        width, height = box.width * self.scale, box.height * self.scale
+        radius = properties.get('cornerRadius', node.get('cornerRadius'))
+        radius = radius * self.scale if isinstance(radius, (int, float)) and not isinstance(radius, bool) else 0
+
+        if box.type in ('layoutContainer', 'root'):
+            fill = resolve_color(frame_properties(node).get('backgroundColor'), self.styles) or FRAME_FILL
+            return lambda draw, origin: self._rectangle(draw, origin, width, height, fill, None, radius)
+
+        if box.type in ('native-rectangle', 'native-circle'):
+            paint = properties.get('fill', node.get('fill'))
+            is_image = isinstance(paint, dict) and paint.get('type') == 'IMAGE'
+            fill = IMAGE_FILL if is_image else (resolve_color(paint, self.styles) or SHAPE_FILL)
+            if box.type == 'native-circle':
+                return lambda draw, origin: draw.ellipse(
+                    [origin[0], origin[1], origin[0] + width - 1, origin[1] + height - 1], fill=fill)
+
+            def shape(draw, origin):
+                self._rectangle(draw, origin, width, height, fill, None, radius)
+                if is_image:
+                    x, y = origin
+                    draw.line([x, y, x + width - 1, y + height - 1], fill=COMPONENT_OUTLINE)
+                    draw.line([x, y + height - 1, x + width - 1, y], fill=COMPONENT_OUTLINE)
+            return shape
+
+        if box.type == 'native-text':
+            content = properties.get('content')
+            if not isinstance(content, str) or not content:
+                return None
+            style = self.engine.text_style(properties)
+            color = resolve_color(properties.get('colorStyleName'), self.styles) \
+                or resolve_color(properties.get('color'), self.styles) or TEXT_COLOR
+            alignment = str(properties.get('alignment', 'LEFT')).upper()
+            return lambda draw, origin: self._text(draw, origin, content, style, box.width, color, alignment)
+
+        if box.type == 'component':
+            component = self.components.get(node.get('componentNodeId')) or {}
+            label = str(component.get('name') or node.get('componentNodeId') or 'component')
+            texts = self.engine.component_texts(node)
+            return lambda draw, origin: self._component(draw, origin, width, height, label, texts)
+        return None
+
+    @staticmethod
+    def _rectangle(draw, origin: Tuple[float, float], width: float, height: float,
+                   fill: Optional[RGBA], outline: Optional[RGBA], radius: float):
+        x, y = origin
+        shape = [x, y, x + max(width - 1, 0), y + max(height - 1, 0)]
+        if radius > 0:
+            draw.rounded_rectangle(shape, radius=min(radius, width / 2, height / 2), fill=fill, outline=outline)
+        else:
+            draw.rectangle(shape, fill=fill, outline=outline)
+
+    def _text(self, draw, origin: Tuple[float, float], content: str, style: TextStyle, width: float,
+              color: RGBA, alignment: str):
+        font = _font(style, self.scale)
+        layout = layout_text(content, style, width)
+        x, y = origin
+        line_height = style.line_height * self.scale
+        for i, line in enumerate(layout.lines):
+            text = line.upper() if style.upper else line
+            offset = 0.0
+            if alignment in ('CENTER', 'RIGHT', 'END'):
+                free = width * self.scale - draw.textlength(text, font=font)
+                offset = free / 2 if alignment == 'CENTER' else free
+            # Glyphs sit in the middle of their line box
+            draw.text((x + offset, y + i * line_height + line_height / 2), text, fill=color, font=font, anchor='lm')
+
+    def _component(self, draw, origin: Tuple[float, float], width: float, height: float,
+                   label: str, texts: List[Tuple[str, TextStyle]]):
+        self._rectangle(draw, origin, width, height, COMPONENT_FILL, COMPONENT_OUTLINE, min(8 * self.scale, height / 2))
+        x, y = origin
+        padding = 6 * self.scale
+        # Icons and other small instances stay plain boxes
+        if height < 28 * self.scale:
+            return
+        labelled = height >= 40 * self.scale
+        if labelled:
+            label_font = _font(TextStyle.default(COMPONENT_LABEL_SIZE), self.scale)
+            draw.text((x + padding, y + padding), label, fill=COMPONENT_LABEL, font=label_font, anchor='lt')
+        if texts:
+            style = texts[0][1]
+            draw.text((x + padding, y + height / 2 + (4 * self.scale if labelled else 0)),
+                      ' · '.join(text for text, _ in texts), fill=TEXT_COLOR, font=_font(style, self.scale),
+                      anchor='lm')
+
+
+def render_figma_json(document: Dict[str, Any], path, snapshot=None, scale: float = 1.0) -> Path:
+    """Render document to a PNG at path; returns the path."""
+    return HeadlessRenderer(snapshot, scale=scale).render_to_file(document, path)
+
+
+_worker_renderer: Optional[HeadlessRenderer] = None
+
+
+def _init_worker(snapshot_path: Optional[str], scale: float):
+    global _worker_renderer
+    from scripts.design_system_registry import get_registry
+    snapshot = get_registry().get(snapshot_path) if snapshot_path else None
+    _worker_renderer = HeadlessRenderer(snapshot, scale=scale)
+
+
+def _render_file(job: Tuple[str, str]) -> Tuple[str, Optional[str]]:
+    """(output path, error) for one (input, output) pair; runs in a worker process."""
+    import json
+    source, target = job
+    try:
+        document = json.loads(Path(source).read_text(encoding='utf-8'))
+        _worker_renderer.render_to_file(document, target)
+        return target, None
+    except (OSError, ValueError, AttributeError, TypeError) as e:
+        return target, f"{type(e).__name__}: {e}"
+
+
+def main():
+    import argparse
+    import os
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from scripts.design_system_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Render figma-ready JSON to PNG without Figma")
+    parser.add_argument("files", nargs='+', help="figma-ready JSON files")
+    parser.add_argument("--out", default="screenshots", help="Output folder (default: screenshots)")
+    parser.add_argument("--scale", type=float, default=1.0, help="Pixel scale (2 for retina)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        require_pillow()
+    except ImportError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("⚠️ No design system snapshot found, rendering with default colors and fonts")
+    out = Path(args.out)
+    jobs = [(source, str(out / f"{Path(source).stem.replace('figma_ready_', 'screenshot_')}.png"))
+            for source in args.files]
+
+    started = time.perf_counter()
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+    failed = 0
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(snapshot.path if snapshot is not None else None, args.scale)) as pool:
+        for target, error in pool.map(_render_file, jobs):
+            if error:
+                failed += 1
+                print(f"❌ {target}: {error}")
+            else:
+                print(f"🖼️ {target}")
+    print(f"{'✅' if not failed else '⚠️'} Rendered {len(jobs) - failed}/{len(jobs)} "
+          f"in {time.perf_counter() - started:.2f} s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Icon name resolution for figma-ready iconSwaps.
+
+iconSwaps values are icon names guessed by the model ('settings', 'arrow_back',
+'profile-icon') or node ids ('635:4140'). The plugin swaps to the first icon
+component whose name contains the value, so a wrong guess silently does
+nothing and a vague one picks an arbitrary icon.
+
+IconIndex holds every icon component of a snapshot (suggestedType 'icon' or
+a name under 'icon/') and resolves a requested value in order:
+
+1. node id or exact name of an icon
+2. exact bare name ('settings' -> 'icon/settings'), also via a small synonym
+   table ('gear' -> 'settings')
+3. prefix trie over bare names and name words ('notif' -> 'icon/notifications')
+4. fuzzy match (trigrams + edit distance, see component_index)
+
+Variant values (Filled / Outlined, ...) count as extra words of an icon that
+already shares a name word, so 'star outlined' prefers the star set that has
+an Outlined variant. IconResolver (a TreeWalker visitor) rewrites every
+guessed iconSwaps value of a document to the full icon name; node ids and
+exact names are kept.
+
+Usage:
+    python scripts/icon_index.py <icon> [<icon> ...]
+    python scripts/icon_index.py --file figma-ready/figma_ready_<run_id>.json
+"""
+
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.component_index import ID_PATTERN, ComponentIndex
+from scripts.tree_walker import Node, TreeWalker
+
+ICON_PREFIX = 'icon/'
+
+# Words that only say "this is an icon"
+ICON_NOISE_WORDS = frozenset({'icon', 'icons', 'ic', 'glyph', 'symbol'})
+
+# Common names the model uses -> bare icon names (applied only when the target exists)
+ICON_SYNONYMS = {
+    'back': 'arrow', 'arrow back': 'arrow', 'arrow left': 'arrow', 'left arrow': 'arrow',
+    'forward': 'chevron', 'next': 'chevron', 'chevron right': 'chevron', 'expand': 'chevron',
+    'profile': 'person', 'user': 'person', 'account': 'person', 'avatar': 'person',
+    'message': 'chat', 'messages': 'chat', 'conversation': 'chat',
+    'notification': 'notifications', 'bell': 'notifications', 'alert': 'warning',
+    'trash': 'delete', 'bin': 'delete', 'remove': 'delete',
+    'pencil': 'edit', 'gear': 'settings', 'cog': 'settings', 'preferences': 'settings',
+    'magnifier': 'search', 'find': 'search',
+    'location': 'place', 'location on': 'place', 'pin': 'place', 'map': 'place',
+    'clock': 'access time', 'time': 'access time', 'calendar': 'calendar today', 'date': 'calendar today',
+    'mail': 'email', 'envelope': 'email', 'call': 'phone', 'telephone': 'phone',
+    'visibility': 'eye', 'view': 'eye', 'show': 'eye', 'hamburger': 'menu',
+    'more vert': 'more', 'more horiz': 'more', 'dots': 'more', 'options': 'more',
+    'filter list': 'filter', 'tune': 'filter', 'plus': 'add', 'x': 'close', 'dismiss': 'close',
+    'check': 'done', 'tick': 'done', 'ok': 'done', 'like': 'thumb up', 'favorite': 'star',
+    'download': 'file download', 'copy': 'content copy', 'reload': 'refresh', 'shop': 'storefront',
+    'store': 'storefront', 'shipping': 'local shipping', 'delivery': 'local shipping',
+    'tag': 'local offer', 'offer': 'local offer', 'price': 'local offer',
+    'logout': 'logout', 'sign out': 'logout', 'help outline': 'help', 'question': 'help',
+    'info outline': 'info', 'verified': 'verified user', 'shield': 'security', 'camera alt': 'camera',
+    'photo camera': 'camera', 'voice': 'microphone', 'mic': 'microphone', 'play': 'play arrow',
+}
+
+# Score of a unique prefix match; several completions share the match
+PREFIX_SCORE = 0.9
+SYNONYM_SCORE = 0.95
+MIN_FUZZY_SCORE = 0.7
+
+
+def icon_words(text: str) -> str:
+    """'icon/arrow_back', 'Arrow-Back Icon' -> 'arrow back'."""
+    text = str(text).strip()
+    if text.lower().startswith(ICON_PREFIX):
+        text = text[len(ICON_PREFIX):]
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    words = re.split(r'[^0-9a-z]+', text.lower())
+    return ' '.join(w for w in words if w and w not in ICON_NOISE_WORDS)
+
+
+def is_icon_component(component: Any) -> bool:
+    return component.get('suggestedType') == 'icon' or str(component.get('name', '')).lower().startswith(ICON_PREFIX)
+
+
+class PrefixTrie:
+    """Words -> values, queried by prefix."""
+
+    _VALUES = '$'
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+
+    def insert(self, word: str, value: int):
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        node.setdefault(self._VALUES, set()).add(value)
+
+    def contains(self, word: str) -> bool:
+        node = self._root
+        for char in word:
+            node = node.get(char)
+            if node is None:
+                return False
+        return self._VALUES in node
+
+    def starting_with(self, prefix: str) -> Set[int]:
+        """Values of every word that starts with prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        found: Set[int] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for key, child in node.items():
+                if key == self._VALUES:
+                    found.update(child)
+                else:
+                    stack.append(child)
+        return found
+
+
+@dataclass
+class IconResolution:
+    icon_id: str
+    name: str
+    score: float
+    reason: str
+
+    def matches(self, requested: str) -> bool:
+        """Whether requested already points at this icon exactly (node id or full name)."""
+        # Names are not unique (several 'icon/warning' sets), so a node id must stay an id
+        return self.reason == 'node id' or self.name == requested
+
+
+class IconIndex:
+    """Icon components of one snapshot, indexed for name / prefix / fuzzy lookup."""
+
+    def __init__(self, components: Sequence[Any]):
+        self.icons: List[Any] = []
+        self._position_by_id: Dict[str, int] = {}
+        self._positions_by_name: Dict[str, List[int]] = {}
+        self._positions_by_words: Dict[str, List[int]] = {}
+        self._names = PrefixTrie()     # bare name ('play arrow')
+        self._words = PrefixTrie()     # single words of names
+        self._variant_words = PrefixTrie()
+        self._cache: Dict[str, Optional[IconResolution]] = {}
+        self._lock = threading.Lock()
+
+        for component in components:
+            if not is_icon_component(component) or component.get('id') in self._position_by_id:
+                continue
+            position = len(self.icons)
+            self.icons.append(component)
+            name = component.get('name', '')
+            words = icon_words(name)
+            self._position_by_id[component['id']] = position
+            self._positions_by_name.setdefault(name.lower(), []).append(position)
+            self._positions_by_words.setdefault(words, []).append(position)
+            self._names.insert(words, position)
+            for word in set(words.split()):
+                self._words.insert(word, position)
+            for values in (component.get('variantOptions') or {}).values():
+                for value in values:
+                    for word in icon_words(value).split():
+                        self._variant_words.insert(word, position)
+
+        # Fuzzy fallback over icons only, scored on the bare name
+        self._fuzzy = ComponentIndex([
+            {'id': icon['id'], 'name': icon_words(icon.get('name', ''))} for icon in self.icons
+        ])
+
+    def __len__(self) -> int:
+        return len(self.icons)
+
+    def _resolution(self, position: int, score: float, reason: str) -> IconResolution:
+        icon = self.icons[position]
+        return IconResolution(icon['id'], icon.get('name', ''), round(score, 3), reason)
+
+    def _first(self, positions: Sequence[int]) -> int:
+        # Duplicate names (several 'icon/star' sets): the first one, as the plugin would
+        return min(positions)
+
+    def resolve(self, requested: Any) -> Optional[IconResolution]:
+        """Icon for a requested name or node id, or None if nothing matches well enough."""
+        requested = '' if requested is None else str(requested).strip()
+        with self._lock:
+            if requested in self._cache:
+                return self._cache[requested]
+        resolution = self._resolve(requested)
+        with self._lock:
+            self._cache[requested] = resolution
+        return resolution
+
+    def _resolve(self, requested: str) -> Optional[IconResolution]:
+        if requested in self._position_by_id:
+            return self._resolution(self._position_by_id[requested], 1.0, 'node id')
+        if ID_PATTERN.match(requested):
+            # An id outside the icon set cannot be guessed from
+            return None
+        if requested.lower() in self._positions_by_name:
+            return self._resolution(self._first(self._positions_by_name[requested.lower()]), 1.0, 'exact name')
+
+        words = icon_words(requested)
+        if not words:
+            return None
+        if words in self._positions_by_words:
+            return self._resolution(self._first(self._positions_by_words[words]), 1.0, 'name')
+        synonym = ICON_SYNONYMS.get(words)
+        if synonym in self._positions_by_words:
+            return self._resolution(self._first(self._positions_by_words[synonym]), SYNONYM_SCORE, 'synonym')
+
+        # A truncated name: 'notif' -> 'notifications'; the shortest completion wins.
+        # A whole word is not truncated ('heart' must not become 'heart_broken')
+        last_word = words.split()[-1]
+        completions = set() if self._words.contains(last_word) else self._names.starting_with(words)
+        if completions:
+            best = min(completions, key=lambda p: (len(icon_words(self.icons[p].get('name', ''))), p))
+            return self._resolution(best, PREFIX_SCORE if len(completions) == 1 else PREFIX_SCORE - 0.1, 'prefix')
+
+        # Word by word: the icon sharing the most (prefix-matched) name words; variant
+        # values ('outlined') only add to icons that already share a name word
+        query_words = words.split()
+        hits: Dict[int, int] = {}
+        for word in query_words:
+            for position in self._words.starting_with(word):
+                hits[position] = hits.get(position, 0) + 1
+        for word in query_words:
+            for position in self._variant_words.starting_with(word) & hits.keys():
+                hits[position] += 1
+        if hits:
+            best = min(hits, key=lambda p: (-hits[p], len(self.icons[p].get('name', '')), p))
+            icon_word_count = len(icon_words(self.icons[best].get('name', '')).split())
+            score = hits[best] / max(len(query_words), icon_word_count)
+            if score >= MIN_FUZZY_SCORE:
+                return self._resolution(best, score, 'words')
+
+        fuzzy = self._fuzzy.resolve(words, min_score=MIN_FUZZY_SCORE)
+        if fuzzy:
+            return self._resolution(self._position_by_id[fuzzy.component_id], fuzzy.score, 'fuzzy')
+        return None
+
+
+def _keep_icon_index(snapshot, previous: IconIndex, changes) -> Optional[IconIndex]:
+    """previous when a scan changed only non-icon components, else None (rebuild)."""
+    keys = changes.components.changed_keys() | set(changes.components.removed)
+    for key in keys:
+        if key in previous._position_by_id or is_icon_component(snapshot.components_by_id.get(key) or {}):
+            return None
+    return previous
+
+
+def get_icon_index(snapshot) -> IconIndex:
+    """IconIndex for a DesignSystemSnapshot, built once and kept while its icon components are unchanged."""
+    return snapshot.derived('icon_index', lambda: IconIndex(snapshot.components), ['components'],
+                            update=_keep_icon_index)
+
+
+class IconResolver:
+    """
+    iconSwaps values as a TreeWalker visitor; results accumulate in .results.
+
+    Values already naming an icon exactly, by full name or node id, are left
+    alone. One result per changed or unresolvable value; unresolvable ones
+    have 'to': None and keep their value.
+    """
+
+    def __init__(self, index: IconIndex):
+        self.index = index
+        self.results: List[Dict[str, Any]] = []
+
+    def register(self, walker: TreeWalker) -> 'IconResolver':
+        walker.register(self.visit, nested=True)
+        return self
+
+    def visit(self, node: Node):
+        swaps = node.value.get('iconSwaps')
+        if not isinstance(swaps, dict):
+            return
+        for slot, requested in swaps.items():
+            if not isinstance(requested, str):
+                continue
+            resolution = self.index.resolve(requested)
+            if resolution and resolution.matches(requested):
+                continue
+            entry = {'path': f"{node.path}.iconSwaps.{slot}", 'from': requested, 'to': None}
+            if resolution:
+                swaps[slot] = resolution.name
+                entry.update(to=resolution.name, icon_id=resolution.icon_id,
+                             score=resolution.score, reason=resolution.reason)
+            self.results.append(entry)
+
+
+def resolve_document_icons(document: Any, index: IconIndex) -> List[Dict[str, Any]]:
+    """
+    Rewrite every guessed iconSwaps value in a figma-ready document to a full icon name.
+
+    See IconResolver. Modifies document in place; returns the results.
+    """
+    walker = TreeWalker()
+    resolver = IconResolver(index).register(walker)
+    walker.walk(document)
+    return resolver.results
+
+
+def main():
+    import argparse
+    import json
+    import time
+    from scripts.design_system_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Resolve icon names against the design system")
+    parser.add_argument("icons", nargs="*", help="Icon names or node ids to resolve")
+    parser.add_argument("--file", help="figma-ready JSON whose iconSwaps to resolve (printed, not saved)")
+    args = parser.parse_args()
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("❌ No design system snapshot found")
+        sys.exit(1)
+    index = get_icon_index(snapshot)
+    print(f"🔣 {len(index)} icon components")
+
+    for requested in args.icons:
+        started = time.perf_counter()
+        resolution = index.resolve(requested)
+        elapsed = (time.perf_counter() - started) * 1e6
+        if resolution:
+            print(f"🔣 {requested} -> {resolution.name} ({resolution.icon_id}, "
+                  f"{resolution.reason}, score {resolution.score}) {elapsed:.0f} µs")
+        else:
+            print(f"❓ {requested}: no matching icon ({elapsed:.0f} µs)")
+
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        for result in resolve_document_icons(document, index):
+            if result['to']:
+                print(f"🔣 {result['path']}: {result['from']} -> {result['to']} ({result['reason']})")
+            else:
+                print(f"❓ {result['path']}: {result['from']} has no matching icon")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Shared JSON extraction for stage outputs.
+
+Model responses wrap their JSON in rationale text, separators
+(---RATIONALE-SEPARATOR---, ## DESIGN SPECIFICATION, ...) and code fences.
+find_json_span() / extract_json() locate the first complete top-level JSON
+value after the first separator present, working on the original string by
+index. Valid JSON is parsed in place by the C decoder (raw_decode); anything
+else is measured by a linear scanner that finds structural characters with one
+regex, skips string literals as a whole (escapes included) and ignores // and
+/* */ comments, so braces inside strings or comments never unbalance the
+count. No substrings are built until the caller asks for the text.
+
+Usage (benchmark on saved stage outputs):
+    python scripts/json_extract.py [--folder python_outputs]
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Iterator, Optional, Sequence, Tuple
+
+# Markers between rationale and JSON, in priority order
+DEFAULT_SEPARATORS = (
+    "---RATIONALE-SEPARATOR---",
+    "---RATIONALE_SEPARATOR---",
+    "---JSON-START---",
+    "# DESIGN SPECIFICATION",
+    "```json",
+)
+
+# One token per match: whole string literal, whole comment, or a bracket
+_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|//[^\n]*|/\*.*?\*/|[{}\[\]]', re.DOTALL)
+_OPENERS = re.compile(r'[{\[]')
+_COMMENTS = re.compile(r'"(?:[^"\\]|\\.)*"|//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+_decoder = json.JSONDecoder()
+
+
+def content_start(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS) -> int:
+    """Index just past the first separator present (by priority), or 0."""
+    for separator in separators:
+        idx = text.find(separator)
+        if idx != -1:
+            return idx + len(separator)
+    return 0
+
+
+def scan_value_end(text: str, start: int) -> Optional[int]:
+    """
+    End index (exclusive) of the bracketed value opening at text[start], or None if
+    it is never closed. Strings and comments are skipped; brackets are only counted.
+    """
+    depth = 0
+    for token in _TOKENS.finditer(text, start):
+        char = token.group()[0]
+        if char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return token.end()
+        # Strings and comments (invalid JSON, common in model output) are matched whole
+    return None
+
+
+def _candidates(text: str, separators: Sequence[str]) -> Iterator[Tuple[int, Optional[int], Any, Optional[json.JSONDecodeError]]]:
+    """(start, end, value, error) for each top-level {...} / [...] after the separator."""
+    pos = content_start(text, separators)
+    while True:
+        opener = _OPENERS.search(text, pos)
+        if not opener:
+            return
+        start = opener.start()
+        try:
+            # Fast path: raw_decode parses in place (C scanner), no slice is built
+            value, end = _decoder.raw_decode(text, start)
+            yield start, end, value, None
+        except json.JSONDecodeError as e:
+            # Not valid JSON as-is (comments, prose brackets, truncation): find its extent
+            end = scan_value_end(text, start)
+            yield start, end, None, e
+            if end is None:
+                return
+        pos = end
+
+
+def iter_json_spans(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS) -> Iterator[Tuple[int, int]]:
+    """(start, end) of every complete top-level {...} / [...] after the separator."""
+    for start, end, _, _ in _candidates(text, separators):
+        if end is not None:
+            yield start, end
+
+
+def find_json_span(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS) -> Optional[Tuple[int, int]]:
+    """(start, end) of the first complete top-level JSON value after the separator."""
+    return next(iter_json_spans(text, separators), None)
+
+
+def extract_json_text(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS) -> str:
+    """
+    Source text of the first JSON value after the separator.
+
+    Prefers the first candidate that parses; otherwise returns the first
+    balanced one (e.g. JSON with comments, for the caller to repair).
+
+    Falls back to everything after the separator when no complete value is
+    found (e.g. a truncated response), so the caller's parse error points at
+    the real problem.
+    """
+    first_span: Optional[Tuple[int, int]] = None
+    for start, end, _, error in _candidates(text, separators):
+        if end is None:
+            break
+        if error is None:
+            return text[start:end]
+        # Balanced but invalid (e.g. has comments): keep for repair unless a valid value
+        # follows; stage outputs are objects, so an object beats a bracketed aside
+        if first_span is None or (text[first_span[0]] == '[' and text[start] == '{'):
+            first_span = (start, end)
+    if first_span is None:
+        return text[content_start(text, separators):].strip()
+    return text[first_span[0]:first_span[1]]
+
+
+def extract_json(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS) -> Any:
+    """
+    Parsed first JSON value after the separator.
+
+    Candidates that do not parse (e.g. '[x]' in prose) are skipped. Raises
+    json.JSONDecodeError with the error of the first candidate when none parses.
+    """
+    first_error: Optional[json.JSONDecodeError] = None
+    for _, _, value, error in _candidates(text, separators):
+        if error is None:
+            return value
+        first_error = first_error or error
+    if first_error:
+        raise first_error
+    raise json.JSONDecodeError("No JSON value found", text, content_start(text, separators))
+
+
+def strip_comments(json_text: str) -> str:
+    """Remove // and /* */ comments outside string literals (URLs in strings survive)."""
+    return _COMMENTS.sub(lambda m: m.group() if m.group().startswith('"') else '', json_text)
+
+
+def _legacy_extract(text: str) -> str:
+    # Previous instance.py approach (split on separator + greedy fence regex), for comparison
+    for separator in ("---RATIONALE-SEPARATOR---", "---RATIONALE_SEPARATOR---"):
+        if separator in text:
+            text = text.split(separator)[1].strip()
+            break
+    match = re.search(r'```json\n(.*)\n```', text, re.DOTALL)
+    if match:
+        text = match.group(1)
+    return text.strip()
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Benchmark JSON extraction on saved stage outputs")
+    parser.add_argument("--folder", default="python_outputs", help="Folder with *_output.txt files")
+    args = parser.parse_args()
+
+    texts = [p.read_text(encoding='utf-8', errors='replace')
+             for p in sorted(Path(args.folder).glob("*_output.txt"))]
+    if not texts:
+        print(f"❌ No *_output.txt files in {args.folder}")
+        sys.exit(1)
+    total_bytes = sum(len(t) for t in texts)
+
+    def run(label, extract):
+        parsed = 0
+        started = time.perf_counter()
+        for text in texts:
+            try:
+                extract(text)
+                parsed += 1
+            except ValueError:
+                pass
+        elapsed = time.perf_counter() - started
+        print(f"{label:<10} {parsed:>5}/{len(texts)} parsed  {elapsed * 1000:8.1f} ms  "
+              f"{total_bytes / elapsed / 1e6:7.1f} MB/s")
+
+    print(f"📊 {len(texts)} outputs, {total_bytes / 1e6:.1f} MB")
+    run("legacy", lambda text: json.loads(_legacy_extract(text)))
+    run("extract", extract_json)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+JSON Patch (RFC 6902) for model-proposed fixes.
+
+A patch is a list of operations on JSON Pointer paths (RFC 6901):
+
+    [{"op": "replace", "path": "/items/0/variants/Size", "value": "Large"},
+     {"op": "remove", "path": "/items/2/width"}]
+
+validate_patch() checks the shape of every operation (known op, pointers
+well formed, 'value' / 'from' present) and then dry-runs the patch on a copy,
+so a patch is only reported valid when every operation applies.
+apply_patch() applies a patch atomically: the document is returned patched
+only if every operation succeeds, otherwise JsonPatchError is raised and the
+input is left untouched.
+
+Usage:
+    python scripts/json_patch.py document.json patch.json [--write]
+"""
+
+import copy
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+OPERATIONS = ('add', 'remove', 'replace', 'move', 'copy', 'test')
+# Members each operation needs besides 'op' and 'path'
+REQUIRED_MEMBERS = {
+    'add': ('value',),
+    'replace': ('value',),
+    'test': ('value',),
+    'move': ('from',),
+    'copy': ('from',),
+    'remove': (),
+}
+
+
+class JsonPatchError(ValueError):
+    """A patch that is malformed or does not apply; index is the failing operation."""
+
+    def __init__(self, message: str, index: int = -1):
+        super().__init__(f"operation {index}: {message}" if index >= 0 else message)
+        self.index = index
+
+
+def parse_pointer(pointer: Any) -> List[str]:
+    """'/items/0/a~1b' -> ['items', '0', 'a/b'] ('' is the whole document)."""
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"pointer must be a string, got {type(pointer).__name__}")
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JsonPatchError(f"pointer {pointer!r} must start with '/'")
+    tokens = pointer[1:].split('/')
+    for token in tokens:
+        if '~' in token.replace('~0', '').replace('~1', ''):
+            raise JsonPatchError(f"pointer {pointer!r} has an invalid '~' escape")
+    return [token.replace('~1', '/').replace('~0', '~') for token in tokens]
+
+
+def _index(container: List[Any], token: str, pointer: str, allow_end: bool) -> int:
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token[0] == '0'):
+        raise JsonPatchError(f"{pointer!r}: {token!r} is not an array index")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"{pointer!r}: index {index} is out of range (length {len(container)})")
+    return index
+
+
+def _parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    """(container, last token) of the location pointer names."""
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("the document root has no parent")
+    node = document
+    for token in tokens[:-1]:
+        node = _child(node, token, pointer)
+    if not isinstance(node, (dict, list)):
+        raise JsonPatchError(f"{pointer!r}: parent is a {type(node).__name__}, not an object or array")
+    return node, tokens[-1]
+
+
+def _child(node: Any, token: str, pointer: str) -> Any:
+    if isinstance(node, dict):
+        if token not in node:
+            raise JsonPatchError(f"{pointer!r}: member {token!r} does not exist")
+        return node[token]
+    if isinstance(node, list):
+        return node[_index(node, token, pointer, allow_end=False)]
+    raise JsonPatchError(f"{pointer!r}: cannot descend into a {type(node).__name__}")
+
+
+def resolve_pointer(document: Any, pointer: str) -> Any:
+    """Value at pointer in document."""
+    node = document
+    for token in parse_pointer(pointer):
+        node = _child(node, token, pointer)
+    return node
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == '':
+        return value
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, list):
+        parent.insert(_index(parent, token, pointer, allow_end=True), value)
+    else:
+        parent[token] = value
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    """(document, removed value)."""
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, list):
+        return document, parent.pop(_index(parent, token, pointer, allow_end=False))
+    if token not in parent:
+        raise JsonPatchError(f"{pointer!r}: member {token!r} does not exist")
+    return document, parent.pop(token)
+
+
+def _apply_operation(document: Any, operation: Dict[str, Any]) -> Any:
+    op, path = operation['op'], operation['path']
+    if op == 'add':
+        return _add(document, path, copy.deepcopy(operation['value']))
+    if op == 'remove':
+        if path == '':
+            raise JsonPatchError("cannot remove the document root")
+        return _remove(document, path)[0]
+    if op == 'replace':
+        if path == '':
+            return copy.deepcopy(operation['value'])
+        resolve_pointer(document, path)
+        parent, token = _parent(document, path)
+        if isinstance(parent, list):
+            parent[_index(parent, token, path, allow_end=False)] = copy.deepcopy(operation['value'])
+        else:
+            parent[token] = copy.deepcopy(operation['value'])
+        return document
+    if op == 'move':
+        source = operation['from']
+        if path != source and (path + '/').startswith(source + '/'):
+            raise JsonPatchError(f"cannot move {source!r} into its own child {path!r}")
+        if path == source:
+            resolve_pointer(document, source)
+            return document
+        document, value = _remove(document, source)
+        return _add(document, path, value)
+    if op == 'copy':
+        return _add(document, path, copy.deepcopy(resolve_pointer(document, operation['from'])))
+    # test
+    actual = resolve_pointer(document, path)
+    if not _equal(actual, operation['value']):
+        raise JsonPatchError(f"{path!r}: test failed, value is {actual!r}")
+    return document
+
+
+def _equal(a: Any, b: Any) -> bool:
+    # JSON equality: 1 == 1.0, but true != 1
+    if isinstance(a, bool) or isinstance(b, bool):
+        return type(a) is type(b) and a == b
+    return a == b
+
+
+def check_operations(patch: Any) -> List[str]:
+    """Problems with the shape of a patch, without applying it."""
+    if not isinstance(patch, list):
+        return [f"patch must be an array of operations, got {type(patch).__name__}"]
+    problems = []
+    for i, operation in enumerate(patch):
+        if not isinstance(operation, dict):
+            problems.append(f"operation {i}: must be an object")
+            continue
+        op = operation.get('op')
+        if op not in OPERATIONS:
+            problems.append(f"operation {i}: unknown op {op!r} (expected one of {', '.join(OPERATIONS)})")
+            continue
+        for member in ('path',) + REQUIRED_MEMBERS[op]:
+            if member not in operation:
+                problems.append(f"operation {i}: {op} needs {member!r}")
+        for member in ('path', 'from'):
+            if member in operation:
+                try:
+                    parse_pointer(operation[member])
+                except JsonPatchError as e:
+                    problems.append(f"operation {i}: {member} {e}")
+    return problems
+
+
+def apply_patch(document: Any, patch: Any) -> Any:
+    """Patched copy of document; raises JsonPatchError (document untouched) if any operation fails."""
+    problems = check_operations(patch)
+    if problems:
+        raise JsonPatchError('; '.join(problems))
+    patched = copy.deepcopy(document)
+    for i, operation in enumerate(patch):
+        try:
+            patched = _apply_operation(patched, operation)
+        except JsonPatchError as e:
+            raise JsonPatchError(str(e), i) from None
+    return patched
+
+
+def validate_patch(document: Any, patch: Any) -> List[str]:
+    """Why patch cannot be applied to document (empty if it applies cleanly)."""
+    problems = check_operations(patch)
+    if problems:
+        return problems
+    try:
+        apply_patch(document, patch)
+    except JsonPatchError as e:
+        return [str(e)]
+    return []
+
+
+def describe_operation(operation: Dict[str, Any]) -> str:
+    """One-line summary of an operation for change logs."""
+    op, path = operation.get('op'), operation.get('path')
+    if op in ('add', 'replace', 'test'):
+        return f"{op} {path} = {json_value(operation.get('value'))}"
+    if op in ('move', 'copy'):
+        return f"{op} {operation.get('from')} -> {path}"
+    return f"{op} {path}"
+
+
+def json_value(value: Any, limit: int = 80) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate and apply an RFC 6902 JSON Patch")
+    parser.add_argument("document", help="JSON document")
+    parser.add_argument("patch", help="JSON Patch file (array of operations)")
+    parser.add_argument("--write", action="store_true", help="Write the patched document back")
+    args = parser.parse_args()
+
+    document = json.loads(Path(args.document).read_text(encoding='utf-8'))
+    patch = json.loads(Path(args.patch).read_text(encoding='utf-8'))
+    problems = validate_patch(document, patch)
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    for operation in patch:
+        print(f"✏️ {describe_operation(operation)}")
+    if args.write:
+        Path(args.document).write_text(json.dumps(apply_patch(document, patch), indent=2, ensure_ascii=False),
+                                       encoding='utf-8')
+        print(f"💾 Patched {args.document}")
+    else:
+        print(f"✅ {len(patch)} operation(s) apply cleanly")
+
+
+if __name__ == "__main__":
+    main()
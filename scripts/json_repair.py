@@ -0,0 +1,298 @@
+"""
+Tolerant JSON repair for model output.
+
+repair_json() tokenizes the text once and re-emits it as strict JSON while
+tracking where it is in the object/array structure. It repairs:
+- // and /* */ comments (dropped)
+- trailing and doubled commas, missing commas and colons
+- invalid escapes inside strings (\\% -> %) and raw newlines/tabs in strings
+- unquoted keys and Python literals (True/False/None)
+- truncated tails: an unterminated string, dangling key or value and every
+  open bracket are closed; a number cut off mid-way ('1.', '1e', '-') is dropped
+String contents are copied as-is apart from those escape fixes, so URLs and
+other '//' inside strings survive. Every repair is counted so callers can log
+what was changed.
+
+Usage (regression cases):
+    python scripts/json_repair.py
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.json_extract import DEFAULT_SEPARATORS, extract_json, extract_json_text
+
+_TOKEN = re.compile(r'''
+    (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<open_string>"(?:[^"\\]|\\.)*\\?\Z)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<punct>[{}\[\]:,])
+  | (?P<open_number>(?:-|-?\d+(?:\.|(?:\.\d+)?[eE][+-]?))(?=\s*\Z))
+  | (?P<number>-?(?:\d+)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_$][\w$-]*)
+  | (?P<space>\s+)
+  | (?P<other>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Valid escapes are matched (and kept) first, so the second backslash of '\\\\'
+# is never taken for the start of another escape; group 1 is an invalid one
+_ESCAPE = re.compile(r'\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})|\\(.?)', re.DOTALL)
+_CONTROL_CHARS = re.compile(r'[\x00-\x1f]')
+_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+
+_PYTHON_LITERALS = {'True': 'true', 'False': 'false', 'None': 'null'}
+_JSON_LITERALS = ('true', 'false', 'null')
+
+# Frame states: what the current object/array expects next
+KEY, COLON, VALUE, AFTER = 'key', 'colon', 'value', 'after'
+
+
+# Repairs that guess at structure rather than fix syntax; text needing them is
+# most likely prose, not damaged JSON
+LOSSY_REPAIRS = ('stray characters', 'stray colons', 'unquoted values', 'mismatched brackets')
+
+
+class JSONRepairError(ValueError):
+    """Text could not be turned into JSON even after repair."""
+
+
+def _fix_string(token: str, repairs: Dict[str, int]) -> str:
+    body = token[1:-1]
+    if '\\' in body:
+        fixed = _ESCAPE.sub(lambda m: m.group() if m.group(1) is None else m.group(1), body)
+        if fixed != body:
+            repairs['invalid escapes'] = repairs.get('invalid escapes', 0) + 1
+            body = fixed
+    if _CONTROL_CHARS.search(body):
+        body = _CONTROL_CHARS.sub(lambda m: _CONTROL_ESCAPES.get(m.group(), f'\\u{ord(m.group()):04x}'), body)
+        repairs['control characters in strings'] = repairs.get('control characters in strings', 0) + 1
+    return f'"{body}"'
+
+
+def repair_json(text: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Strict JSON text for the first value in text, plus {repair: count}.
+
+    Text before the first '{' or '[' and after the value is ignored.
+    Raises JSONRepairError when no value starts in text.
+    """
+    opener = re.search(r'[{\[]', text)
+    if not opener:
+        raise JSONRepairError("No JSON object or array found")
+
+    out: List[str] = []
+    last = -1                      # index in out of the last significant token
+    stack: List[List[str]] = []    # [bracket, state]
+    repairs: Dict[str, int] = {}
+
+    def note(repair: str):
+        repairs[repair] = repairs.get(repair, 0) + 1
+
+    def emit(chunk: str):
+        nonlocal last
+        out.append(chunk)
+        last = len(out) - 1
+
+    def drop_trailing_comma():
+        nonlocal last
+        if last >= 0 and out[last] == ',':
+            out[last] = ''
+            last = max((i for i in range(last) if out[i].strip()), default=-1)
+            return True
+        return False
+
+    def begin_value():
+        """Insert a missing comma or colon before the next key or value."""
+        frame = stack[-1]
+        if frame[1] == AFTER:
+            emit(',')
+            note('missing commas')
+            frame[1] = KEY if frame[0] == '{' else VALUE
+        elif frame[1] == COLON:
+            emit(':')
+            note('missing colons')
+            frame[1] = VALUE
+
+    def finish_value():
+        frame = stack[-1]
+        frame[1] = COLON if frame[1] == KEY else AFTER
+
+    for match in _TOKEN.finditer(text, opener.start()):
+        kind = match.lastgroup
+        token = match.group()
+
+        if kind == 'space':
+            out.append(token)
+            continue
+        if kind == 'comment':
+            note('comments')
+            continue
+
+        if not stack:
+            # Only the opening bracket starts the document
+            stack.append([token, KEY if token == '{' else VALUE])
+            emit(token)
+            continue
+
+        frame = stack[-1]
+        if kind == 'punct':
+            if token in '{[':
+                begin_value()
+                emit(token)
+                stack.append([token, KEY if token == '{' else VALUE])
+            elif token in '}]':
+                if drop_trailing_comma():
+                    note('trailing commas')
+                if frame[1] == COLON:
+                    emit(':null')
+                    note('dangling keys')
+                elif frame[0] == '{' and frame[1] == VALUE:
+                    emit('null')
+                    note('dangling keys')
+                closer = '}' if frame[0] == '{' else ']'
+                if token != closer:
+                    note('mismatched brackets')
+                emit(closer)
+                stack.pop()
+                if not stack:
+                    break
+                finish_value()
+            elif token == ':':
+                if frame[1] == COLON:
+                    emit(':')
+                    frame[1] = VALUE
+                else:
+                    note('stray colons')
+            else:  # ','
+                if frame[1] == AFTER:
+                    emit(',')
+                    frame[1] = KEY if frame[0] == '{' else VALUE
+                else:
+                    note('extra commas')
+
+        elif kind in ('string', 'open_string'):
+            if kind == 'open_string':
+                # Truncated inside a string: close it, the brackets are closed below
+                token = token[:-1] + '"' if token.endswith('\\') else token + '"'
+            begin_value()
+            emit(_fix_string(token, repairs))
+            finish_value()
+
+        elif kind == 'open_number':
+            # Truncated inside a number: the digits cannot be trusted, the value is left dangling
+            continue
+
+        elif kind == 'number':
+            begin_value()
+            if frame[1] == KEY:
+                emit(f'"{token}"')
+                note('unquoted keys')
+            else:
+                emit(token)
+            finish_value()
+
+        elif kind == 'word':
+            begin_value()
+            if frame[1] == KEY:
+                emit(json.dumps(token))
+                note('unquoted keys')
+            elif token in _JSON_LITERALS:
+                emit(token)
+            elif token in _PYTHON_LITERALS:
+                emit(_PYTHON_LITERALS[token])
+                note('python literals')
+            else:
+                emit(json.dumps(token))
+                note('unquoted values')
+            finish_value()
+
+        else:
+            note('stray characters')
+
+    if stack:
+        # Truncated response: complete the dangling member and close every bracket
+        note('truncated tail')
+        while stack:
+            frame = stack.pop()
+            drop_trailing_comma()
+            if frame[1] == COLON:
+                emit(':null')
+            elif frame[0] == '{' and frame[1] == VALUE:
+                emit('null')
+            emit('}' if frame[0] == '{' else ']')
+            if stack:
+                finish_value()
+
+    return ''.join(out), repairs
+
+
+def parse_json_tolerant(text: str, allow_lossy: bool = False) -> Tuple[Any, Dict[str, int]]:
+    """
+    Parse text as JSON, repairing it only when strict parsing fails.
+
+    Unless allow_lossy is set, a result that needed LOSSY_REPAIRS is rejected.
+    """
+    try:
+        return json.loads(text), {}
+    except json.JSONDecodeError as strict_error:
+        repaired, repairs = repair_json(text)
+        lossy = [name for name in LOSSY_REPAIRS if name in repairs]
+        if lossy and not allow_lossy:
+            raise JSONRepairError(f"{strict_error}; not repairable without guessing ({format_repairs(repairs)})")
+        try:
+            return json.loads(repaired), repairs
+        except json.JSONDecodeError as e:
+            raise JSONRepairError(f"{strict_error}; still invalid after repair ({format_repairs(repairs)}): {e}")
+
+
+def extract_json_tolerant(text: str, separators: Sequence[str] = DEFAULT_SEPARATORS,
+                          allow_lossy: bool = False) -> Tuple[Any, Dict[str, int]]:
+    """First JSON value after the separator, repaired when it is not strict JSON."""
+    try:
+        return extract_json(text, separators), {}
+    except json.JSONDecodeError:
+        return parse_json_tolerant(extract_json_text(text, separators), allow_lossy)
+
+
+def format_repairs(repairs: Dict[str, int]) -> str:
+    return ', '.join(f"{name} x{count}" for name, count in repairs.items()) or 'none'
+
+
+# (broken input, expected value) pairs checked by running this module
+REGRESSION_CASES = (
+    ('{"a": "50\\% off", }', {'a': '50% off'}),
+    ('{"a": "C:\\\\%temp", }', {'a': 'C:\\%temp'}),
+    ('{"p": "\\\\d+", }', {'p': '\\d+'}),
+    ('{"p": "\\\\\\d", }', {'p': '\\d'}),
+    ('{"u": "\\u00e9\\u12", }', {'u': '\u00e9u12'}),
+    ('{"url": "https://x.io/a", // note\n "n": True,}', {'url': 'https://x.io/a', 'n': True}),
+    ('{"items": [{"a": 1}, {"b": "tru', {'items': [{'a': 1}, {'b': 'tru'}]}),
+    ('{"a": 1e', {'a': None}),
+    ('{"a": 2, "b": -', {'a': 2, 'b': None}),
+    ('{"w": [1, 2.', {'w': [1]}),
+    ('{"w": [1.5e+', {'w': []}),
+)
+
+
+def main():
+    failed = 0
+    for text, expected in REGRESSION_CASES:
+        try:
+            value, repairs = parse_json_tolerant(text)
+        except JSONRepairError as e:
+            value, repairs = e, {}
+        if value == expected:
+            print(f"✅ {text!r} ({format_repairs(repairs)})")
+        else:
+            failed += 1
+            print(f"❌ {text!r}: got {value!r}, expected {expected!r}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Deterministic layout normalization for figma-ready JSON.
+
+normalize_layout() applies the JSON Engineer's layout rules in place instead
+of reporting them for another model pass:
+
+- text-flex-fill    every native-text gets _useFlexFill: true
+- parent-layout     native-text _parentLayout follows its container's layoutMode
+- text-width        _constraintWidth and explicit widths removed from native-text
+- root-sizing       the root container never carries FILL/STRETCH properties
+- fill              FILL children stretch (vertical parent) or grow (horizontal parent)
+- sizing-mode       HUG -> AUTO, invalid axis sizing modes dropped, and FIXED
+                    on an axis with no size to fix it to (the 100px narrow
+                    container bug) -> AUTO
+- spacing-scale     padding and itemSpacing snapped to SPACING_SCALE
+
+Every change is returned as {'path', 'rule', 'from', 'to'} so callers can log
+it. Running it twice changes nothing the second time. LayoutNormalizer can
+also be registered on a shared TreeWalker next to other checks.
+
+Usage:
+    python scripts/layout_normalizer.py <figma_ready.json> [--write]
+"""
+
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.figma_schema import AXIS_SIZING_VALUES
+from scripts.tree_walker import Node, TreeWalker, frame_properties
+
+SPACING_SCALE = (0, 2, 4, 8, 12, 16, 20, 24, 32, 40, 48, 56, 64)
+# Above the scale, spacing snaps to this grid
+SPACING_GRID = 8
+SPACING_KEYS = ('paddingTop', 'paddingBottom', 'paddingLeft', 'paddingRight', 'itemSpacing')
+
+AXIS_SIZING_KEYS = ('primaryAxisSizingMode', 'counterAxisSizingMode')
+# Set on the root these make the renderer size the viewport from a parent it does not have
+ROOT_ONLY_FORBIDDEN = ('horizontalSizing', 'layoutAlign', 'layoutGrow')
+
+MISSING = '<missing>'
+REMOVED = '<removed>'
+
+
+def snap_spacing(value: float) -> float:
+    """Nearest SPACING_SCALE step; larger values snap to the SPACING_GRID."""
+    if value <= 0:
+        return 0
+    if value > SPACING_SCALE[-1]:
+        return int(round(value / SPACING_GRID) * SPACING_GRID)
+    return min(SPACING_SCALE, key=lambda step: (abs(step - value), step))
+
+
+def _layout_mode(node: Optional[Node]) -> Optional[str]:
+    return frame_properties(node.value).get('layoutMode') if node is not None else None
+
+
+class LayoutNormalizer:
+    """Layout rules as TreeWalker visitors; changes accumulate in .changes."""
+
+    def __init__(self):
+        self.changes: List[Dict[str, Any]] = []
+
+    def register(self, walker: TreeWalker) -> 'LayoutNormalizer':
+        walker.register(self.visit)
+        return self
+
+    def change(self, node: Dict[str, Any], key: str, value: Any, path: str, rule: str):
+        before = node.get(key, MISSING)
+        if value is REMOVED:
+            if key not in node:
+                return
+            del node[key]
+        else:
+            if before == value and type(before) is type(value):
+                return
+            node[key] = value
+        self.changes.append({'path': f"{path}.{key}", 'rule': rule, 'from': before, 'to': value})
+
+    def visit(self, node: Node):
+        parent = node.layout_parent()
+        parent_mode = _layout_mode(parent)
+        if node.type == 'native-text':
+            grandparent_mode = _layout_mode(parent.layout_parent()) if parent is not None else None
+            self.text(node.value, node.path, parent_mode, grandparent_mode)
+        elif node.type == 'layoutContainer' or 'items' in node.value:
+            self.container(node.value, node.path, parent is None, parent_mode)
+        elif parent is not None:
+            self.fill(node.value, node.path, parent_mode)
+
+    def text(self, node: Dict[str, Any], path: str, parent_mode: Optional[str], grandparent_mode: Optional[str]):
+        if node.get('_useFlexFill') is not True:
+            self.change(node, '_useFlexFill', True, path, 'text-flex-fill')
+
+        layout = parent_mode if parent_mode in ('VERTICAL', 'HORIZONTAL') else 'VERTICAL'
+        current = node.get('_parentLayout')
+        # VERTICAL_IN_HORIZONTAL is the finer spelling of VERTICAL; keep it where it is true
+        if not (current == 'VERTICAL_IN_HORIZONTAL' and layout == 'VERTICAL' and grandparent_mode == 'HORIZONTAL'):
+            self.change(node, '_parentLayout', layout, path, 'parent-layout')
+
+        # Width comes from auto-layout; fixed widths are what overflowed the viewport
+        self.change(node, '_constraintWidth', REMOVED, path, 'text-width')
+        self.change(node, 'width', REMOVED, path, 'text-width')
+        properties = node.get('properties')
+        if isinstance(properties, dict):
+            self.change(properties, 'width', REMOVED, f"{path}.properties", 'text-width')
+
+    def container(self, node: Dict[str, Any], path: str, is_root: bool, parent_mode: Optional[str]):
+        if is_root:
+            for key in ROOT_ONLY_FORBIDDEN:
+                self.change(node, key, REMOVED, path, 'root-sizing')
+        else:
+            self.fill(node, path, parent_mode)
+
+        for key in AXIS_SIZING_KEYS:
+            value = node.get(key)
+            if value is None or value in AXIS_SIZING_VALUES:
+                continue
+            self.change(node, key, 'AUTO' if value == 'HUG' else REMOVED, path, 'sizing-mode')
+
+        if not is_root:
+            # Width is the counter axis of a column and the primary axis of a row
+            horizontal = node.get('layoutMode') == 'HORIZONTAL'
+            width_key, height_key = AXIS_SIZING_KEYS if horizontal else AXIS_SIZING_KEYS[::-1]
+            stretched = (node.get('horizontalSizing') == 'FILL' or node.get('layoutAlign') == 'STRETCH'
+                         or bool(node.get('layoutGrow')))
+            if node.get(width_key) == 'FIXED' and not stretched and not _is_number(node.get('width')):
+                self.change(node, width_key, 'AUTO', path, 'sizing-mode')
+            if node.get(height_key) == 'FIXED' and not any(_is_number(node.get(k)) for k in ('height', 'minHeight')):
+                self.change(node, height_key, 'AUTO', path, 'sizing-mode')
+
+        for key in SPACING_KEYS:
+            value = node.get(key)
+            # 'AUTO' itemSpacing and variable aliases are left alone
+            if _is_number(value):
+                snapped = snap_spacing(value)
+                if snapped != value:
+                    self.change(node, key, snapped, path, 'spacing-scale')
+
+    def fill(self, node: Dict[str, Any], path: str, parent_mode: Optional[str]):
+        if node.get('horizontalSizing') != 'FILL':
+            return
+        if parent_mode == 'VERTICAL':
+            self.change(node, 'layoutAlign', 'STRETCH', path, 'fill')
+        elif parent_mode == 'HORIZONTAL' and not node.get('layoutGrow'):
+            self.change(node, 'layoutGrow', 1, path, 'fill')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def normalize_layout(document: Any) -> List[Dict[str, Any]]:
+    """Apply the layout rules to document in place; returns the changes made."""
+    walker = TreeWalker()
+    normalizer = LayoutNormalizer().register(walker)
+    walker.walk(document)
+    return normalizer.changes
+
+
+def summarize_changes(changes: List[Dict[str, Any]]) -> str:
+    counts: Dict[str, int] = {}
+    for change in changes:
+        counts[change['rule']] = counts.get(change['rule'], 0) + 1
+    return ', '.join(f"{rule} x{count}" for rule, count in counts.items()) or 'none'
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Normalize layout metadata of figma-ready JSON")
+    parser.add_argument("file", help="figma-ready JSON")
+    parser.add_argument("--write", action="store_true", help="Save the normalized JSON back to the file")
+    args = parser.parse_args()
+
+    path = Path(args.file)
+    try:
+        document = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read {path}: {e}")
+        sys.exit(1)
+
+    changes = normalize_layout(document)
+    for change in changes:
+        print(f"📐 [{change['rule']}] {change['path']}: {change['from']!r} -> {change['to']!r}")
+    print(f"✅ {len(changes)} layout fixes ({summarize_changes(changes)})")
+
+    if args.write and changes:
+        path.write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"💾 Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Memory-mapped design-system snapshots with per-component random access.
+
+A .dsmap file stores every component as its own compact JSON record plus one
+record for the remaining sections (metadata, colorStyles, textStyles, ...),
+followed by an offset index:
+
+    b'DSMAP2\\n' | <index offset: 8 bytes, little endian> | records... | index (JSON)
+
+The index lists id, name, suggestedType, offset and length of each component,
+plus lookup tables from name and from suggestedType to component positions,
+so opening a map only decodes the index and name / type queries are dict
+lookups rather than scans. Components are decoded from the
+mmap when they are first asked for, which keeps memory and lookup latency
+proportional to the components a caller touches rather than library size.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+MAGIC = b'DSMAP2\n'
+HEADER = struct.Struct('<Q')
+HEADER_SIZE = len(MAGIC) + HEADER.size
+
+# Decoded components kept per map
+COMPONENT_CACHE_SIZE = 256
+
+PathLike = Union[str, Path]
+
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def build_mapped_snapshot(data: Any, path: PathLike) -> Path:
+    """Write a parsed snapshot (export dict or bare component list) as a .dsmap file."""
+    path = Path(path)
+    components = data if isinstance(data, list) else data.get('components', [])
+    rest = {} if isinstance(data, list) else {k: v for k, v in data.items() if k != 'components'}
+
+    index: Dict[str, Any] = {'list': isinstance(data, list), 'components': [], 'by_name': {}, 'by_type': {}}
+    tmp_path = path.with_suffix('.tmp')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC + HEADER.pack(0))
+        for position, component in enumerate(components):
+            raw = _encode(component)
+            name, suggested_type = component.get('name', ''), component.get('suggestedType', 'unknown')
+            index['components'].append([component.get('id', ''), name, suggested_type, f.tell(), len(raw)])
+            index['by_name'].setdefault(name, []).append(position)
+            index['by_type'].setdefault(suggested_type, []).append(position)
+            f.write(raw)
+
+        raw = _encode(rest)
+        index['rest'] = [f.tell(), len(raw)]
+        f.write(raw)
+
+        index_offset = f.tell()
+        f.write(_encode(index))
+        f.seek(len(MAGIC))
+        f.write(HEADER.pack(index_offset))
+    os.replace(tmp_path, path)
+    return path
+
+
+class MappedSnapshot:
+    """Read-only snapshot backed by a memory-mapped .dsmap file."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self._mm.close()
+            # Also maps written by an older format: the caller rebuilds them
+            raise ValueError(f"Not a design system map (or an outdated one): {self.path}")
+
+        (index_offset,) = HEADER.unpack_from(self._mm, len(MAGIC))
+        index = json.loads(self._mm[index_offset:])
+        self.is_list = index['list']
+        self._entries: List[List[Any]] = index['components']
+        self._positions_by_name: Dict[str, List[int]] = index['by_name']
+        self._positions_by_type: Dict[str, List[int]] = index['by_type']
+        self._rest_span = index['rest']
+        self._rest: Optional[Dict[str, Any]] = None
+        self._position_by_id = {entry[0]: i for i, entry in enumerate(self._entries) if entry[0]}
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[int, Any]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def close(self):
+        self._mm.close()
+
+    def _decode(self, position: int) -> Any:
+        with self._lock:
+            component = self._cache.get(position)
+            if component is not None:
+                self._cache.move_to_end(position)
+                return component
+        _, _, _, offset, length = self._entries[position]
+        component = json.loads(self._mm[offset:offset + length])
+        with self._lock:
+            self._cache[position] = component
+            if len(self._cache) > COMPONENT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return component
+
+    # ----- index-only queries (nothing decoded) -----
+
+    @property
+    def component_ids(self) -> List[str]:
+        return [entry[0] for entry in self._entries]
+
+    def has_component(self, component_id: str) -> bool:
+        return component_id in self._position_by_id
+
+    def ids_by_name(self, name: str) -> List[str]:
+        return [self._entries[i][0] for i in self._positions_by_name.get(name, ())]
+
+    def ids_by_type(self, suggested_type: str) -> List[str]:
+        return [self._entries[i][0] for i in self._positions_by_type.get(suggested_type, ())]
+
+    @property
+    def types(self) -> Dict[str, int]:
+        """Component count per suggestedType."""
+        return {suggested_type: len(positions) for suggested_type, positions in self._positions_by_type.items()}
+
+    def summaries(self, name: Optional[str] = None, suggested_type: Optional[str] = None) -> Iterator[Dict[str, str]]:
+        """id / name / suggestedType of every component, optionally only those with a name / type."""
+        positions: Any = range(len(self._entries))
+        if name is not None:
+            positions = self._positions_by_name.get(name, [])
+        if suggested_type is not None:
+            typed = self._positions_by_type.get(suggested_type, [])
+            positions = typed if name is None else sorted(set(positions) & set(typed))
+        for position in positions:
+            component_id, component_name, component_type, _, _ = self._entries[position]
+            yield {'id': component_id, 'name': component_name, 'suggestedType': component_type}
+
+    # ----- decoded on demand -----
+
+    def component(self, component_id: str) -> Optional[Dict[str, Any]]:
+        """Full component record, or None for an unknown id."""
+        position = self._position_by_id.get(component_id)
+        return self._decode(position) if position is not None else None
+
+    def components(self) -> Iterator[Dict[str, Any]]:
+        """Every component, decoded one at a time."""
+        for position in range(len(self._entries)):
+            yield self._decode(position)
+
+    def section(self, name: str, default: Any = None) -> Any:
+        """A non-component top-level section (colorStyles, textStyles, metadata, ...)."""
+        if self._rest is None:
+            offset, length = self._rest_span
+            self._rest = json.loads(self._mm[offset:offset + length])
+        return self._rest.get(name, default)
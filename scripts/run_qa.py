@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 Standalone QA runner for testing the QA loop independently.
-Usage: python3 scripts/run_qa.py <timestamp> [--iterations N]
+Usage: python3 scripts/run_qa.py <timestamp> [--iterations N] [--output json|patch]
 """
 
 import sys
@@ -13,7 +13,7 @@ import os
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from scripts.design_qa import DesignQA
+from scripts.design_qa import QA_OUTPUT_MODES, DesignQA
 
 def main():
     parser = argparse.ArgumentParser(description='Run QA validation on designer output')
@@ -21,6 +21,8 @@ def main():
     parser.add_argument('--iterations', type=int, default=3, help='Max QA iterations (default: 3)')
     parser.add_argument('--verbose', action='store_true', help='Show detailed output')
     parser.add_argument('--api-key', help='Gemini API key (or use GEMINI_API_KEY env var)')
+    parser.add_argument('--output', choices=QA_OUTPUT_MODES, default='json',
+                        help='QA response format: full fixed JSON or a JSON Patch applied locally (default: json)')
     
     args = parser.parse_args()
     
@@ -48,7 +50,7 @@ def main():
         print("❌ GEMINI_API_KEY environment variable not set and --api-key not provided")
         sys.exit(1)
     
-    qa = DesignQA(api_key)
+    qa = DesignQA(api_key, output_mode=args.output)
     
     # Run QA loop
     fixed_json, history = qa.run_qa_loop(designer_output, max_iterations=args.iterations)
@@ -72,8 +74,9 @@ def main():
     change_log_file = output_dir / f"alt3_{args.timestamp}_2_5_qa_change_log.json"
     qa.save_change_log(history, change_log_file)
     
-    if args.verbose and history:
+    if args.verbose and (history or qa.rule_fixes):
         print("\n📋 QA History Summary:")
+        print(f"  Rule-based checks: {len(qa.rule_fixes)} fixes")
         for h in history:
             print(f"  Iteration {h['iteration']}: {len(h['issues'])} issues → {len(h['changes'])} fixes")
 
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Compiles the figma-ready schema (scripts/figma_schema.py) into Python.
+
+compile_schema() generates one function per node type in which every field
+check is written out: a membership test, an exact type test and the enum /
+minimum test inlined, with constants bound at module level. There is no loop over the
+schema, no per-field function call and no path string built unless an issue
+is reported (node locations are kept as (parent, index) tuples and rendered
+on demand). validate() then walks the tree with an explicit stack and
+dispatches on 'type'.
+
+The generated code reports exactly the issues validate_interpreted() reports.
+get_validator() compiles once per process; validate_figma_json() is the
+entry point for stage outputs.
+
+Usage:
+    python scripts/schema_compiler.py --emit          # print the generated source
+    python scripts/schema_compiler.py [--folder figma-ready]   # benchmark vs the interpreter
+"""
+
+import re
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts import figma_schema
+from scripts.figma_schema import NODE_TYPES, ROOT, TYPES, Field, NodeSchema, SchemaIssue
+
+_TYPE_TESTS = {
+    'string': 'is str',
+    'boolean': 'is bool',
+    'object': 'is dict',
+    'array': 'is list',
+    'null': 'is _NoneType',
+}
+
+
+def _identifier(node_type: str) -> str:
+    return '_check_' + re.sub(r'\W', '_', node_type)
+
+
+class _Generator:
+    def __init__(self):
+        self.lines: List[str] = []
+        self.constants: Dict[str, Any] = {}
+
+    def constant(self, value: Any, prefix: str) -> str:
+        for name, existing in self.constants.items():
+            if name.startswith(prefix) and existing == value:
+                return name
+        name = f"{prefix}{len(self.constants)}"
+        self.constants[name] = value
+        return name
+
+    def emit(self, indent: int, line: str):
+        self.lines.append('    ' * indent + line)
+
+    def issue(self, indent: int, rule: str, path: str, message: str):
+        self.emit(indent, f"issues.append(SchemaIssue({rule!r}, {path}, {message}))")
+
+    def fields(self, fields: Dict[str, Field], obj: str, path: str, indent: int, depth: int):
+        for name, spec in fields.items():
+            self.field(name, spec, obj, f"{path} + {'.' + name!r}", indent, depth)
+
+    def field(self, name: str, spec: Field, obj: str, path: str, indent: int, depth: int):
+        value, kind = f"v{depth}", f"t{depth}"
+        # Most optional fields are absent: a bare membership test is the cheapest way to skip them
+        if spec.required:
+            self.emit(indent, f"if {name!r} not in {obj}:")
+            self.issue(indent + 1, 'required', path, repr(figma_schema.missing_message(name)))
+            self.emit(indent, "else:")
+        else:
+            self.emit(indent, f"if {name!r} in {obj}:")
+        indent += 1
+        self.emit(indent, f"{value} = {obj}[{name!r}]")
+        self.emit(indent, f"{kind} = type({value})")
+        types = self.constant(spec.types, '_T')
+        type_error = f"type_message({name!r}, {types}, {value})"
+        branches = []
+        for type_name in spec.types:
+            test = (f"{kind} is int or {kind} is float" if type_name == 'number'
+                    else f"{kind} {_TYPE_TESTS[type_name]}")
+            body = _Generator()
+            body.constants = self.constants
+            body.constraints(name, spec, type_name, value, path, indent + 1, depth)
+            branches.append((test, body.lines))
+
+        if len(branches) == 1 and not branches[0][1]:
+            # Plain type test
+            test = branches[0][0]
+            negated = f"not ({test})" if ' or ' in test else test.replace(' is ', ' is not ', 1)
+            self.emit(indent, f"if {negated}:")
+            self.issue(indent + 1, 'type', path, type_error)
+            return
+        for i, (test, lines) in enumerate(branches):
+            self.emit(indent, f"{'if' if i == 0 else 'elif'} {test}:")
+            self.lines.extend(lines or ['    ' * (indent + 1) + "pass"])
+        self.emit(indent, "else:")
+        self.issue(indent + 1, 'type', path, type_error)
+
+    def constraints(self, name: str, spec: Field, type_name: str, value: str, path: str, indent: int, depth: int):
+        if type_name == 'string' and spec.enum is not None:
+            members = self.constant(frozenset(spec.enum), '_E')
+            enum = self.constant(spec.enum, '_T')
+            self.emit(indent, f"if {value} not in {members}:")
+            self.issue(indent + 1, 'enum', path, f"enum_message({name!r}, {enum}, {value})")
+        elif type_name == 'number' and spec.minimum is not None:
+            self.emit(indent, f"if {value} < {spec.minimum!r}:")
+            self.issue(indent + 1, 'minimum', path, f"minimum_message({name!r}, {spec.minimum!r}, {value})")
+        elif type_name == 'object':
+            if spec.fields is not None:
+                self.fields(spec.fields, value, path, indent, depth + 1)
+            if spec.values is not None or spec.key_pattern is not None:
+                key, item = f"k{depth}", f"x{depth}"
+                item_path = f"{path} + '.' + {key}"
+                self.emit(indent, f"for {key}, {item} in {value}.items():")
+                if spec.key_pattern is not None:
+                    pattern = self.constant(re.compile(spec.key_pattern), '_P')
+                    self.emit(indent + 1, f"if not {pattern}.match({key}):")
+                    self.issue(indent + 2, 'key', item_path,
+                               f"key_message({name!r}, {key}, {spec.key_pattern!r})")
+                if spec.values is not None:
+                    allowed = self.constant(frozenset(t for name_ in spec.values for t in TYPES[name_]), '_S')
+                    values = self.constant(spec.values, '_T')
+                    self.emit(indent + 1, f"if type({item}) not in {allowed}:")
+                    self.issue(indent + 2, 'type', item_path, f"type_message({key}, {values}, {item})")
+
+    def node_function(self, function: str, schema: NodeSchema):
+        self.emit(0, f"def {function}(node, loc, issues):")
+        self.fields(schema.fields, 'node', '_path(loc)', 1, 0)
+        self.emit(0, "")
+        self.emit(0, "")
+
+
+_DRIVER = '''
+def _path(loc):
+    indices = []
+    while type(loc) is tuple:
+        loc, index = loc
+        indices.append(index)
+    return loc + ''.join(f'.items[{index}]' for index in reversed(indices))
+
+
+def validate(document):
+    issues = []
+    if type(document) is not dict:
+        return [SchemaIssue('type', '$', type_message('document', ('object',), document))]
+
+    if document.get('type') == 'layoutContainer':
+        stack = [(document, '$')]
+    else:
+        _check_root(document, '$', issues)
+        wrapper = document.get('layoutContainer')
+        if 'items' in document or type(wrapper) is not dict:
+            owner, owner_path = document, '$'
+        else:
+            owner, owner_path = wrapper, '$.layoutContainer'
+        items = owner.get('items')
+        if type(items) is not list:
+            if 'items' not in owner:
+                issues.append(SchemaIssue('required', owner_path + '.items', missing_message('items')))
+            items = []
+        stack = [(items[i], (owner_path, i)) for i in range(len(items) - 1, -1, -1)]
+
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node, loc = pop()
+        if type(node) is not dict:
+            issues.append(SchemaIssue('type', _path(loc), type_message('item', ('object',), node)))
+            continue
+        node_type = node.get('type')
+        check = _CHECKS.get(node_type)
+        if check is not None:
+            check(node, loc, issues)
+        elif 'type' not in node:
+            issues.append(SchemaIssue('required', _path(loc) + '.type', missing_message('type')))
+        else:
+            issues.append(SchemaIssue('unknown-type', _path(loc) + '.type', f"unknown node type {node_type!r}"))
+        items = node.get('items')
+        if type(items) is list:
+            if check is not None and node_type not in _CONTAINERS:
+                issues.append(SchemaIssue('unexpected-items', _path(loc) + '.items',
+                                          f"{node_type} items are not rendered"))
+            for i in range(len(items) - 1, -1, -1):
+                push((items[i], (loc, i)))
+    return issues
+'''
+
+
+def compile_schema(node_types: Dict[str, NodeSchema] = NODE_TYPES, root: NodeSchema = ROOT):
+    """(source, constants) of a validate(document) module for the schema."""
+    generator = _Generator()
+    generator.node_function('_check_root', root)
+    for node_type, schema in node_types.items():
+        generator.node_function(_identifier(node_type), schema)
+    checks = ', '.join(f"{node_type!r}: {_identifier(node_type)}" for node_type in node_types)
+    containers = frozenset(node_type for node_type, schema in node_types.items() if schema.container)
+    generator.emit(0, f"_CHECKS = {{{checks}}}")
+    generator.emit(0, f"_CONTAINERS = {containers!r}")
+    source = '\n'.join(generator.lines) + '\n' + _DRIVER
+    return source, generator.constants
+
+
+def build_validator(node_types: Dict[str, NodeSchema] = NODE_TYPES,
+                    root: NodeSchema = ROOT) -> Callable[[Any], List[SchemaIssue]]:
+    source, constants = compile_schema(node_types, root)
+    namespace: Dict[str, Any] = {
+        'SchemaIssue': SchemaIssue,
+        '_NoneType': type(None),
+        'missing_message': figma_schema.missing_message,
+        'type_message': figma_schema.type_message,
+        'enum_message': figma_schema.enum_message,
+        'minimum_message': figma_schema.minimum_message,
+        'key_message': figma_schema.key_message,
+        **constants,
+    }
+    exec(compile(source, '<figma-schema-validator>', 'exec'), namespace)
+    return namespace['validate']
+
+
+_validator: Optional[Callable[[Any], List[SchemaIssue]]] = None
+_validator_lock = threading.Lock()
+
+
+def get_validator() -> Callable[[Any], List[SchemaIssue]]:
+    """The compiled validator for the figma-ready schema, built once per process."""
+    global _validator
+    with _validator_lock:
+        if _validator is None:
+            _validator = build_validator()
+        return _validator
+
+
+def validate_figma_json(document: Any) -> List[SchemaIssue]:
+    """Schema issues of a figma-ready document (compiled validator)."""
+    return get_validator()(document)
+
+
+def main():
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Compile the figma-ready schema and benchmark it")
+    parser.add_argument("--emit", action="store_true", help="Print the generated validator source")
+    parser.add_argument("--folder", default="figma-ready", help="Folder with figma_ready_*.json files")
+    parser.add_argument("--rounds", type=int, default=20, help="Benchmark rounds over the corpus")
+    args = parser.parse_args()
+
+    if args.emit:
+        source, constants = compile_schema()
+        for name, value in constants.items():
+            print(f"# {name} = {value!r}")
+        print(source)
+        return
+
+    documents = []
+    for path in sorted(Path(args.folder).glob("figma_ready_*.json")):
+        try:
+            documents.append(json.loads(path.read_text(encoding='utf-8')))
+        except ValueError:
+            pass
+    if not documents:
+        print(f"❌ No figma_ready_*.json files in {args.folder}")
+        sys.exit(1)
+
+    compiled = get_validator()
+    mismatches = sum(1 for document in documents if compiled(document) != figma_schema.validate_interpreted(document))
+    if mismatches:
+        print(f"❌ Compiled and interpreted validators disagree on {mismatches} documents")
+        sys.exit(1)
+
+    def run(validate):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for document in documents:
+                validate(document)
+        return (time.perf_counter() - started) / (args.rounds * len(documents)) * 1e6
+
+    interpreted_us = run(figma_schema.validate_interpreted)
+    compiled_us = run(compiled)
+    issues = sum(len(compiled(document)) for document in documents)
+    print(f"📊 {len(documents)} documents, {issues} schema issues, identical results")
+    print(f"   interpreted {interpreted_us:8.1f} µs/document")
+    print(f"   compiled    {compiled_us:8.1f} µs/document  ({interpreted_us / compiled_us:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
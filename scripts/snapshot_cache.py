@@ -0,0 +1,63 @@
+"""
+Fast-load sidecar cache for parsed design-system snapshots.
+
+For every snapshot content hash, design-system/.cache/<hash>.<version>.bin holds
+the parsed structure, the original JSON text and any pre-rendered prompt text
+variants (indented JSON, design tokens context, ...) in marshal format, which
+deserializes plain dicts/lists/strings several times faster than json.load.
+marshal is Python-version specific, so the version is part of the cache key.
+"""
+
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+CACHE_DIRNAME = ".cache"
+CACHE_VERSION = f"1-py{sys.version_info.major}{sys.version_info.minor}"
+
+PathLike = Union[str, Path]
+
+
+def cache_path(folder: PathLike, key: str) -> Path:
+    # key is the manifest content hash (or store hash for packed snapshots)
+    return Path(folder) / CACHE_DIRNAME / f"{key}.{CACHE_VERSION}.bin"
+
+
+def load(folder: PathLike, key: str) -> Optional[Dict[str, Any]]:
+    """Cached {'content_hash', 'data', 'text', 'renders', 'render_deps'} for a snapshot key, or None."""
+    path = cache_path(folder, key)
+    try:
+        with open(path, 'rb') as f:
+            entry = marshal.load(f)
+    except FileNotFoundError:
+        return None
+    except (EOFError, ValueError, TypeError) as e:
+        print(f"⚠️ Ignoring corrupt snapshot cache {path.name}: {e}")
+        return None
+    if entry.get('version') != CACHE_VERSION:
+        return None
+    return entry
+
+
+def save(folder: PathLike, key: str, content_hash: str, data: Any, text: str,
+         renders: Dict[str, str], render_deps: Optional[Dict[str, Optional[List[str]]]] = None):
+    """Write (or rewrite) the sidecar for a snapshot key."""
+    path = cache_path(folder, key)
+    entry = {
+        'version': CACHE_VERSION,
+        'content_hash': content_hash,
+        'data': data,
+        'text': text,
+        'renders': renders,
+        'render_deps': render_deps or {},
+    }
+    try:
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(entry, f)
+        os.replace(tmp_path, path)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Failed to write snapshot cache {path.name}: {e}")
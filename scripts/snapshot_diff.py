@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Structural diff between two design-system snapshots.
+
+Compares components (with their variants and text slots), color styles and
+text styles by identity rather than by text, and returns a ChangeSet that
+derived caches use to decide what they can keep: a prompt render or index that
+only depends on colorStyles survives a scan that only touched components.
+Derived objects whose sections did change can be updated from the
+item-level changes of ITEMIZED_SECTIONS instead of rebuilt (see
+DesignSystemSnapshot.derived); print_change_set reports them for people.
+
+Usage:
+    python scripts/snapshot_diff.py                       # Newest snapshot vs. the one before it
+    python scripts/snapshot_diff.py OLD.json NEW.json     # Two specific snapshot files
+    python scripts/snapshot_diff.py --json                # Machine-readable change set
+"""
+
+import json
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+# Fields of a component diffed in detail rather than reported as "changed"
+COMPONENT_DETAIL_FIELDS = ('variantOptions', 'textSlots')
+
+# Sections whose differences never invalidate anything (scan time, counts)
+VOLATILE_SECTIONS = ('metadata',)
+
+# Sections diffed item by item; any other changed section is only known to differ
+ITEMIZED_SECTIONS = ('components', 'colorStyles', 'textStyles')
+
+
+@dataclass
+class ItemChange:
+    """One modified component or style."""
+    key: str
+    name: str
+    fields: List[str]
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SectionChanges:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    modified: List[ItemChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+    def changed_keys(self) -> Set[str]:
+        """Keys of added and modified items (removed ones no longer exist)."""
+        return set(self.added) | {change.key for change in self.modified}
+
+
+@dataclass
+class ChangeSet:
+    components: SectionChanges = field(default_factory=SectionChanges)
+    color_styles: SectionChanges = field(default_factory=SectionChanges)
+    text_styles: SectionChanges = field(default_factory=SectionChanges)
+    # Top-level keys whose content differs at all (incl. sections not diffed in detail)
+    changed_sections: Set[str] = field(default_factory=set)
+
+    def affects(self, sections: Optional[Iterable[str]]) -> bool:
+        """Whether a cache depending on these top-level sections (None = everything) is stale."""
+        if sections is None:
+            return bool(self.changed_sections)
+        return bool(self.changed_sections & set(sections))
+
+    def itemized(self, sections: Iterable[str]) -> bool:
+        """Whether every change to these sections is known item by item (not e.g. a reorder only)."""
+        by_section = {'components': self.components, 'colorStyles': self.color_styles, 'textStyles': self.text_styles}
+        for section in self.changed_sections & set(sections):
+            if section not in ITEMIZED_SECTIONS or not by_section[section]:
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        def section(changes: SectionChanges) -> Dict[str, Any]:
+            return {
+                'added': changes.added,
+                'removed': changes.removed,
+                'modified': [vars(c) for c in changes.modified],
+            }
+
+        return {
+            'changed_sections': sorted(self.changed_sections),
+            'components': section(self.components),
+            'colorStyles': section(self.color_styles),
+            'textStyles': section(self.text_styles),
+        }
+
+    def summary(self) -> List[str]:
+        lines = []
+        for label, changes in (('components', self.components),
+                               ('color styles', self.color_styles),
+                               ('text styles', self.text_styles)):
+            if changes:
+                lines.append(f"{label}: +{len(changes.added)} -{len(changes.removed)} ~{len(changes.modified)}")
+        other = self.changed_sections - {'components', 'colorStyles', 'textStyles'} - set(VOLATILE_SECTIONS)
+        if other:
+            lines.append(f"other sections changed: {', '.join(sorted(other))}")
+        return lines or ["no structural changes"]
+
+
+def _sections(data: Any) -> Dict[str, Any]:
+    # Live payloads / very old exports are a bare component list
+    if isinstance(data, list):
+        return {'components': data}
+    return data or {}
+
+
+def _diff_keyed(old: Dict[str, Any], new: Dict[str, Any], detail) -> SectionChanges:
+    changes = SectionChanges(
+        added=[k for k in new if k not in old],
+        removed=[k for k in old if k not in new],
+    )
+    for key, new_item in new.items():
+        old_item = old.get(key)
+        if old_item is not None and old_item != new_item:
+            changes.modified.append(detail(key, old_item, new_item))
+    return changes
+
+
+def _changed_fields(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    return sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+
+
+def _diff_variants(old: Dict[str, List[Any]], new: Dict[str, List[Any]]) -> Dict[str, Any]:
+    details: Dict[str, Any] = {}
+    for prop in set(old) | set(new):
+        old_values, new_values = old.get(prop), new.get(prop)
+        if old_values is None:
+            details[prop] = {'added_property': new_values}
+        elif new_values is None:
+            details[prop] = {'removed_property': old_values}
+        elif old_values != new_values:
+            details[prop] = {
+                'added': [v for v in new_values if v not in old_values],
+                'removed': [v for v in old_values if v not in new_values],
+            }
+    return details
+
+
+def _diff_component(key: str, old: Dict[str, Any], new: Dict[str, Any]) -> ItemChange:
+    change = ItemChange(key=key, name=new.get('name', ''), fields=_changed_fields(old, new))
+    if 'variantOptions' in change.fields:
+        change.details['variants'] = _diff_variants(old.get('variantOptions') or {}, new.get('variantOptions') or {})
+    if 'textSlots' in change.fields:
+        old_slots, new_slots = old.get('textSlots') or {}, new.get('textSlots') or {}
+        change.details['textSlots'] = {
+            'added': [s for s in new_slots if s not in old_slots],
+            'removed': [s for s in old_slots if s not in new_slots],
+            'modified': [s for s in new_slots if s in old_slots and old_slots[s] != new_slots[s]],
+        }
+    return change
+
+
+def _diff_style(key: str, old: Dict[str, Any], new: Dict[str, Any]) -> ItemChange:
+    change = ItemChange(key=key, name=new.get('name', ''), fields=_changed_fields(old, new))
+    old_color = (old.get('colorInfo') or {}).get('color')
+    new_color = (new.get('colorInfo') or {}).get('color')
+    if old_color != new_color:
+        change.details['color'] = {'from': old_color, 'to': new_color}
+    return change
+
+
+def _components_by_key(components: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {c.get('id') or c.get('name', ''): c for c in components}
+
+
+def _style_key(style: Dict[str, Any]) -> str:
+    # Names are not unique (two 'Primary/primary90' styles); scanner ids carry a trailing comma
+    return (style.get('id') or '').rstrip(',') or style.get('name', '')
+
+
+def _color_styles_by_key(color_styles: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    styles = {}
+    for category, category_styles in (color_styles or {}).items():
+        for style in category_styles:
+            # Moving a style between categories shows up as a 'category' field change
+            styles[_style_key(style)] = dict(style, category=style.get('category', category))
+    return styles
+
+
+def diff_snapshots(old_data: Any, new_data: Any) -> ChangeSet:
+    """Change set turning old_data into new_data (both plain parsed snapshots)."""
+    old, new = _sections(old_data), _sections(new_data)
+    changes = ChangeSet(changed_sections={k for k in set(old) | set(new) if old.get(k) != new.get(k)})
+
+    if 'components' in changes.changed_sections:
+        changes.components = _diff_keyed(
+            _components_by_key(old.get('components') or []),
+            _components_by_key(new.get('components') or []),
+            _diff_component
+        )
+    if 'colorStyles' in changes.changed_sections:
+        changes.color_styles = _diff_keyed(
+            _color_styles_by_key(old.get('colorStyles')),
+            _color_styles_by_key(new.get('colorStyles')),
+            _diff_style
+        )
+    if 'textStyles' in changes.changed_sections:
+        changes.text_styles = _diff_keyed(
+            {_style_key(s): s for s in old.get('textStyles') or []},
+            {_style_key(s): s for s in new.get('textStyles') or []},
+            _diff_style
+        )
+    return changes
+
+
+def print_change_set(changes: ChangeSet, old_name: str, new_name: str):
+    print(f"🔍 {old_name} → {new_name}")
+    for line in changes.summary():
+        print(f"   {line}")
+
+    for key in changes.components.added:
+        print(f"   ➕ component {key}")
+    for key in changes.components.removed:
+        print(f"   ➖ component {key}")
+    for change in changes.components.modified:
+        print(f"   ✏️ component {change.key} ({change.name}): {', '.join(change.fields)}")
+        for prop, diff in change.details.get('variants', {}).items():
+            print(f"      variant {prop}: {diff}")
+        slots = change.details.get('textSlots')
+        if slots:
+            print(f"      textSlots: {slots}")
+
+    for label, section in (('color style', changes.color_styles), ('text style', changes.text_styles)):
+        for key in section.added:
+            print(f"   ➕ {label} {key}")
+        for key in section.removed:
+            print(f"   ➖ {label} {key}")
+        for change in section.modified:
+            color = change.details.get('color')
+            suffix = f" {color['from']} → {color['to']}" if color else ''
+            print(f"   ✏️ {label} {change.name or change.key}: {', '.join(change.fields)}{suffix}")
+
+
+def main():
+    import argparse
+
+    # Add parent directory to path
+    sys.path.append(str(Path(__file__).parent.parent))
+    from scripts.design_system_manifest import DESIGN_SYSTEM_FOLDER, get_manifest
+    from scripts.design_system_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Summarize changes between two design system snapshots")
+    parser.add_argument("old", nargs='?', help="Older snapshot file (default: second newest)")
+    parser.add_argument("new", nargs='?', help="Newer snapshot file (default: newest)")
+    parser.add_argument("--folder", default=DESIGN_SYSTEM_FOLDER, help="Design system folder (default: design-system)")
+    parser.add_argument("--json", action="store_true", help="Print the change set as JSON")
+    args = parser.parse_args()
+
+    if args.old and args.new:
+        old_path, new_path = args.old, args.new
+    else:
+        entries = sorted(get_manifest(args.folder).entries().items(), key=lambda item: item[1]['timestamp'])
+        if len(entries) < 2:
+            print(f"❌ Need at least two snapshots in {args.folder}")
+            sys.exit(1)
+        old_path, new_path = (os.path.join(args.folder, name) for name, _ in entries[-2:])
+
+    registry = get_registry()
+    old, new = registry.get(old_path), registry.get(new_path)
+    changes = diff_snapshots(old.plain_data(), new.plain_data())
+
+    if args.json:
+        print(json.dumps(changes.to_dict(), indent=2, ensure_ascii=False))
+    else:
+        print_change_set(changes, os.path.basename(old_path), os.path.basename(new_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, deduplicated storage for design-system snapshots.
+
+Snapshots live in design-system/.store/:
+- objects.pack / objects.idx
+             append-only pack of blobs, one per component and per top-level
+             section (colorStyles, textStyles, metadata, ...), indexed by the
+             sha256 of the content (key order ignored), so a component that
+             did not change between scans is stored once; blobs keep the
+             export's key order
+- trees/     one record per distinct snapshot, named by the hash of the whole
+             document; byte-identical exports collapse to the same record.
+             A record lists its component blobs either in full or as a delta
+             (copy/insert ops) against the previous snapshot's list, with the
+             delta chain capped so materialization stays bounded
+- refs.json  snapshot filename -> snapshot hash, size and scanner metadata
+
+Packed snapshots are materialized transparently by DesignSystemRegistry and
+listed by the manifest as if the original file were still there.
+
+Usage:
+    python scripts/snapshot_store.py pack [--prune]        # Store every snapshot (prune: delete originals)
+    python scripts/snapshot_store.py stats                 # Disk usage vs. logical size
+    python scripts/snapshot_store.py materialize <file>    # Write a stored snapshot back as JSON
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+STORE_DIRNAME = ".store"
+REFS_FILENAME = "refs.json"
+MAX_DELTA_CHAIN = 8
+BLOB_CACHE_SIZE = 4096
+
+PathLike = Union[str, Path]
+
+
+def _canonical(value: Any) -> bytes:
+    """Key-order independent form, used only for hashing."""
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _serialize(value: Any) -> bytes:
+    """Stored form: compact, keys in the export's order so snapshots materialize as scanned."""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _hash(raw: bytes) -> str:
+    return hashlib.sha256(raw).hexdigest()
+
+
+def snapshot_hash(data: Any) -> str:
+    """Content hash of a whole snapshot, independent of formatting."""
+    return _hash(_canonical(data))
+
+
+class SnapshotStore:
+    """Content-addressed snapshot store rooted at <folder>/.store."""
+
+    def __init__(self, folder: PathLike):
+        self.folder = Path(folder)
+        self.root = self.folder / STORE_DIRNAME
+        self.pack_path = self.root / "objects.pack"
+        self.pack_index_path = self.root / "objects.idx"
+        self.trees_dir = self.root / "trees"
+        self.refs_path = self.root / REFS_FILENAME
+        self._lock = threading.RLock()
+        self._blob_cache: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._latest: Optional[Dict[str, Any]] = None
+        self._pack_index: Optional[Dict[str, List[int]]] = None
+
+    # ----- objects -----
+
+    def _index(self) -> Dict[str, List[int]]:
+        """hash -> [offset, length] into objects.pack"""
+        if self._pack_index is None:
+            if self.pack_index_path.exists():
+                with open(self.pack_index_path, 'r', encoding='utf-8') as f:
+                    self._pack_index = json.load(f)
+            else:
+                self._pack_index = {}
+        return self._pack_index
+
+    def _save_index(self):
+        tmp_path = self.pack_index_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index(), f, separators=(',', ':'))
+        os.replace(tmp_path, self.pack_index_path)
+
+    def _put_object(self, value: Any) -> str:
+        digest = _hash(_canonical(value))
+        index = self._index()
+        if digest not in index:
+            raw = _serialize(value)
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.pack_path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(raw + b'\n')
+            index[digest] = [offset, len(raw)]
+        return digest
+
+    def _get_object(self, digest: str) -> Any:
+        # Raw bytes are cached so every caller gets its own parsed copy
+        with self._lock:
+            raw = self._blob_cache.get(digest)
+            if raw is not None:
+                self._blob_cache.move_to_end(digest)
+        if raw is None:
+            offset, length = self._index()[digest]
+            with open(self.pack_path, 'rb') as f:
+                f.seek(offset)
+                raw = f.read(length)
+            with self._lock:
+                self._blob_cache[digest] = raw
+                if len(self._blob_cache) > BLOB_CACHE_SIZE:
+                    self._blob_cache.popitem(last=False)
+        return json.loads(raw)
+
+    def _tree_path(self, digest: str) -> Path:
+        return self.trees_dir / f"{digest}.json"
+
+    def _get_tree(self, digest: str) -> Dict[str, Any]:
+        return json.loads(self._tree_path(digest).read_text(encoding='utf-8'))
+
+    # ----- refs -----
+
+    def refs(self) -> Dict[str, Dict[str, Any]]:
+        if not self.refs_path.exists():
+            return {}
+        with open(self.refs_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_refs(self, refs: Dict[str, Dict[str, Any]]):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.refs_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(refs, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.refs_path)
+
+    # ----- snapshots -----
+
+    def _component_hashes(self, digest: str) -> List[str]:
+        """Resolve a tree's component list, following its delta chain."""
+        tree = self._get_tree(digest)
+        if 'components' in tree:
+            return tree['components']
+
+        base = self._component_hashes(tree['base'])
+        hashes: List[str] = []
+        for op in tree['ops']:
+            if op[0] == '=':
+                hashes.extend(base[op[1]:op[2]])
+            else:
+                hashes.extend(op[1])
+        return hashes
+
+    def put(self, data: Any) -> str:
+        """Store a snapshot and return its hash; identical snapshots are stored once."""
+        digest = snapshot_hash(data)
+        with self._lock:
+            if self._tree_path(digest).exists():
+                return digest
+
+            # Live payloads / very old exports are a bare component list
+            components = data if isinstance(data, list) else data.get('components', [])
+            component_hashes = [self._put_object(c) for c in components]
+            tree: Dict[str, Any] = {'list': isinstance(data, list)}
+            if isinstance(data, dict):
+                tree['keys'] = list(data.keys())
+                tree['sections'] = {k: self._put_object(v) for k, v in data.items() if k != 'components'}
+
+            base = self._latest_tree()
+            if base and base['depth'] < MAX_DELTA_CHAIN:
+                base_hashes = self._component_hashes(base['hash'])
+                matcher = difflib.SequenceMatcher(None, base_hashes, component_hashes, autojunk=False)
+                ops: List[Any] = []
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                    if tag == 'equal':
+                        ops.append(['=', i1, i2])
+                    elif j2 > j1:
+                        ops.append(['+', component_hashes[j1:j2]])
+                tree.update({'base': base['hash'], 'depth': base['depth'] + 1, 'ops': ops})
+            else:
+                tree.update({'depth': 0, 'components': component_hashes})
+
+            self._save_index()
+            self.trees_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._tree_path(digest), 'w', encoding='utf-8') as f:
+                json.dump(tree, f, separators=(',', ':'))
+            self._latest = {'hash': digest, 'depth': tree['depth']}
+        return digest
+
+    def _latest_tree(self) -> Optional[Dict[str, Any]]:
+        if self._latest:
+            return self._latest
+        refs = self.refs()
+        if not refs:
+            return None
+        # Delta against the most recently added snapshot
+        latest = max(refs.values(), key=lambda ref: ref.get('added', 0))
+        return {'hash': latest['hash'], 'depth': self._get_tree(latest['hash']).get('depth', 0)}
+
+    def get(self, digest: str) -> Any:
+        """Materialize a stored snapshot as plain data."""
+        tree = self._get_tree(digest)
+        components = [self._get_object(h) for h in self._component_hashes(digest)]
+        if tree.get('list'):
+            return components
+
+        data: Dict[str, Any] = {}
+        for key in tree['keys']:
+            data[key] = components if key == 'components' else self._get_object(tree['sections'][key])
+        return data
+
+    def add_file(self, path: PathLike, prune: bool = False) -> str:
+        """Store a snapshot file under its filename; optionally delete the original."""
+        path = Path(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        digest = self.put(data)
+
+        with self._lock:
+            refs = self.refs()
+            refs[path.name] = {
+                'hash': digest,
+                'size': path.stat().st_size,
+                'metadata': data.get('metadata', {}) if isinstance(data, dict) else {},
+                'added': len(refs) + 1 if path.name not in refs else refs[path.name]['added'],
+            }
+            self._save_refs(refs)
+
+        if prune:
+            path.unlink()
+        return digest
+
+    def add_data(self, filename: str, data: Any) -> str:
+        """Store an export that was never written as a full JSON file."""
+        digest = self.put(data)
+        with self._lock:
+            refs = self.refs()
+            refs[filename] = {
+                'hash': digest,
+                'size': len(json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')),
+                'metadata': data.get('metadata', {}) if isinstance(data, dict) else {},
+                'added': len(refs) + 1,
+            }
+            self._save_refs(refs)
+        return digest
+
+    def read_text(self, filename: str, digest: Optional[str] = None) -> str:
+        """JSON text of a stored snapshot, formatted like a scanner export."""
+        if digest is None:
+            ref = self.refs().get(filename)
+            if not ref:
+                raise FileNotFoundError(f"Snapshot not in store: {filename}")
+            digest = ref['hash']
+        return json.dumps(self.get(digest), indent=2, ensure_ascii=False)
+
+    def contains(self, filename: str) -> bool:
+        return filename in self.refs()
+
+    def stats(self) -> Dict[str, int]:
+        disk = 0
+        for root, _, files in os.walk(self.root):
+            disk += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        refs = self.refs()
+        return {
+            'snapshots': len(refs),
+            'distinct_snapshots': len(set(ref['hash'] for ref in refs.values())),
+            'logical_bytes': sum(ref['size'] for ref in refs.values()),
+            'stored_bytes': disk,
+        }
+
+
+_stores: Dict[str, SnapshotStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(folder: PathLike) -> SnapshotStore:
+    """Process-wide store for a design-system folder."""
+    key = os.path.abspath(folder)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = SnapshotStore(folder)
+        return _stores[key]
+
+
+def main():
+    import argparse
+
+    # Add parent directory to path
+    sys.path.append(str(Path(__file__).parent.parent))
+    from scripts.design_system_manifest import DESIGN_SYSTEM_FOLDER, is_snapshot_filename, snapshot_timestamp
+
+    parser = argparse.ArgumentParser(description="Content-addressed design system snapshot store")
+    parser.add_argument("command", choices=["pack", "stats", "materialize"])
+    parser.add_argument("filename", nargs='?', help="Snapshot filename (materialize)")
+    parser.add_argument("--folder", default=DESIGN_SYSTEM_FOLDER, help="Design system folder (default: design-system)")
+    parser.add_argument("--prune", action="store_true", help="Delete original JSON files after packing")
+    args = parser.parse_args()
+
+    store = get_store(args.folder)
+
+    if args.command == "pack":
+        files = sorted(
+            (p for p in Path(args.folder).iterdir() if p.is_file() and is_snapshot_filename(p.name)),
+            key=snapshot_timestamp
+        )
+        for path in files:
+            digest = store.add_file(path, prune=args.prune)
+            print(f"📦 {path.name} -> {digest[:12]}")
+        print(f"✅ Packed {len(files)} snapshots")
+
+    elif args.command == "materialize":
+        if not args.filename:
+            print("❌ materialize requires a snapshot filename")
+            sys.exit(1)
+        target = Path(args.folder) / args.filename
+        target.write_text(store.read_text(args.filename), encoding='utf-8')
+        print(f"✅ Materialized {target}")
+
+    stats = store.stats()
+    ratio = stats['stored_bytes'] / stats['logical_bytes'] if stats['logical_bytes'] else 0
+    print(f"📊 {stats['snapshots']} snapshots ({stats['distinct_snapshots']} distinct): "
+          f"{stats['logical_bytes']:,} bytes logical, {stats['stored_bytes']:,} bytes stored ({ratio:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Inter-stage handoff compaction for the alt3 pipeline.
+
+Each downstream prompt only consumes part of the previous stage's output:
+- UX UI Designer (stage 2) and Visual UX Designer (stage 4) need the structured
+  requirements from the User Request Analyzer (stage 1)
+- JSON Engineer (stage 3) and Visual UX Designer (stage 4) need the layout JSON
+  from the UX UI Designer (stage 2), not its design rationale
+
+StageHandoff extracts those sections and records how much text (and roughly
+how many tokens) every handoff saved.
+"""
+
+import json
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from scripts.json_extract import extract_json
+
+# Analyzer sections that are commentary rather than requirements
+PROSE_SECTION_PATTERN = re.compile(
+    r'^#+\s*(design\s+)?(rationale|notes?|explanation|reasoning|commentary)\b',
+    re.IGNORECASE
+)
+
+# Rough chars-per-token ratio for Gemini on mixed English/JSON text
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate used only for reporting savings."""
+    return len(text) // CHARS_PER_TOKEN
+
+
+def compact_requirements(analyzer_output: str) -> str:
+    """
+    Keep the structured requirements from the analyzer output.
+
+    Drops rationale/notes sections, fenced code blocks, markdown emphasis,
+    horizontal rules and blank-line runs. Headings, bullets and content text
+    are kept verbatim.
+    """
+    lines: List[str] = []
+    skipping_section = False
+    in_fence = False
+
+    for line in analyzer_output.splitlines():
+        stripped = line.strip()
+
+        if stripped.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence:
+            continue
+
+        if stripped.startswith('#'):
+            skipping_section = bool(PROSE_SECTION_PATTERN.match(stripped))
+        if skipping_section:
+            continue
+
+        # Horizontal rules would also collide with the '\n\n---\n\n' stage 4 split
+        if re.fullmatch(r'[-*_]{3,}', stripped):
+            continue
+
+        line = line.replace('**', '').rstrip()
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+
+    compacted = '\n'.join(lines).strip()
+    return compacted or analyzer_output
+
+
+def extract_layout_json(designer_output: str) -> Optional[Any]:
+    """Return the first JSON object after the rationale separator, or None."""
+    try:
+        return extract_json(designer_output)
+    except json.JSONDecodeError:
+        return None
+
+
+def compact_layout(designer_output: str) -> str:
+    """Keep only the layout JSON from designer output, minified."""
+    layout = extract_layout_json(designer_output)
+    if layout is None:
+        return designer_output
+    return json.dumps(layout, ensure_ascii=False, separators=(',', ':'))
+
+
+@dataclass
+class HandoffStats:
+    target_stage: int
+    section: str
+    original_chars: int
+    compacted_chars: int
+    original_tokens: int
+    compacted_tokens: int
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+
+class StageHandoff:
+    """Builds compacted inputs for downstream stages and tracks the savings."""
+
+    def __init__(self):
+        # One entry per handoff call: a stage can receive the same section more than
+        # once (e.g. the QA-fixed layout for stage 3 after the designer's layout)
+        self.stats: List[HandoffStats] = []
+
+    def _record(self, target_stage: int, section: str, original: str, compacted: str) -> str:
+        stats = HandoffStats(
+            target_stage=target_stage,
+            section=section,
+            original_chars=len(original),
+            compacted_chars=len(compacted),
+            original_tokens=estimate_tokens(original),
+            compacted_tokens=estimate_tokens(compacted),
+        )
+        self.stats.append(stats)
+        print(f"✂️ Handoff to stage {target_stage} ({section}): "
+              f"{stats.original_chars} -> {stats.compacted_chars} chars, ~{stats.tokens_saved} tokens saved")
+        return compacted
+
+    def requirements(self, analyzer_output: str, target_stage: int) -> str:
+        """Structured requirements from stage 1 for the given stage."""
+        return self._record(target_stage, "requirements", analyzer_output, compact_requirements(analyzer_output))
+
+    def layout(self, designer_output: str, target_stage: int) -> str:
+        """Layout JSON from stage 2 (or QA) for the given stage."""
+        return self._record(target_stage, "layout", designer_output, compact_layout(designer_output))
+
+    def visual_input(self, analyzer_output: str, designer_output: str, target_stage: int = 4) -> str:
+        """Stage 4 input in the '<requirements>\\n\\n---\\n\\n<layout>' format."""
+        return f"{self.requirements(analyzer_output, target_stage)}\n\n---\n\n{self.layout(designer_output, target_stage)}"
+
+    def report(self) -> Dict[str, Any]:
+        """Per-stage savings, suitable for the run summary."""
+        per_stage: Dict[str, Dict[str, int]] = {}
+        for stats in self.stats:
+            stage = per_stage.setdefault(f"stage_{stats.target_stage}", {
+                'original_tokens': 0, 'compacted_tokens': 0, 'tokens_saved': 0
+            })
+            stage['original_tokens'] += stats.original_tokens
+            stage['compacted_tokens'] += stats.compacted_tokens
+            stage['tokens_saved'] += stats.tokens_saved
+
+        return {
+            'handoffs': [dict(asdict(s), tokens_saved=s.tokens_saved) for s in self.stats],
+            'per_stage': per_stage,
+            'total_tokens_saved': sum(s.tokens_saved for s in self.stats),
+        }
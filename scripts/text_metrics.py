@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Text fitting for figma-ready JSON, before anything is rendered.
+
+Text is measured with per-font glyph advance tables: built from the font file
+with Pillow when the family is installed (FONT_DIRS, or UXPAL_FONT_DIR), else
+an approximate sans-serif table (Roboto proportions) scaled for the weight.
+Text styles from the snapshot supply font, size, line height, letter spacing
+and text case; lines are broken greedily at spaces like Figma's auto-height
+text.
+
+TextChecker visits a document once as a TreeWalker visitor
+(check_document_text() runs it on a walk of its own), tracking the width each
+node gets from its containers (viewport minus paddings, row space shared
+between flexible children), and predicts line count, width and height of
+every native-text and component text slot. It flags:
+
+- text-overflow    a word wider than the space it gets (breaks mid-word or spills)
+- text-wraps       text in a row that wraps onto more lines
+- text-truncated   a single-line slot of a fixed-size component that the
+                   value does not fit (measured against the slot's
+                   placeholder length)
+
+Widths of hugging siblings are unknown, so row space is an upper bound and
+predictions err towards no issue.
+
+Usage:
+    python scripts/text_metrics.py figma-ready/figma_ready_<run_id>.json
+"""
+
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.tree_walker import Node, TreeWalker, frame_properties
+
+VIEWPORT_WIDTH = 375
+# Renderer defaults for native-text without a text style
+DEFAULT_FAMILY = 'Inter'
+DEFAULT_STYLE = 'Regular'
+DEFAULT_FONT_SIZE = 16
+# Line height of 'AUTO' (ascender + descender of common UI fonts)
+AUTO_LINE_HEIGHT = 1.2
+
+FONT_DIRS = [
+    os.environ.get('UXPAL_FONT_DIR', ''),
+    'fonts',
+    '~/.fonts',
+    '~/.local/share/fonts',
+    '/usr/share/fonts',
+    '/Library/Fonts',
+    '~/Library/Fonts',
+    'C:/Windows/Fonts',
+]
+# Characters measured from real font files
+MEASURED_CHARACTERS = ''.join(chr(c) for c in range(0x20, 0x7f)) + \
+    ''.join(chr(c) for c in range(0xa0, 0x180)) + ''.join(chr(c) for c in range(0x400, 0x460))
+
+# Approximate advances in em (Roboto Regular proportions) for when no font file is available
+_FALLBACK_ADVANCES = dict(zip(
+    ' !"#$%&\'()*+,-./0123456789:;<=>?@'
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^_`abcdefghijklmnopqrstuvwxyz{|}~',
+    (0.248, 0.258, 0.320, 0.616, 0.562, 0.733, 0.622, 0.174, 0.342, 0.348, 0.431, 0.567, 0.196, 0.276, 0.263,
+     0.412, *([0.562] * 10), 0.242, 0.212, 0.508, 0.549, 0.522, 0.473, 0.898,
+     0.653, 0.623, 0.651, 0.656, 0.568, 0.553, 0.681, 0.713, 0.272, 0.552, 0.627, 0.538, 0.873, 0.713,
+     0.688, 0.631, 0.688, 0.616, 0.593, 0.597, 0.648, 0.637, 0.887, 0.627, 0.601, 0.599,
+     0.265, 0.410, 0.265, 0.418, 0.452, 0.309,
+     0.544, 0.561, 0.523, 0.564, 0.530, 0.347, 0.561, 0.551, 0.243, 0.239, 0.507, 0.243, 0.876, 0.552,
+     0.570, 0.561, 0.568, 0.338, 0.516, 0.327, 0.551, 0.484, 0.751, 0.496, 0.473, 0.496,
+     0.338, 0.244, 0.338, 0.680),
+))
+_FALLBACK_LOWER = 0.55
+_FALLBACK_UPPER = 0.66
+# Heavier weights of the same family run wider
+WEIGHT_WIDTH = {'thin': 0.97, 'light': 0.98, 'regular': 1.0, 'medium': 1.03, 'semibold': 1.05,
+                'bold': 1.06, 'extrabold': 1.08, 'black': 1.1}
+
+
+@dataclass(frozen=True)
+class FontMetrics:
+    family: str
+    style: str
+    advances: Dict[str, float]
+    default_advance: float
+    # Where the advances come from: a font file path or 'fallback'
+    source: str
+
+    def advance(self, char: str) -> float:
+        advance = self.advances.get(char)
+        if advance is None:
+            advance = self.default_advance if not char.isupper() else self.default_advance * 1.2
+        return advance
+
+    def average_advance(self) -> float:
+        """Mean advance of lowercase letters, for estimating placeholder widths."""
+        return sum(self.advance(c) for c in 'abcdefghijklmnopqrstuvwxyz') / 26
+
+
+@dataclass(frozen=True)
+class TextStyle:
+    family: str
+    style: str
+    font_size: float
+    line_height: float
+    letter_spacing: float = 0.0
+    upper: bool = False
+
+    @classmethod
+    def from_snapshot(cls, style: Dict[str, Any]) -> 'TextStyle':
+        font = style.get('fontName') or {}
+        size = float(style.get('fontSize') or DEFAULT_FONT_SIZE)
+        line = style.get('lineHeight') or {}
+        if line.get('unit') == 'PIXELS':
+            line_height = float(line.get('value') or size * AUTO_LINE_HEIGHT)
+        elif line.get('unit') == 'PERCENT':
+            line_height = size * float(line.get('value') or 100) / 100
+        else:
+            line_height = size * AUTO_LINE_HEIGHT
+        spacing = style.get('letterSpacing') or {}
+        letter_spacing = float(spacing.get('value') or 0)
+        if spacing.get('unit') == 'PERCENT':
+            letter_spacing = size * letter_spacing / 100
+        return cls(font.get('family') or DEFAULT_FAMILY, font.get('style') or DEFAULT_STYLE, size,
+                   line_height, letter_spacing, style.get('textCase') == 'UPPER')
+
+    @classmethod
+    def default(cls, font_size: Optional[float] = None, bold: bool = False) -> 'TextStyle':
+        size = float(font_size or DEFAULT_FONT_SIZE)
+        return cls(DEFAULT_FAMILY, 'Bold' if bold else DEFAULT_STYLE, size, size * AUTO_LINE_HEIGHT)
+
+
+@dataclass
+class TextLayout:
+    lines: List[str]
+    width: float
+    height: float
+    # Widest single word: wider than the box means a mid-word break
+    longest_word: str
+    longest_word_width: float
+
+
+def _normalized(name: str) -> str:
+    return re.sub(r'[\s_-]', '', name).lower()
+
+
+_font_files: Optional[Dict[str, Path]] = None
+_fonts: Dict[Tuple[str, str], FontMetrics] = {}
+_fonts_lock = threading.Lock()
+_warned_no_pillow = False
+
+
+def font_file(family: str, style: str) -> Optional[Path]:
+    """Installed font file of a family and style, if any."""
+    global _font_files
+    if _font_files is None:
+        files: Dict[str, Path] = {}
+        for folder in FONT_DIRS:
+            folder_path = Path(folder).expanduser() if folder else None
+            if folder_path is None or not folder_path.is_dir():
+                continue
+            for path in folder_path.rglob('*'):
+                if path.suffix.lower() in ('.ttf', '.otf'):
+                    files.setdefault(_normalized(path.stem), path)
+        _font_files = files
+    return _font_files.get(_normalized(f"{family}{style}")) or \
+        (_font_files.get(_normalized(family)) if _normalized(style) == 'regular' else None)
+
+
+def _measured_advances(path: Path) -> Optional[Dict[str, float]]:
+    global _warned_no_pillow
+    try:
+        from PIL import ImageFont
+    except ImportError:
+        if not _warned_no_pillow:
+            _warned_no_pillow = True
+            print(f"⚠️ Pillow is not installed: text is measured with approximate widths, "
+                  f"not {path.name} (pip install Pillow)")
+        return None
+    try:
+        units = 1000
+        font = ImageFont.truetype(str(path), units)
+        return {char: font.getlength(char) / units for char in MEASURED_CHARACTERS}
+    except OSError:
+        return None
+
+
+def get_font_metrics(family: str, style: str = DEFAULT_STYLE) -> FontMetrics:
+    """Advance table of a font, built once per (family, style)."""
+    key = (family, style)
+    with _fonts_lock:
+        metrics = _fonts.get(key)
+        if metrics is not None:
+            return metrics
+        path = font_file(family, style)
+        advances = _measured_advances(path) if path else None
+        if advances:
+            lowercase = [advances[c] for c in 'abcdefghijklmnopqrstuvwxyz']
+            metrics = FontMetrics(family, style, advances, sum(lowercase) / len(lowercase), str(path))
+        else:
+            scale = WEIGHT_WIDTH.get(_normalized(style).replace('italic', '') or 'regular', 1.0)
+            advances = {char: advance * scale for char, advance in _FALLBACK_ADVANCES.items()}
+            metrics = FontMetrics(family, style, advances, _FALLBACK_LOWER * scale, 'fallback')
+        _fonts[key] = metrics
+        return metrics
+
+
+def text_width(text: str, style: TextStyle) -> float:
+    """Rendered width of text on one line."""
+    if not text:
+        return 0.0
+    font = get_font_metrics(style.family, style.style)
+    advance = font.advance
+    return sum(advance(char) for char in text) * style.font_size + style.letter_spacing * len(text)
+
+
+def layout_text(text: str, style: TextStyle, max_width: Optional[float] = None) -> TextLayout:
+    """Lines, size and widest word of text set in style, wrapped at max_width (None: no wrapping)."""
+    if style.upper:
+        text = text.upper()
+    space = text_width(' ', style)
+    lines: List[str] = []
+    widths: List[float] = []
+    longest_word, longest_word_width = '', 0.0
+    for paragraph in text.split('\n'):
+        line, line_width = '', 0.0
+        for word in paragraph.split(' '):
+            word_width = text_width(word, style)
+            if word_width > longest_word_width:
+                longest_word, longest_word_width = word, word_width
+            if line and max_width is not None and line_width + space + word_width > max_width:
+                lines.append(line)
+                widths.append(line_width)
+                line, line_width = word, word_width
+            else:
+                line_width += (space if line else 0.0) + word_width
+                line = f"{line} {word}" if line else word
+        # Words wider than the box are broken across as many lines as they need
+        extra = int(line_width // max_width) if max_width and line_width > max_width and ' ' not in line else 0
+        lines.extend([line] * (extra + 1))
+        widths.append(min(line_width, max_width) if max_width else line_width)
+    return TextLayout(lines, max(widths, default=0.0), len(lines) * style.line_height,
+                      longest_word, longest_word_width)
+
+
+def _slot_key(name: str) -> str:
+    return str(name).strip().lower().replace(' ', '-')
+
+
+class TextFitter:
+    """Text styles and component text slots of a snapshot, resolved once."""
+
+    def __init__(self, snapshot):
+        self.styles: Dict[str, TextStyle] = {
+            name: TextStyle.from_snapshot(style) for name, style in snapshot.text_styles_by_name.items()
+        }
+        # component id -> slot key -> (slot name, TextStyle, placeholder length, fixed-size component)
+        self.slots: Dict[str, Dict[str, Tuple[str, TextStyle, Optional[int], bool]]] = {}
+        for component in snapshot.components:
+            text_slots = component.get('textSlots') or {}
+            if not text_slots:
+                continue
+            layers = {_slot_key(layer.get('nodeName', '')): layer for layer in component.get('textHierarchy') or []}
+            fixed = (component.get('layoutBehavior') or {}).get('type') == 'fixed'
+            slots = {}
+            for slot_name, slot in text_slots.items():
+                layer = layers.get(_slot_key(slot_name), {})
+                style = self.styles.get(layer.get('textStyleName')) or TextStyle.default(
+                    layer.get('fontSize'), (layer.get('fontWeight') or 400) >= 600)
+                single_line = slot.get('type') == 'single-line'
+                slots[_slot_key(slot_name)] = (slot_name, style, slot.get('maxLength') if single_line else None, fixed)
+            self.slots[component['id']] = slots
+
+    def text_style(self, properties: Dict[str, Any]) -> TextStyle:
+        name = properties.get('textStyle') or properties.get('textStyleName')
+        if name in self.styles:
+            return self.styles[name]
+        bold = str(properties.get('fontWeight', '')).lower() in ('bold', '600', '700')
+        return TextStyle.default(properties.get('fontSize'), bold)
+
+
+def get_text_fitter(snapshot) -> TextFitter:
+    """TextFitter for a DesignSystemSnapshot, built once and kept while its components and text styles are unchanged."""
+    return snapshot.derived('text_fitter', lambda: TextFitter(snapshot), ['components', 'textStyles'])
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _fixed_width(item: Dict[str, Any]) -> Optional[float]:
+    properties = item.get('properties') if isinstance(item.get('properties'), dict) else {}
+    return _number(item.get('width')) or (_number(properties.get('width'))
+                                          if str(item.get('type', '')).startswith('native-') else None)
+
+
+def _is_flexible(item: Dict[str, Any]) -> bool:
+    if item.get('type') == 'native-text':
+        return item.get('_useFlexFill', True) is not False
+    return item.get('horizontalSizing') == 'FILL' or bool(item.get('layoutGrow'))
+
+
+class TextChecker:
+    """
+    Text wrapping / overflow predictions as a TreeWalker visitor; finish() measures.
+
+    Every native-text and component text slot is laid out in the width its
+    container gives it. Nodes are measured after the walk, so fixes made by
+    other visitors on the same walk (e.g. LayoutNormalizer dropping fixed text
+    widths further down) are already in place.
+    """
+
+    def __init__(self, fitter: TextFitter, viewport_width: float = VIEWPORT_WIDTH):
+        self.fitter = fitter
+        self.viewport_width = viewport_width
+        self.predictions: List[Dict[str, Any]] = []
+        self.issues: List[Dict[str, Any]] = []
+        # id(node) -> width the node gets from its container
+        self._widths: Dict[int, float] = {}
+        self._horizontal_parents = set()
+        self._nodes: List[Node] = []
+
+    def register(self, walker: TreeWalker) -> 'TextChecker':
+        walker.register(self.visit)
+        return self
+
+    def _give_widths(self, node: Node):
+        """Width each child of a container gets: the inner width, shared in rows."""
+        widths = self._widths
+        frame = frame_properties(node.value)
+        items = node.value.get('items')
+        if not isinstance(items, list):
+            return
+        parent = node.layout_parent()
+        width = _number(frame.get('width')) if parent is None else None
+        width = width or widths.get(id(node.value)) or self.viewport_width
+        inner = width - (_number(frame.get('paddingLeft')) or 0) - (_number(frame.get('paddingRight')) or 0)
+        children = [item for item in items if isinstance(item, dict)]
+        if frame.get('layoutMode') != 'HORIZONTAL':
+            for child in children:
+                widths[id(child)] = _fixed_width(child) or inner
+            return
+        self._horizontal_parents.add(id(node.value))
+        spacing = _number(frame.get('itemSpacing')) or 0
+        remaining = inner - spacing * max(len(children) - 1, 0)
+        flexible = []
+        for child in children:
+            fixed = _fixed_width(child)
+            if fixed is not None:
+                widths[id(child)] = fixed
+                remaining -= fixed
+            elif _is_flexible(child):
+                flexible.append(child)
+            elif child.get('type') == 'native-text':
+                natural = text_width(str((child.get('properties') or {}).get('content', '')),
+                                     self.fitter.text_style(child.get('properties') or {}))
+                widths[id(child)] = natural
+                remaining -= natural
+            else:
+                # Hugging sibling of unknown width: the row space stays an upper bound
+                widths[id(child)] = inner
+        for child in flexible:
+            widths[id(child)] = max(remaining / len(flexible), 0.0)
+
+    def _record(self, path: str, text: str, style: TextStyle, available: float) -> TextLayout:
+        layout = layout_text(text, style, available)
+        self.predictions.append({
+            'path': path, 'text': text[:60], 'font': f"{style.family} {style.style} {style.font_size:g}",
+            'lines': len(layout.lines), 'width': round(layout.width, 1), 'height': round(layout.height, 1),
+            'available': round(available, 1),
+        })
+        if layout.longest_word_width > available + 0.5:
+            self.issues.append({'rule': 'text-overflow', 'path': path,
+                                'message': f"{layout.longest_word!r} is {layout.longest_word_width:.0f}px wide, "
+                                           f"the container gives it {available:.0f}px"})
+        return layout
+
+    def visit(self, node: Node):
+        self._nodes.append(node)
+
+    def finish(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(predictions, issues) for the nodes of the walk, in document order."""
+        nodes, self._nodes = self._nodes, []
+        for node in nodes:
+            self._measure(node)
+        return self.predictions, self.issues
+
+    def _measure(self, node: Node):
+        value = node.value
+        available = self._widths.get(id(value), self.viewport_width)
+        parent = node.layout_parent()
+        in_row = parent is not None and id(parent.value) in self._horizontal_parents
+        if value.get('type') == 'native-text':
+            properties = value.get('properties') if isinstance(value.get('properties'), dict) else {}
+            content = properties.get('content')
+            if isinstance(content, str) and content:
+                layout = self._record(node.path, content, self.fitter.text_style(properties), available)
+                if in_row and len(layout.lines) > 1:
+                    self.issues.append({'rule': 'text-wraps', 'path': node.path,
+                                        'message': f"wraps to {len(layout.lines)} lines in a {available:.0f}px row slot"})
+        elif value.get('type') == 'component':
+            slots = self.fitter.slots.get(value.get('componentNodeId'), {})
+            properties = value.get('properties') if isinstance(value.get('properties'), dict) else {}
+            for key, text in properties.items():
+                slot = slots.get(_slot_key(key))
+                if slot is None or not isinstance(text, str) or not text:
+                    continue
+                slot_name, style, max_length, fixed = slot
+                path = f"{node.path}.properties.{key}"
+                layout = self._record(path, text, style, available)
+                if fixed and max_length:
+                    font = get_font_metrics(style.family, style.style)
+                    capacity = max_length * (font.average_advance() * style.font_size + style.letter_spacing)
+                    if layout.width > capacity:
+                        self.issues.append({'rule': 'text-truncated', 'path': path,
+                                            'message': f"{layout.width:.0f}px in the ~{capacity:.0f}px single-line "
+                                                       f"{slot_name!r} slot"})
+        self._give_widths(node)
+
+
+def check_document_text(document: Any, fitter: TextFitter,
+                        viewport_width: float = VIEWPORT_WIDTH) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """(predictions, issues) for every native-text and component text slot of document."""
+    walker = TreeWalker()
+    checker = TextChecker(fitter, viewport_width).register(walker)
+    walker.walk(document)
+    return checker.finish()
+
+
+def main():
+    import argparse
+    import json
+    from scripts.design_system_registry import get_registry
+
+    parser = argparse.ArgumentParser(description="Predict text wrapping and overflow in figma-ready JSON")
+    parser.add_argument("file", help="figma-ready JSON")
+    parser.add_argument("--width", type=float, default=VIEWPORT_WIDTH, help="Viewport width")
+    args = parser.parse_args()
+
+    snapshot = get_registry().latest()
+    if snapshot is None:
+        print("❌ No design system snapshot found")
+        sys.exit(1)
+    document = json.loads(Path(args.file).read_text(encoding='utf-8'))
+    predictions, issues = check_document_text(document, get_text_fitter(snapshot), args.width)
+    for prediction in predictions:
+        print(f"📏 {prediction['path']}: {prediction['lines']} line(s), {prediction['width']}x{prediction['height']}px "
+              f"of {prediction['available']}px ({prediction['font']}) {prediction['text']!r}")
+    for issue in issues:
+        print(f"⚠️ [{issue['rule']}] {issue['path']}: {issue['message']}")
+    print(f"{'✅' if not issues else '⚠️'} {len(predictions)} texts, {len(issues)} issues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Single-pass iterative walker for figma-ready trees.
+
+Checks and transforms register as visitors on one TreeWalker; walk() then
+visits every node once, in document order, with an explicit stack instead of
+recursion (no recursion limit on deep trees) and calls every visitor whose
+types match the node's 'type'. Each visitor gets a Node with the dict, its
+JSONPath-style path and the enclosing Node, so rules can look at parents
+without their own traversal:
+
+    walker = TreeWalker()
+    walker.register(lambda node: print(node.path), types=('native-text',))
+    walker.walk(document)
+
+Visitors may change the node in place; its children are read after all
+visitors have run, so replaced or added children are walked too.
+
+By default only the figma tree is followed ('layoutContainer' and 'items');
+TreeWalker(child_keys=None) visits every nested dict. A visitor registered
+with nested=True also gets the dicts nested in other keys (properties,
+variants, fill, ...) of the same walk, e.g. for color fixes in arbitrary
+properties, while the others still see only tree nodes.
+
+With on_error set, a visitor that raises is reported and dropped for the rest
+of the walk instead of aborting it, so independent checks sharing a walker
+stay best effort.
+"""
+
+from typing import Any, Callable, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+FIGMA_CHILD_KEYS = ('layoutContainer', 'items')
+
+
+class Node:
+    """One dict in the tree and where it was found."""
+
+    __slots__ = ('value', 'path', 'parent', 'key', 'in_tree')
+
+    def __init__(self, value: Dict[str, Any], path: str, parent: Optional['Node'], key: Optional[str],
+                 in_tree: bool = True):
+        self.value = value
+        self.path = path
+        self.parent = parent
+        # Key of the parent the node was found under ('items', 'layoutContainer', ...)
+        self.key = key
+        # Reached through the walker's child keys only (False for e.g. a 'properties' dict)
+        self.in_tree = in_tree
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.value.get('type')
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for _ in self.ancestors())
+
+    def ancestors(self) -> Iterator['Node']:
+        parent = self.parent
+        while parent is not None:
+            yield parent
+            parent = parent.parent
+
+    def layout_parent(self) -> Optional['Node']:
+        """Enclosing container; a top-level {'layoutContainer': {...}} wrapper is not one."""
+        node = self
+        while node.parent is not None and node.key == 'layoutContainer' and node.parent.type != 'layoutContainer':
+            node = node.parent
+        return node.parent
+
+
+def frame_properties(value: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Auto-layout properties of a container. Roots in the
+    {'layoutContainer': {...properties}, 'items': [...]} format keep them in
+    'layoutContainer' (keys set on the root itself win).
+    """
+    properties = value.get('layoutContainer')
+    if value.get('type') == 'layoutContainer' or not isinstance(properties, dict):
+        return value
+    return {**properties, **{key: item for key, item in value.items() if key not in FIGMA_CHILD_KEYS}}
+
+
+Visitor = Callable[[Node], None]
+ErrorHandler = Callable[[Visitor, Node, Exception], None]
+
+
+class TreeWalker:
+    def __init__(self, child_keys: Optional[Sequence[str]] = FIGMA_CHILD_KEYS,
+                 on_error: Optional[ErrorHandler] = None):
+        self.child_keys = child_keys
+        self.on_error = on_error
+        self._visitors: List[Tuple[Optional[Collection[str]], bool, Visitor]] = []
+
+    def register(self, visitor: Visitor, types: Optional[Collection[str]] = None, nested: bool = False) -> Visitor:
+        """
+        Call visitor for every node (or only nodes whose 'type' is in types), in registration order.
+
+        nested=True also calls it for dicts outside the tree (see Node.in_tree).
+        """
+        self._visitors.append((frozenset(types) if types is not None else None, nested, visitor))
+        return visitor
+
+    def visitor(self, *types: str) -> Callable[[Visitor], Visitor]:
+        """Decorator form of register()."""
+        return lambda visitor: self.register(visitor, types or None)
+
+    def walk(self, document: Any, root_path: str = '$') -> int:
+        """Run every visitor over document in one pass; returns the number of nodes visited."""
+        child_keys = self.child_keys
+        # Nested visitors need every dict; tree keys still come first so tree order is unchanged
+        follow_all = child_keys is None or any(nested for _, nested, _ in self._visitors)
+        failed = set()
+        stack: List[Node] = []
+        self._push(stack, document, root_path, None, None, True)
+        visited = 0
+        while stack:
+            node = stack.pop()
+            visited += 1
+            node_type = node.value.get('type')
+            for position, (types, nested, visitor) in enumerate(self._visitors):
+                if position in failed or not (node.in_tree or nested):
+                    continue
+                if types is None or node_type in types:
+                    if self.on_error is None:
+                        visitor(node)
+                        continue
+                    try:
+                        visitor(node)
+                    except Exception as e:
+                        failed.add(position)
+                        self.on_error(visitor, node, e)
+            if child_keys is None:
+                keys = list(node.value)
+            elif follow_all:
+                keys = [key for key in child_keys if key in node.value] + \
+                       [key for key in node.value if key not in child_keys]
+            else:
+                keys = child_keys
+            children: List[Node] = []
+            for key in keys:
+                if key in node.value:
+                    in_tree = node.in_tree and (child_keys is None or key in child_keys)
+                    self._push(children, node.value[key], f"{node.path}.{key}", node, key, in_tree)
+            # Reversed onto the stack so the first child is visited first
+            stack.extend(reversed(children))
+        return visited
+
+    @staticmethod
+    def _push(out: List[Node], value: Any, path: str, parent: Optional[Node], key: Optional[str], in_tree: bool):
+        """Append the dicts in value (nested lists flattened, in order) as Nodes."""
+        pending = [(value, path)]
+        while pending:
+            value, path = pending.pop()
+            if isinstance(value, dict):
+                out.append(Node(value, path, parent, key, in_tree))
+            elif isinstance(value, list):
+                pending.extend((item, f"{path}[{i}]") for i, item in reversed(list(enumerate(value))))
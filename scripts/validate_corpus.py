@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Parallel validator for every figma-ready output.
+
+Files are sharded across a process pool; each worker loads the design system
+once and runs, per file:
+- schema/*      the file parses and matches the figma-ready schema
+                (scripts/figma_schema.py, compiled validator)
+- layout/*      what the layout normalizer would change (flex-fill metadata,
+                sizing modes, spacing scale, ...)
+- design/*      the design-system rules (components, variants, icons, text and
+                color styles, sizing) without applying fixes
+- bounds/*      overflow, clipped and zero-size nodes from a local auto-layout
+                pass over the normalized document (scripts/auto_layout.py)
+- text/*        predicted text overflow, wrapping in rows and truncated
+                single-line slots (scripts/text_metrics.py)
+
+The result is one JSON report with per-rule counts and the issues of each
+file. The report doubles as the cache for --incremental: a file whose content
+hash, design system and validator version are unchanged is not checked again.
+
+Usage:
+    python scripts/validate_corpus.py [--folder figma-ready] [--incremental] [--workers N]
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.auto_layout import check_layout
+from scripts.design_rules import DesignCheck, get_design_rules
+from scripts.design_system_registry import get_registry
+from scripts.layout_normalizer import normalize_layout
+from scripts.schema_compiler import validate_figma_json
+from scripts.text_metrics import TextChecker, get_text_fitter
+from scripts.tree_walker import TreeWalker
+
+# Bump when checks change so --incremental re-validates everything
+VALIDATOR_VERSION = 4
+DEFAULT_FOLDER = "figma-ready"
+DEFAULT_PATTERN = "figma_ready_*.json"
+REPORT_FILENAME = ".validation-report.json"
+
+_snapshot = None
+
+
+def _init_worker(snapshot_path: Optional[str]):
+    global _snapshot
+    _snapshot = get_registry().get(snapshot_path) if snapshot_path else None
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _issue(rule: str, path: str, message: str) -> Dict[str, str]:
+    return {'rule': rule, 'path': path, 'message': message}
+
+
+def validate_document(document: Any, snapshot=None) -> List[Dict[str, str]]:
+    """Every schema, layout and bounds issue (and with a snapshot design and text issue) of one document."""
+    issues = [_issue(f"schema/{i.rule}", i.path, i.message) for i in validate_figma_json(document)]
+
+    if snapshot is not None:
+        # Report only (fix=False leaves the document untouched): design and text checks share one walk
+        walker = TreeWalker()
+        design = DesignCheck(get_design_rules(snapshot), fix=False).register(walker)
+        text = TextChecker(get_text_fitter(snapshot)).register(walker)
+        walker.walk(document)
+        issues.extend(_issue(f"design/{i.rule}", i.path, i.message) for i in design.finish() if not i.fixed)
+        _, text_issues = text.finish()
+        issues.extend(_issue(f"text/{i['rule']}", i['path'], i['message']) for i in text_issues)
+
+    # Last: the normalizer edits the document
+    changes = normalize_layout(document)
+    issues.extend(_issue(f"layout/{c['rule']}", c['path'], f"{c['from']!r} -> {c['to']!r}") for c in changes)
+
+    # Bounds as the normalized document would render
+    fitter = get_text_fitter(snapshot) if snapshot is not None else None
+    _, layout_issues = check_layout(document, snapshot, fitter)
+    issues.extend(_issue(f"bounds/{i['rule']}", i['path'], i['message']) for i in layout_issues)
+    return issues
+
+
+def validate_file(path: str) -> Tuple[str, List[Dict[str, str]], float]:
+    """(path, issues, milliseconds) for one file; runs in a worker process."""
+    started = time.perf_counter()
+    try:
+        document = json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        issues = [_issue('schema/invalid-json', '$', str(e))]
+    else:
+        issues = validate_document(document, _snapshot)
+    return path, issues, (time.perf_counter() - started) * 1000
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def validate_corpus(files: List[Path], snapshot=None, workers: Optional[int] = None,
+                    previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Report for files, checked across a process pool.
+
+    With a previous report, files whose hash, design system and validator
+    version match it reuse its issues instead of being checked again.
+    """
+    snapshot_hash = snapshot.content_hash if snapshot is not None else None
+    reusable = {}
+    if previous and previous.get('validator_version') == VALIDATOR_VERSION \
+            and previous.get('design_system') == snapshot_hash:
+        reusable = previous.get('files', {})
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    pending: List[str] = []
+    for path in files:
+        digest = file_hash(path)
+        cached = reusable.get(str(path))
+        if cached and cached.get('hash') == digest:
+            entries[str(path)] = cached
+        else:
+            entries[str(path)] = {'hash': digest}
+            pending.append(str(path))
+
+    started = time.perf_counter()
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        # A few shards per worker keeps the pool busy without per-file IPC overhead
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(snapshot.path if snapshot is not None else None,)) as pool:
+            for path, issues, elapsed in pool.map(validate_file, pending, chunksize=chunksize):
+                entries[path].update(issues=issues, ms=round(elapsed, 2))
+
+    rule_counts: Dict[str, int] = {}
+    for entry in entries.values():
+        for issue in entry['issues']:
+            rule_counts[issue['rule']] = rule_counts.get(issue['rule'], 0) + 1
+
+    return {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'validator_version': VALIDATOR_VERSION,
+        'design_system': snapshot_hash,
+        'summary': {
+            'files': len(entries),
+            'checked': len(pending),
+            'skipped': len(entries) - len(pending),
+            'failed': sum(1 for entry in entries.values() if entry['issues']),
+            'seconds': round(time.perf_counter() - started, 3),
+        },
+        'rules': dict(sorted(rule_counts.items(), key=lambda item: -item[1])),
+        'files': dict(sorted(entries.items())),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Validate every figma-ready output in parallel")
+    parser.add_argument("--folder", default=DEFAULT_FOLDER, help="Folder with figma-ready JSON")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help="Filename glob inside the folder")
+    parser.add_argument("--report", help=f"Report path (default: <folder>/{REPORT_FILENAME})")
+    parser.add_argument("--incremental", action="store_true", help="Skip files unchanged since the last report")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-design", action="store_true", help="Skip the design-system checks")
+    args = parser.parse_args()
+
+    folder = Path(args.folder)
+    files = sorted(folder.glob(args.pattern))
+    if not files:
+        print(f"❌ No {args.pattern} files in {folder}")
+        sys.exit(1)
+
+    snapshot = None if args.no_design else get_registry().latest()
+    if snapshot is None and not args.no_design:
+        print("⚠️ No design system snapshot found, skipping design checks")
+
+    report_path = Path(args.report) if args.report else folder / REPORT_FILENAME
+    previous = load_report(report_path) if args.incremental else None
+    report = validate_corpus(files, snapshot, args.workers, previous)
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+
+    summary = report['summary']
+    print(f"📊 {summary['files']} files: {summary['checked']} checked, {summary['skipped']} unchanged, "
+          f"{summary['failed']} with issues ({summary['seconds']} s)")
+    for rule, count in report['rules'].items():
+        print(f"   {count:>6}  {rule}")
+    print(f"💾 Report: {report_path}")
+    sys.exit(1 if summary['failed'] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,45 @@
 #!/usr/bin/env python3
 """
 Validates that all native-text elements have proper flex-fill metadata.
-Run after JSON Engineer stage to verify compliance.
+Run after JSON Engineer stage to verify compliance; --fix applies the layout
+normalizer (scripts/layout_normalizer.py) in the same pass and saves the result.
 """
 
 import json
 import sys
 from pathlib import Path
 
-def validate_text_elements(json_file):
+sys.path.append(str(Path(__file__).parent.parent))
+from scripts.layout_normalizer import LayoutNormalizer, summarize_changes
+from scripts.tree_walker import TreeWalker
+
+def validate_text_elements(json_file, fix=False):
     """Check all native-text elements for proper metadata."""
     with open(json_file, 'r') as f:
         data = json.load(f)
     
     errors = []
+    walker = TreeWalker()
+    # Fixing and checking share one pass: the normalizer runs first on each node
+    normalizer = LayoutNormalizer().register(walker) if fix else None
+    
+    @walker.visitor("native-text")
+    def check_element(node):
+        element = node.value
+        # Check for required metadata
+        if not element.get("_useFlexFill"):
+            errors.append(f"{node.path}: Missing _useFlexFill: true")
+        if not element.get("_parentLayout"):
+            errors.append(f"{node.path}: Missing _parentLayout")
+        if "_constraintWidth" in element:
+            errors.append(f"{node.path}: Has forbidden _constraintWidth")
     
-    def check_element(element, path="root"):
-        if element.get("type") == "native-text":
-            # Check for required metadata
-            if not element.get("_useFlexFill"):
-                errors.append(f"{path}: Missing _useFlexFill: true")
-            if not element.get("_parentLayout"):
-                errors.append(f"{path}: Missing _parentLayout")
-            if "_constraintWidth" in element:
-                errors.append(f"{path}: Has forbidden _constraintWidth")
-        
-        # Recurse into items
-        if "items" in element:
-            for i, item in enumerate(element["items"]):
-                check_element(item, f"{path}.items[{i}]")
+    walker.walk(data, root_path="root")
     
-    check_element(data)
+    if normalizer and normalizer.changes:
+        with open(json_file, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        print(f"📐 Normalized layout: {summarize_changes(normalizer.changes)}")
     
     if errors:
         print("❌ Text validation FAILED:")
@@ -42,14 +51,15 @@ def validate_text_elements(json_file):
         return True
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python validate_text_metadata.py <json_file>")
+    args = [arg for arg in sys.argv[1:] if arg != "--fix"]
+    if len(args) != 1:
+        print("Usage: python validate_text_metadata.py <json_file> [--fix]")
         sys.exit(1)
     
-    json_file = Path(sys.argv[1])
+    json_file = Path(args[0])
     if not json_file.exists():
         print(f"Error: {json_file} not found")
         sys.exit(1)
     
-    success = validate_text_elements(json_file)
+    success = validate_text_elements(json_file, fix="--fix" in sys.argv)
     sys.exit(0 if success else 1)
\ No newline at end of file
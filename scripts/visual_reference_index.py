@@ -0,0 +1,230 @@
+"""
+Visual reference relevance index.
+
+Builds a small descriptor for every image in visual-references/ (filename
+tokens, optional sidecar tags and a few cheap image features) and picks only
+the references that match the analyzer's interpretation of the request, so the
+multimodal payload for stages 1 and 2 stays at top-k instead of growing with
+the folder. When nothing matches (untagged folders, unrelated requests) the
+most recent top-k references are used instead.
+
+Tags can be supplied per image as a sidecar text file next to the image
+(``login-dark.png`` -> ``login-dark.txt``) or for the whole folder in
+``tags.json`` ({"login-dark.png": ["login", "auth", "dark"]}).
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+INDEX_FILENAME = ".reference-index.json"
+
+# Words that carry no signal about which screen a reference shows
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have',
+    'in', 'is', 'it', 'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with',
+    'should', 'must', 'will', 'can', 'user', 'users', 'screen', 'app', 'page',
+    'img', 'image', 'screenshot', 'ref', 'reference', 'copy', 'final', 'jpg', 'jpeg',
+    'png', 'gif', 'webp',
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Split free text or a filename into normalized word tokens."""
+    # Break camelCase before lowercasing: "loginScreen" -> "login Screen"
+    text = re.sub(r'([a-z])([A-Z])', r'\1 \2', text)
+    tokens = []
+    for raw in re.split(r'[^0-9A-Za-zА-Яа-яІіЇїЄєҐґ]+', text.lower()):
+        if len(raw) < 2 or raw.isdigit() or raw in STOPWORDS:
+            continue
+        # Light plural folding so "cards" matches "card"
+        if len(raw) > 3 and raw.endswith('s') and not raw.endswith('ss'):
+            raw = raw[:-1]
+        tokens.append(raw)
+    return tokens
+
+
+def describe_image(image_path: str) -> List[str]:
+    """Derive coarse visual tags (orientation, brightness) from the pixels."""
+    try:
+        import PIL.Image
+    except ImportError:
+        return []
+
+    try:
+        with PIL.Image.open(image_path) as img:
+            width, height = img.size
+            # A thumbnail is enough for mean luminance
+            img.thumbnail((32, 32))
+            pixels = list(img.convert('L').getdata())
+    except Exception as e:
+        print(f"⚠️ Failed to describe visual reference {os.path.basename(image_path)}: {e}")
+        return []
+
+    tags = []
+    if height > width * 1.2:
+        tags.extend(['portrait', 'mobile'])
+    elif width > height * 1.2:
+        tags.extend(['landscape', 'desktop'])
+
+    if pixels:
+        brightness = sum(pixels) / len(pixels)
+        if brightness < 80:
+            tags.append('dark')
+        elif brightness > 180:
+            tags.append('light')
+    return tags
+
+
+class VisualReferenceIndex:
+    """TF-IDF index over visual reference descriptors."""
+
+    def __init__(self, image_paths: List[str]):
+        self.image_paths = list(image_paths)
+        self.descriptors: Dict[str, List[str]] = {}
+        self.mtimes: Dict[str, float] = {}
+        self._vectors: Dict[str, Dict[str, float]] = {}
+        self._idf: Dict[str, float] = {}
+        self._build()
+
+    def _load_folder_tags(self, folder: str) -> Dict[str, List[str]]:
+        tags_file = Path(folder) / "tags.json"
+        if not tags_file.exists():
+            return {}
+        try:
+            with open(tags_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Failed to load {tags_file}: {e}")
+            return {}
+
+    def _load_cache(self, folder: str) -> Dict[str, Any]:
+        cache_file = Path(folder) / INDEX_FILENAME
+        if not cache_file.exists():
+            return {}
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_cache(self, folder: str, cache: Dict[str, Any]):
+        try:
+            with open(Path(folder) / INDEX_FILENAME, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            print(f"⚠️ Failed to save visual reference index: {e}")
+
+    def _build(self):
+        """Compute (or reuse cached) descriptors and TF-IDF weights."""
+        by_folder: Dict[str, List[str]] = {}
+        for path in self.image_paths:
+            by_folder.setdefault(os.path.dirname(path) or '.', []).append(path)
+
+        for folder, paths in by_folder.items():
+            folder_tags = self._load_folder_tags(folder)
+            cache = self._load_cache(folder)
+            cache_dirty = False
+
+            for path in paths:
+                name = os.path.basename(path)
+                stat = os.stat(path)
+                self.mtimes[path] = stat.st_mtime
+                signature = f"{stat.st_size}:{int(stat.st_mtime)}"
+
+                cached = cache.get(name)
+                if cached and cached.get('signature') == signature:
+                    visual_tags = cached.get('visual_tags', [])
+                else:
+                    visual_tags = describe_image(path)
+                    cache[name] = {'signature': signature, 'visual_tags': visual_tags}
+                    cache_dirty = True
+
+                tokens = tokenize(os.path.splitext(name)[0])
+                tokens += tokenize(' '.join(folder_tags.get(name, [])))
+                sidecar = os.path.splitext(path)[0] + '.txt'
+                if os.path.exists(sidecar):
+                    with open(sidecar, 'r', encoding='utf-8') as f:
+                        tokens += tokenize(f.read())
+                tokens += visual_tags
+                self.descriptors[path] = tokens
+
+            if cache_dirty:
+                self._save_cache(folder, cache)
+
+        # Inverse document frequency across the reference set
+        doc_freq = Counter()
+        for tokens in self.descriptors.values():
+            doc_freq.update(set(tokens))
+        total = len(self.descriptors)
+        self._idf = {t: math.log((1 + total) / (1 + df)) + 1 for t, df in doc_freq.items()}
+
+        for path, tokens in self.descriptors.items():
+            self._vectors[path] = self._weigh(tokens)
+
+    def _weigh(self, tokens: List[str]) -> Dict[str, float]:
+        counts = Counter(t for t in tokens if t in self._idf)
+        vector = {t: c * self._idf[t] for t, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def rank(self, query: str) -> List[tuple]:
+        """Return (path, score) pairs with a positive score, best first."""
+        query_vector = self._weigh(tokenize(query))
+        scored = []
+        for path in self.image_paths:
+            vector = self._vectors.get(path, {})
+            score = sum(weight * vector.get(token, 0.0) for token, weight in query_vector.items())
+            if score > 0:
+                scored.append((path, score))
+        # Stable on ties: keep the folder's name order
+        scored.sort(key=lambda item: -item[1])
+        return scored
+
+    def recent(self, top_k: int = 3) -> List[str]:
+        """The top-k most recently modified references."""
+        return sorted(self.image_paths, key=lambda path: -self.mtimes.get(path, 0.0))[:top_k]
+
+    def select(self, query: str, top_k: int = 3) -> List[str]:
+        """Pick the top-k references relevant to the query, or the most recent ones if none match."""
+        ranked = self.rank(query)
+        if not ranked:
+            print(f"📸 No visual reference matches the request, using the {min(top_k, len(self.image_paths))} most recent")
+            return self.recent(top_k)
+        return [path for path, _ in ranked[:top_k]]
+
+
+_index_cache: Dict[tuple, VisualReferenceIndex] = {}
+
+
+def _file_signature(path: str) -> tuple:
+    try:
+        stat = os.stat(path)
+        return path, stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return path, None, None
+
+
+def _folder_signature(image_paths: List[str]) -> tuple:
+    # Replaced or edited images (and their tags) keep their path but not their size / mtime
+    folders = sorted({os.path.dirname(path) or '.' for path in image_paths})
+    files = list(image_paths)
+    files += [os.path.splitext(path)[0] + '.txt' for path in image_paths]
+    files += [os.path.join(folder, "tags.json") for folder in folders]
+    return tuple(_file_signature(path) for path in files)
+
+
+def select_visual_references(image_paths: List[str], query: str, top_k: int = 3) -> List[str]:
+    """Select relevant references, reusing the index while no image has changed."""
+    if not image_paths:
+        return []
+    key = _folder_signature(image_paths)
+    index = _index_cache.get(key)
+    if index is None:
+        index = VisualReferenceIndex(image_paths)
+        _index_cache[key] = index
+    return index.select(query, top_k)
@@ -10,6 +10,12 @@ import re
 import glob
 from pathlib import Path
 
+from scripts.color_index import get_color_index, snap_document_colors
+from scripts.design_system_registry import get_registry
+from scripts.tree_walker import TreeWalker
+
+SEMANTIC_COLOR = re.compile(r'^(primary|secondary|tertiary|neutral|surface)-\d+$')
+
 def get_color_mapping(design_system_data):
     """Extract color mapping from design system data."""
     mapping = {}
@@ -37,30 +43,29 @@ def get_color_mapping(design_system_data):
     return mapping
 
 def fix_colors_in_object(obj, color_mapping):
-    """Recursively fix color names in an object."""
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            if isinstance(value, str):
-                # Check if this looks like a semantic color
-                if re.match(r'^(primary|secondary|tertiary|neutral|surface)-\d+$', value.lower()):
-                    if value in color_mapping:
-                        obj[key] = color_mapping[value]
-                        print(f"Fixed: {value} -> {color_mapping[value]}")
-            elif isinstance(value, (dict, list)):
-                fix_colors_in_object(value, color_mapping)
-    elif isinstance(obj, list):
-        for item in obj:
-            fix_colors_in_object(item, color_mapping)
+    """Fix color names in every nested object (one iterative pass)."""
+    walker = TreeWalker(child_keys=None)
+    
+    @walker.visitor()
+    def fix_colors(node):
+        for key, value in node.value.items():
+            # Check if this looks like a semantic color
+            if isinstance(value, str) and SEMANTIC_COLOR.match(value.lower()):
+                if value in color_mapping:
+                    node.value[key] = color_mapping[value]
+                    print(f"Fixed: {value} -> {color_mapping[value]}")
+    
+    walker.walk(obj)
 
 def main():
     print(">> Simple Color Name Fixer")
     print("-" * 30)
     
-    # Find files automatically
-    design_files = glob.glob("**/design-system-raw-data-*.json", recursive=True)
+    # Find files automatically (newest design system comes from the shared registry)
+    design_system = get_registry().latest("design-system")
     figma_files = glob.glob("**/figma_ready_*.json", recursive=True)
     
-    if not design_files:
+    if not design_system:
         print("Error: No design-system-raw-data-*.json found")
         return
     if not figma_files:
@@ -68,28 +73,27 @@ def main():
         return
     
     # Use latest files
-    design_file = max(design_files, key=lambda f: Path(f).stat().st_mtime)
     figma_file = max(figma_files, key=lambda f: Path(f).stat().st_mtime)
     
-    print(f"Using Design System: {design_file}")
+    print(f"Using Design System: {design_system.path}")
     print(f"Using Figma JSON: {figma_file}")
     
-    # Load design system
-    with open(design_file, 'r') as f:
-        design_data = json.load(f)
-    
     # Load figma JSON
     with open(figma_file, 'r') as f:
         figma_data = json.load(f)
     
     # Get color mapping
-    color_mapping = get_color_mapping(design_data)
+    color_mapping = get_color_mapping(design_system.data)
     print(f"Found {len(color_mapping)} color mappings")
     
     # Fix colors
     print("\nApplying fixes:")
     fix_colors_in_object(figma_data, color_mapping)
     
+    # Raw hex colors and style ids -> nearest valid color style
+    for correction in snap_document_colors(figma_data, get_color_index(design_system)):
+        print(f"Snapped: {correction['from']} -> {correction['to']}")
+    
     # Save corrected version
     corrected_file = figma_file.replace('.json', '_corrected.json')
     with open(corrected_file, 'w') as f:
@@ -2397,10 +2397,16 @@ export class FigmaRenderer {
       .map(comp => `${comp.name} (${comp.id})`)
     );
     
-    const iconComponent = designSystemData.components.find(comp =>
-      comp.suggestedType === 'icon' &&
-      comp.name.toLowerCase().includes(iconName.toLowerCase())
-    );
+    const isIcon = (comp: any) =>
+      comp.suggestedType === 'icon' || comp.name.toLowerCase().startsWith('icon/');
+    const requested = iconName.toLowerCase();
+    
+    // Node id or exact name first (the pipeline resolves iconSwaps to full names),
+    // then the first icon whose name contains the requested text
+    const iconComponent =
+      designSystemData.components.find(comp => comp.id === iconName) ||
+      designSystemData.components.find(comp => isIcon(comp) && comp.name.toLowerCase() === requested) ||
+      designSystemData.components.find(comp => isIcon(comp) && comp.name.toLowerCase().includes(requested));
     
     if (iconComponent) {
       console.log(`âœ… Resolved icon "${iconName}" â†’ ${iconComponent.id} (${iconComponent.name})`);
@@ -2,6 +2,8 @@ import json
 import os
 import glob
 
+from scripts.tree_walker import TreeWalker
+
 def test_visibility_overrides():
     """Test that visibility overrides are properly structured"""
     test_files = glob.glob("figma-ready/figma_ready_*.json")
@@ -41,8 +43,12 @@ def test_visibility_overrides():
         print("ℹ️ No visibility overrides found in recent outputs. Test with visibility-specific requests.")
 
 def check_nested_items(items, file_path):
-    """Recursively check nested items for visibility overrides"""
-    for item in items:
+    """Check nested items at any depth for visibility overrides (one iterative pass)"""
+    walker = TreeWalker(child_keys=('items',))
+    
+    @walker.visitor()
+    def report(node):
+        item = node.value
         if 'visibilityOverrides' in item:
             print(f"✅ Found nested visibility overrides in {item.get('type', 'unknown')} from {file_path}")
             for node_id, visible in item['visibilityOverrides'].items():
@@ -52,9 +58,8 @@ def check_nested_items(items, file_path):
             print(f"✅ Found nested icon swaps in {item.get('type', 'unknown')} from {file_path}")
             for node_id, icon_name in item['iconSwaps'].items():
                 print(f"   - {node_id}: {icon_name}")
-        
-        if 'items' in item and isinstance(item['items'], list):
-            check_nested_items(item['items'], file_path)
+    
+    walker.walk(items)
 
 def validate_override_structure():
     """Validate the structure of visibility overrides"""
@@ -83,34 +88,34 @@ def validate_override_structure():
         print("\n✅ All visibility overrides pass validation")
 
 def validate_item_overrides(item, file_path):
-    """Validate a single item's visibility overrides"""
+    """Validate the visibility overrides of an item and everything nested in it"""
     errors = []
+    walker = TreeWalker(child_keys=('items',))
     
-    if 'visibilityOverrides' in item:
-        overrides = item['visibilityOverrides']
-        if not isinstance(overrides, dict):
-            errors.append(f"{file_path}: visibilityOverrides must be an object")
-        else:
-            for node_id, visible in overrides.items():
-                if not isinstance(visible, bool):
-                    errors.append(f"{file_path}: {node_id} visibility value must be boolean")
-                if not node_id.replace(':', '').replace(';', '').isdigit():
-                    errors.append(f"{file_path}: {node_id} may not be valid node ID format")
-    
-    if 'iconSwaps' in item:
-        swaps = item['iconSwaps']
-        if not isinstance(swaps, dict):
-            errors.append(f"{file_path}: iconSwaps must be an object")
-        else:
-            for node_id, icon_name in swaps.items():
-                if not isinstance(icon_name, str):
-                    errors.append(f"{file_path}: {node_id} icon name must be string")
-    
-    # Check nested items
-    if 'items' in item and isinstance(item['items'], list):
-        for nested_item in item['items']:
-            errors.extend(validate_item_overrides(nested_item, file_path))
+    @walker.visitor()
+    def validate(node):
+        item = node.value
+        if 'visibilityOverrides' in item:
+            overrides = item['visibilityOverrides']
+            if not isinstance(overrides, dict):
+                errors.append(f"{file_path}: visibilityOverrides must be an object")
+            else:
+                for node_id, visible in overrides.items():
+                    if not isinstance(visible, bool):
+                        errors.append(f"{file_path}: {node_id} visibility value must be boolean")
+                    if not node_id.replace(':', '').replace(';', '').isdigit():
+                        errors.append(f"{file_path}: {node_id} may not be valid node ID format")
+        
+        if 'iconSwaps' in item:
+            swaps = item['iconSwaps']
+            if not isinstance(swaps, dict):
+                errors.append(f"{file_path}: iconSwaps must be an object")
+            else:
+                for node_id, icon_name in swaps.items():
+                    if not isinstance(icon_name, str):
+                        errors.append(f"{file_path}: {node_id} icon name must be string")
     
+    walker.walk(item)
     return errors
 
 if __name__ == "__main__":